@@ -2,20 +2,44 @@
 
 Lightweight LLM-backed quick suggester with a deterministic heuristic fallback.
 Returns short (2-5 word) improvement suggestions for a site given `measures`.
+
+LLM answers are kept in a persistent cache keyed by a normalized hash of the indicators and body
+excerpt, so re-audits and near-identical template sites skip the call; identical requests that are
+already in flight wait for the first one instead of calling again. Calls go over the pooled
+session from fetcher.py.
 """
 from __future__ import annotations
 import os
 import json
-import requests
+import hashlib
 import textwrap
 import re
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import requests
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+from fetcher import get_session
+import page_scan
 
-OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+# Overridable so tests and benchmarks can point at a local mock completions server.
+OPENAI_API_URL = os.environ.get("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
 DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_CACHE_TTL_S = 7 * 24 * 3600
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Batched mode: sites per request, prompt + answer token budget per request, and how long a
+# request waits for more sites before it is sent anyway.
+DEFAULT_BATCH_SITES = 8
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+DEFAULT_BATCH_WAIT_S = 0.5
+# Rough answer size per site (up to 6 short phrases plus JSON punctuation).
+ANSWER_TOKENS_PER_SITE = 70
 
 
-def _build_prompt(measures: Dict[str, Any]) -> str:
+def _prompt_inputs(measures: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
     title = measures.get('meta', {}).get('title') or ''
     excerpt = (measures.get('parsed', {}).get('body_text') or '')[:1000]
     parts = {
@@ -30,6 +54,13 @@ def _build_prompt(measures: Dict[str, Any]) -> str:
         "broken_links": measures.get('broken_links') or 0,
         "external_resource_ratio": measures.get('external_resource_ratio')
     }
+    for key in measures.get('unmeasured') or ():  # skipped by a staged audit: not known either way
+        parts.pop(key, None)
+    return parts, excerpt
+
+
+def _build_prompt(measures: Dict[str, Any]) -> str:
+    parts, excerpt = _prompt_inputs(measures)
     prompt = textwrap.dedent(f"""
     You are a concise website improvement suggester. Given the site indicators and a short excerpt, return a strict JSON object:
       {{ "suggestions": ["short phrase", ...] }}
@@ -40,7 +71,26 @@ def _build_prompt(measures: Dict[str, Any]) -> str:
     return prompt
 
 
-def _call_openai(prompt: str, model: str = DEFAULT_MODEL, timeout: int = 8) -> Optional[List[str]]:
+def _extract_json(content: str) -> Any:
+    content = content.strip()
+    start = content.find('{')
+    end = content.rfind('}')
+    blob = content[start:end+1] if start != -1 and end != -1 else content
+    return json.loads(blob)
+
+
+def _clean_suggestions(suggs: Any) -> List[str]:
+    # ensure short phrases (truncate/clean)
+    clean = []
+    for s in suggs if isinstance(suggs, list) else []:
+        s2 = re.sub(r'\s+', ' ', str(s)).strip()
+        if 2 <= len(s2.split()) <= 5:
+            clean.append(s2)
+    return clean[:6]
+
+
+def _chat(prompt: str, model: str, max_tokens: int, timeout: float) -> Optional[str]:
+    """POST one chat completion and return the message content (None without an API key)."""
     key = os.environ.get("OPENAI_API_KEY")
     if not key:
         return None
@@ -51,36 +101,27 @@ def _call_openai(prompt: str, model: str = DEFAULT_MODEL, timeout: int = 8) -> O
             {"role": "user", "content": prompt}
         ],
         "temperature": 0.2,
-        "max_tokens": 300
+        "max_tokens": max_tokens
     }
     headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+    r = get_session().post(OPENAI_API_URL, json=payload, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r.json()["choices"][0]["message"]["content"]
+
+
+def _call_openai(prompt: str, model: str = DEFAULT_MODEL, timeout: int = 8) -> Optional[List[str]]:
     try:
-        r = requests.post(OPENAI_API_URL, json=payload, headers=headers, timeout=timeout)
-        r.raise_for_status()
-        data = r.json()
-        content = data["choices"][0]["message"]["content"].strip()
-        # try to extract JSON object
-        start = content.find('{')
-        end = content.rfind('}')
-        if start != -1 and end != -1:
-            blob = content[start:end+1]
-        else:
-            blob = content
-        parsed = json.loads(blob)
-        suggs = parsed.get('suggestions') or []
-        # ensure short phrases (truncate/clean)
-        clean = []
-        for s in suggs:
-            s2 = re.sub(r'\s+', ' ', str(s)).strip()
-            if 2 <= len(s2.split()) <= 5:
-                clean.append(s2)
-        return clean[:6]
+        content = _chat(prompt, model, 300, timeout)
+        if content is None:
+            return None
+        return _clean_suggestions(_extract_json(content).get('suggestions') or [])
     except Exception:
         return None
 
 
 def _heuristic_suggestions(measures: Dict[str, Any]) -> List[str]:
     s = []
+    unmeasured = set(measures.get('unmeasured') or ())
     def add(p: str):
         if p not in s:
             s.append(p)
@@ -89,7 +130,7 @@ def _heuristic_suggestions(measures: Dict[str, Any]) -> List[str]:
     rt = measures.get('response_time_s')
     if rt is not None and rt > 3:
         add("optimize loading speed")
-    if not measures.get('has_ssl'):
+    if not measures.get('has_ssl') and 'has_ssl' not in unmeasured:
         add("enable HTTPS")
     if not measures.get('meta_description'):
         add("add meta description")
@@ -100,14 +141,16 @@ def _heuristic_suggestions(measures: Dict[str, Any]) -> List[str]:
     if not measures.get('has_schema'):
         add("add structured data")
     robots = measures.get('robots_sitemap') or {}
-    if not robots.get('sitemap') and not robots.get('robots'):
+    if not robots.get('sitemap') and not robots.get('robots') and 'robots_sitemap' not in unmeasured:
         add("add sitemap.xml")
     if (measures.get('broken_links') or 0) > 0:
         add("fix broken links")
     if measures.get('external_resource_ratio',0) > 0.6:
         add("host resources locally")
-    raw = (measures.get('parsed', {}).get('raw_html') or '').lower()
-    if ('book' not in raw and 'appointment' not in raw and measures.get('contact_info_found')):
+    booking = measures.get('booking_keywords')
+    if booking is None:  # measures from before page_scan
+        booking = page_scan.scan(measures.get('parsed', {}).get('raw_html') or '')['booking_keywords']
+    if not booking and measures.get('contact_info_found'):
         add("add booking feature")
     if not measures.get('copyright_fresh'):
         add("update content dates")
@@ -125,10 +168,273 @@ def _heuristic_suggestions(measures: Dict[str, Any]) -> List[str]:
     return out
 
 
-def generate_suggestions(measures: Dict[str, Any], max_suggestions: int = 6) -> List[str]:
-    """Return a list of short improvement suggestions (2-5 words). Tries OpenAI if key present, else heuristics."""
-    prompt = _build_prompt(measures)
-    suggestions = _call_openai(prompt)
+def _normalize(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 1)
+    if isinstance(value, str):
+        return re.sub(r'\s+', ' ', value).strip().lower()
+    return value
+
+
+def cache_key(measures: Dict[str, Any], model: str = DEFAULT_MODEL) -> str:
+    """Hash of the normalized prompt inputs: floats to 1 decimal, text lowercased with whitespace collapsed."""
+    parts, excerpt = _prompt_inputs(measures)
+    blob = json.dumps({'model': model, 'indicators': {k: _normalize(v) for k, v in parts.items()},
+                       'excerpt': _normalize(excerpt)}, sort_keys=True)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class SuggestionCache:
+    """Persistent LLM answer cache (TTL + size bound) with coalescing of identical in-flight requests."""
+
+    def __init__(self, path: Optional[str], ttl_s: float = DEFAULT_CACHE_TTL_S, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.store = DiskCache(path, max_age_s=ttl_s, max_bytes=max_bytes, table='suggestions') if path else None
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = self.failures = 0
+
+    def get_or_call(self, key: str, call) -> Tuple[Optional[List[str]], str]:
+        """Return (suggestions, 'hit' | 'coalesced' | 'miss'); `call()` runs at most once per key at a time."""
+        if self.store is not None:
+            cached = self.store.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return json.loads(cached[0]), 'hit'
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return fut.result(), 'coalesced'
+        result = None
+        try:
+            result = call()
+            if result and self.store is not None:
+                self.store.set(key, json.dumps(result).encode('utf-8'))
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if not result:
+                    self.failures += 1
+            fut.set_result(result)
+        return result, 'miss'
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced, 'failures': self.failures}
+        lookups = out['hits'] + out['misses'] + out['coalesced']
+        out['hit_rate'] = round((out['hits'] + out['coalesced']) / lookups, 3) if lookups else 0.0
+        if self.store is not None:
+            out.update(self.store.stats())
+        return out
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[SuggestionCache] = None
+
+
+def configure_cache(path: Optional[str] = os.path.join(DEFAULT_CACHE_DIR, 'llm.sqlite'), ttl_s: float = DEFAULT_CACHE_TTL_S,
+                    max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> SuggestionCache:
+    """Set up the process-wide suggestion cache. path=None keeps only in-flight coalescing."""
+    global _cache
+    with _cache_lock:
+        _cache = SuggestionCache(path, ttl_s=ttl_s, max_bytes=max_bytes)
+    return _cache
+
+
+def get_cache() -> SuggestionCache:
+    if _cache is None:
+        try:
+            configure_cache()
+        except Exception:
+            # unwritable cache dir etc. -- still coalesce, just don't persist
+            configure_cache(None)
+    return _cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    return get_cache().stats()
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _site_block(site_id: str, measures: Dict[str, Any]) -> str:
+    parts, excerpt = _prompt_inputs(measures)
+    excerpt = re.sub(r'\s+', ' ', excerpt)
+    return f"Site {site_id}:\n  Indicators: {json.dumps(parts)}\n  Body excerpt: {excerpt}\n"
+
+
+BATCH_INSTRUCTIONS = textwrap.dedent("""
+You are a concise website improvement suggester. For every site below, given its indicators and a short excerpt,
+suggest improvements. Each suggestion must be 2 to 5 words long, actionable, and no more than 6 per site.
+Return ONLY a strict JSON object with exactly one entry per site id, no extra text:
+  {"sites": {"<site id>": ["short phrase", ...], ...}}
+""")
+
+
+class BatchRequestError(Exception):
+    """The batch request itself failed (no API key, timeout, connection or HTTP error); a smaller
+    request would fail the same way."""
+
+
+def _call_openai_batch(blocks: Dict[str, str], model: str = DEFAULT_MODEL, timeout: float = 30) -> Optional[Dict[str, List[str]]]:
+    """One chat completion for several sites. Returns {site_id: suggestions} for the sites the model
+    answered, or None if the answer was not the expected JSON; raises BatchRequestError if the
+    request did not get an answer at all."""
+    prompt = BATCH_INSTRUCTIONS + '\n' + ''.join(blocks.values())
+    try:
+        content = _chat(prompt, model, ANSWER_TOKENS_PER_SITE * len(blocks) + 50, timeout)
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None  # a 200 whose body is not a completion
+    except requests.RequestException as e:
+        raise BatchRequestError(str(e)) from e
+    if content is None:
+        raise BatchRequestError('no API key')
+    try:
+        sites = _extract_json(content).get('sites')
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(sites, dict):
+        return None
+    return {str(k): _clean_suggestions(v) for k, v in sites.items() if str(k) in blocks and isinstance(v, list)}
+
+
+class SuggestionBatcher:
+    """Packs suggestion requests from concurrent audits into multi-site chat completions.
+
+    A request is sent once it holds `max_sites` sites, once the next site would push it past
+    `token_budget` (prompt plus expected answer), or `max_wait_s` after its first site arrived.
+    A malformed answer is retried as two half-size requests; a request that gets no answer at all
+    (timeout, 401, 429, ...) is not retried. A site that still has no answer resolves to None so
+    the caller falls back to _heuristic_suggestions().
+    """
+
+    def __init__(self, max_sites: int = DEFAULT_BATCH_SITES, token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+                 max_wait_s: float = DEFAULT_BATCH_WAIT_S, model: str = DEFAULT_MODEL, timeout: float = 30,
+                 max_in_flight: int = 4):
+        self.max_sites = max(1, max_sites)
+        self.token_budget = token_budget
+        self.max_wait_s = max_wait_s
+        self.model = model
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix='llm-batch')
+        self._cond = threading.Condition()
+        self._open: List[Tuple[str, str, Future]] = []
+        self._open_tokens = 0
+        self._opened_at = 0.0
+        self._ids = 0
+        self._timer: Optional[threading.Thread] = None
+        self.requests = self.sites = self.splits = self.fallbacks = self.request_errors = 0
+
+    def submit(self, measures: Dict[str, Any]) -> Future:
+        """Queue one site; the future resolves to its suggestions, or None if the batch could not answer it."""
+        fut: Future = Future()
+        with self._cond:
+            self._ids += 1
+            block = _site_block(f's{self._ids}', measures)
+            cost = _estimate_tokens(block) + ANSWER_TOKENS_PER_SITE
+            base = _estimate_tokens(BATCH_INSTRUCTIONS)
+            if self._open and base + self._open_tokens + cost > self.token_budget:
+                self._flush_locked()
+            if not self._open:
+                self._opened_at = time.monotonic()
+            self._open.append((f's{self._ids}', block, fut))
+            self._open_tokens += cost
+            if len(self._open) >= self.max_sites:
+                self._flush_locked()
+            else:
+                self._ensure_timer_locked()
+                self._cond.notify_all()
+        return fut
+
+    def _ensure_timer_locked(self) -> None:
+        if self._timer is None or not self._timer.is_alive():
+            self._timer = threading.Thread(target=self._tick, name='llm-batch-timer', daemon=True)
+            self._timer.start()
+
+    def _tick(self) -> None:
+        with self._cond:
+            while self._open:
+                remaining = self._opened_at + self.max_wait_s - time.monotonic()
+                if remaining <= 0:
+                    self._flush_locked()
+                    break
+                self._cond.wait(remaining)
+
+    def _flush_locked(self) -> None:
+        items, self._open, self._open_tokens = self._open, [], 0
+        if items:
+            self._pool.submit(self._send, items)
+
+    def _send(self, items: List[Tuple[str, str, Future]]) -> None:
+        with self._cond:
+            self.requests += 1
+            self.sites += len(items)
+        try:
+            answers = _call_openai_batch({sid: block for sid, block, _ in items}, self.model, self.timeout)
+        except BatchRequestError:
+            with self._cond:
+                self.request_errors += 1
+            answers = {}
+        if answers is None:
+            if len(items) > 1:
+                with self._cond:
+                    self.splits += 1
+                mid = len(items) // 2
+                self._send(items[:mid])
+                self._send(items[mid:])
+                return
+            answers = {}
+        for sid, _, fut in items:
+            result = answers.get(sid) or None
+            if result is None:
+                with self._cond:
+                    self.fallbacks += 1
+            fut.set_result(result)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {'requests': self.requests, 'sites': self.sites, 'splits': self.splits, 'fallbacks': self.fallbacks,
+                    'request_errors': self.request_errors}
+
+
+_batcher: Optional[SuggestionBatcher] = None
+
+
+def configure_batching(max_sites: int = DEFAULT_BATCH_SITES, **kwargs) -> Optional[SuggestionBatcher]:
+    """Route generate_suggestions() through a SuggestionBatcher; max_sites <= 1 turns batching off."""
+    global _batcher
+    _batcher = SuggestionBatcher(max_sites=max_sites, **kwargs) if max_sites > 1 else None
+    return _batcher
+
+
+def batch_stats() -> Optional[Dict[str, int]]:
+    return _batcher.stats() if _batcher is not None else None
+
+
+def _call_llm(measures: Dict[str, Any]) -> Optional[List[str]]:
+    if _batcher is not None:
+        return _batcher.submit(measures).result()
+    return _call_openai(_build_prompt(measures))
+
+
+def generate_suggestions(measures: Dict[str, Any], max_suggestions: int = 6, info: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Return a list of short improvement suggestions (2-5 words). Tries OpenAI if key present, else heuristics.
+
+    If `info` is given, info['cache'] is set to 'hit', 'coalesced', 'miss' or 'heuristic'."""
+    suggestions = None
+    status = 'heuristic'
+    if os.environ.get("OPENAI_API_KEY"):
+        suggestions, status = get_cache().get_or_call(cache_key(measures), lambda: _call_llm(measures))
+    if info is not None:
+        info['cache'] = status if suggestions else 'heuristic'
     if suggestions:
         seen = set()
         out = []
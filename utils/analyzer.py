@@ -3,15 +3,19 @@
 Compute heuristics from data returned by scraper.py and environment checks (SSL, broken links, Lighthouse data).
 """
 from __future__ import annotations
-import re
+import asyncio
 from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
-import requests
 import ssl
 import socket
 from datetime import datetime
 from tqdm import tqdm
 import statistics
+import threading
+import time
+from cachetools import TTLCache
+from fetcher import AsyncFetcher, run_sync
+import page_scan
 
 
 def text_to_html_ratio(html: str, body_text: str) -> float:
@@ -35,16 +39,61 @@ def heading_stats(headings: List[Dict[str,str]]) -> Dict[str, Any]:
     return {'counts': counts, 'total': total, 'max_depth': max_depth}
 
 
-def check_broken_links(urls: List[str], timeout: int = 6, max_checks: int = 10) -> int:
-    bad = 0
-    for u in urls[:max_checks]:
-        try:
-            r = requests.head(u, timeout=timeout, allow_redirects=True)
-            if r.status_code >= 400:
-                bad += 1
-        except Exception:
-            bad += 1
-    return bad
+# URL -> (status, ok) shared across audits; neighbouring businesses often link to the same
+# booking and social domains. cachetools caches are not thread-safe, hence the lock.
+link_status_cache = TTLCache(maxsize=4096, ttl=1800)
+_link_cache_lock = threading.Lock()
+# Statuses some servers return for HEAD only; these are re-checked with a ranged GET.
+HEAD_REJECTED_STATUSES = {400, 403, 405, 501}
+
+
+async def check_link_async(url: str, fetcher: AsyncFetcher, timeout: int = 6) -> Dict[str, Any]:
+    """Check one URL with HEAD (falling back to a 1-byte ranged GET) and return status and latency."""
+    with _link_cache_lock:
+        hit = link_status_cache.get(url)
+    if hit is not None:
+        status, ok = hit
+        return {'url': url, 'status': status, 'ok': ok, 'latency_s': 0.0, 'method': 'cache'}
+    t0 = time.perf_counter()
+    method = 'HEAD'
+    try:
+        r = await fetcher.head(url, timeout=timeout, allow_redirects=True)
+        status = r.status_code
+        if status in HEAD_REJECTED_STATUSES:
+            method = 'GET'
+            r = await fetcher.get(url, timeout=timeout, allow_redirects=True, stream=True, headers={'Range': 'bytes=0-0'})
+            status = r.status_code
+            r.close()
+        result = {'url': url, 'status': status, 'ok': status < 400, 'method': method}
+    except Exception as e:
+        result = {'url': url, 'status': None, 'ok': False, 'method': method, 'error': type(e).__name__}
+    result['latency_s'] = round(time.perf_counter() - t0, 3)
+    # only cache real HTTP answers; timeouts and connection errors are worth retrying next audit
+    if result['status'] is not None:
+        with _link_cache_lock:
+            link_status_cache[url] = (result['status'], result['ok'])
+    return result
+
+
+async def check_links_async(urls: List[str], timeout: int = 6, max_checks: int = 10, concurrency: int = 10, per_host: int = 4) -> List[Dict[str, Any]]:
+    """Check up to `max_checks` links concurrently: at most `concurrency` in flight, `per_host` per host."""
+    fetcher = AsyncFetcher(per_host=per_host)
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(u: str) -> Dict[str, Any]:
+        async with limit:
+            return await check_link_async(u, fetcher, timeout=timeout)
+
+    return list(await asyncio.gather(*(_one(u) for u in urls[:max_checks])))
+
+
+async def check_broken_links_async(urls: List[str], timeout: int = 6, max_checks: int = 10, concurrency: int = 10, per_host: int = 4) -> int:
+    results = await check_links_async(urls, timeout=timeout, max_checks=max_checks, concurrency=concurrency, per_host=per_host)
+    return sum(1 for r in results if not r['ok'])
+
+
+def check_broken_links(urls: List[str], timeout: int = 6, max_checks: int = 10, concurrency: int = 10, per_host: int = 4) -> int:
+    return run_sync(check_broken_links_async(urls, timeout=timeout, max_checks=max_checks, concurrency=concurrency, per_host=per_host))
 
 
 def count_security_headers(headers: Dict[str,str]) -> Dict[str, bool]:
@@ -132,14 +181,14 @@ def ssl_certificate_valid(url: str) -> Dict[str, Any]:
         return {'valid': False, 'error': str(e)}
 
 
+async def ssl_certificate_valid_async(url: str, fetcher: Optional[AsyncFetcher] = None) -> Dict[str, Any]:
+    fetcher = fetcher or AsyncFetcher()
+    return await fetcher.run(ssl_certificate_valid, url)
+
+
 def find_contact_info(text: str) -> Dict[str, Any]:
-    emails = re.findall(r'[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,6}', text)
-    phones = re.findall(r'\+?\d[\d \-()]{7,}\d', text)
-    addresses = []
-    # we won't try to parse addresses reliably; look for 'address' word nearby
-    if 'address' in text.lower() or 'street' in text.lower():
-        addresses.append('found')
-    return {'emails': list(set(emails)), 'phones': list(set(phones)), 'addresses': addresses}
+    """E-mails, phones and address hints in `text` (see page_scan.scan, which audits use directly)."""
+    return page_scan.contact_info(page_scan.scan(text))
 
 
 def has_structured_data(html: str) -> bool:
@@ -0,0 +1,182 @@
+"""batch_scorer.py
+
+Columnar version of scorer.compute_scores for re-scoring many reports at once.
+
+extract_columns() reads the scorer inputs of every report into one NumPy structured array (one
+column per indicator), and score_columns() computes every category sub-score and the weighted
+total for all rows in one vectorized pass. The arithmetic is the scalar function's, operation for
+operation, so the results are identical (see bench_scorer.py).
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from scorer import PARAMS, WEIGHTS
+
+CATEGORIES = ('technical', 'ux_design', 'seo', 'credibility', 'content')
+
+COLUMNS = np.dtype([
+    ('has_lighthouse', np.bool_),
+    ('lh_performance', np.float64),
+    ('lh_accessibility', np.float64),
+    ('lh_seo', np.float64),
+    ('lh_best_practices', np.float64),
+    ('has_ssl', np.bool_),
+    ('mobile_friendly', np.bool_),
+    ('response_time_s', np.float64),
+    ('security_headers_on', np.int32),
+    ('security_headers_total', np.int32),
+    ('broken_links', np.float64),
+    ('text_html_ratio', np.float64),
+    ('headings_total', np.float64),
+    ('h1_count', np.float64),
+    ('avg_para_words', np.float64),
+    ('title_present', np.bool_),
+    ('title_len', np.float64),
+    ('meta_description', np.bool_),
+    ('images_with_alt_ratio', np.float64),
+    ('canonical', np.bool_),
+    ('sitemap', np.bool_),
+    ('contact_info_found', np.bool_),
+    ('has_schema', np.bool_),
+    ('copyright_fresh', np.bool_),
+    ('social_links', np.float64),
+    ('keyword_relevance', np.float64),
+    ('external_resource_ratio', np.float64),
+])
+
+
+def _row(m: Mapping[str, Any]) -> tuple:
+    lh = m.get('lighthouse') or {}
+    meta = m.get('meta', {})
+    sec = m.get('security_headers', {})
+    robots = m.get('robots_sitemap') or {}
+    return (
+        bool(lh),
+        lh.get('performance', 0.0) if lh else 0.0,
+        lh.get('accessibility', 0.0) if lh else 0.0,
+        lh.get('seo', 0.0) if lh else 0.0,
+        lh.get('best-practices', 0.0) if lh else 0.0,
+        bool(m.get('has_ssl')),
+        bool(m.get('mobile_friendly')),
+        m.get('response_time_s', 0.0) or 0.0,
+        sum(1 for v in sec.values() if v),
+        len(sec),
+        m.get('broken_links', 0) or 0,
+        m.get('text_html_ratio', 0),
+        m.get('heading_stats', {}).get('total', 0),
+        m.get('h1_stats', {}).get('h1_count', 0),
+        m.get('paragraph_stats', {}).get('avg_words', 0),
+        bool(meta.get('title')),
+        len(meta.get('title', '')),
+        bool(meta.get('meta', {}).get('description')),
+        m.get('images_with_alt_ratio', 0.0),
+        bool(m.get('canonical')),
+        bool(robots.get('sitemap', False)),
+        bool(m.get('contact_info_found')),
+        bool(m.get('has_schema')),
+        bool(m.get('copyright_fresh', False)),
+        len(m.get('parsed', {}).get('social_links', [])),
+        m.get('keyword_relevance', 0.0),
+        m.get('external_resource_ratio', 0.0),
+    )
+
+
+def extract_columns(measures: Iterable[Mapping[str, Any]]) -> np.ndarray:
+    """One structured-array row per measures dict (or per report: its 'measures' are used)."""
+    rows = [_row(m['measures'] if 'measures' in m else m) for m in measures]
+    return np.array(rows, dtype=COLUMNS)
+
+
+def _normalize_0_100(x: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(x, 0.0, 1.0) * 100).astype(np.int64)
+
+
+def score_columns(cols: np.ndarray, weights: Optional[Mapping[str, float]] = None,
+                  params: Optional[Mapping[str, Mapping[str, float]]] = None) -> Dict[str, np.ndarray]:
+    """Category scores (int 0..100) and weighted 'total' for every row, as arrays."""
+    w = weights or WEIGHTS
+    params = params or PARAMS
+    f = lambda name: cols[name].astype(np.float64)
+
+    # --- Technical ---
+    p, t = params['lighthouse'], params['technical']
+    lh_sub = (p['performance'] * f('lh_performance') + p['accessibility'] * f('lh_accessibility')
+              + p['seo'] * f('lh_seo') + p['best-practices'] * f('lh_best_practices'))
+    resp = f('response_time_s')
+    resp_score = np.where(resp > 0, np.clip((t['response_max_s'] - resp) / (t['response_max_s'] - t['response_ideal_s']), 0.0, 1.0), 0.0)
+    security_score = f('security_headers_on') / np.maximum(1, cols['security_headers_total'])
+    broken_score = np.maximum(0.0, 1.0 - t['broken_link_penalty'] * f('broken_links'))
+    fallback = (t['ssl'] * f('has_ssl') + t['mobile'] * f('mobile_friendly') + t['response'] * resp_score
+                + t['security_headers'] * security_score + t['broken_links'] * broken_score)
+    technical_sub = np.where(cols['has_lighthouse'], lh_sub, fallback)
+
+    # --- UX & Design ---
+    u = params['ux_design']
+    h1 = f('h1_count')
+    avg_para = f('avg_para_words')
+    text_ratio_score = np.minimum(1.0, f('text_html_ratio') * u['text_ratio_scale'])
+    headings_score = np.minimum(1.0, f('headings_total') / u['headings_target'])
+    h1_score = np.where(h1 == 1, 1.0, np.where(h1 > 1, u['h1_multiple'], u['h1_missing']))
+    para_score = np.where((avg_para >= u['para_min_words']) & (avg_para <= u['para_max_words']), 1.0,
+                          np.maximum(0.0, 1.0 - np.abs(avg_para - u['para_center_words']) / u['para_falloff_words']))
+    ux_sub = u['text_ratio'] * text_ratio_score + u['headings'] * headings_score + u['h1'] * h1_score + u['paragraphs'] * para_score
+
+    # --- SEO ---
+    e = params['seo']
+    title_len = f('title_len')
+    title_len_score = np.where((title_len >= e['title_min_chars']) & (title_len <= e['title_max_chars']), 1.0,
+                               np.maximum(0.0, 1.0 - np.abs(title_len - e['title_center_chars']) / e['title_falloff_chars']))
+    seo_sub = (e['title'] * f('title_present') + e['title_length'] * title_len_score + e['description'] * f('meta_description')
+               + e['images_alt'] * f('images_with_alt_ratio') + e['canonical'] * f('canonical') + e['sitemap'] * f('sitemap'))
+
+    # --- Credibility ---
+    c = params['credibility']
+    social = np.minimum(1.0, f('social_links') / c['social_target'])
+    cred_sub = (c['contact'] * f('contact_info_found') + c['ssl'] * f('has_ssl') + c['schema'] * f('has_schema')
+                + c['copyright'] * f('copyright_fresh') + c['social'] * social)
+
+    # --- Content ---
+    n = params['content']
+    content_sub = n['keyword_relevance'] * f('keyword_relevance') + n['external_resources'] * np.maximum(0.0, 1.0 - f('external_resource_ratio'))
+
+    scores = {
+        'technical': _normalize_0_100(technical_sub),
+        'ux_design': _normalize_0_100(ux_sub),
+        'seo': _normalize_0_100(seo_sub),
+        'credibility': _normalize_0_100(cred_sub),
+        'content': _normalize_0_100(content_sub),
+    }
+    total = (scores['technical'] * w['technical'] + scores['ux_design'] * w['ux_design'] + scores['seo'] * w['seo']
+             + scores['credibility'] * w['credibility'] + scores['content'] * w['content'])
+    scores['total'] = np.round(total).astype(np.int64)
+    return scores
+
+
+def _summary(t: int, s: int, c: int, ct: int) -> str:
+    parts = []
+    if t >= 80:
+        parts.append('strong technical')
+    elif t < 40:
+        parts.append('poor technical')
+    if s >= 70:
+        parts.append('good SEO')
+    if c >= 70:
+        parts.append('credible')
+    if ct < 50:
+        parts.append('content needs improvement')
+    return '; '.join(parts) if parts else 'Mixed signals.'
+
+
+def compute_scores_batch(measures: Iterable[Mapping[str, Any]], weights: Optional[Mapping[str, float]] = None,
+                         params: Optional[Mapping[str, Mapping[str, float]]] = None) -> List[Dict[str, Any]]:
+    """compute_scores() for many measures dicts; returns the same list of dicts, computed column-wise."""
+    scores = score_columns(extract_columns(measures), weights, params)
+    keys = CATEGORIES + ('total',)
+    out = []
+    for row in zip(*(scores[k].tolist() for k in keys)):
+        d = dict(zip(keys, row))
+        d['summary'] = _summary(d['technical'], d['seo'], d['credibility'], d['content'])
+        out.append(d)
+    return out
@@ -0,0 +1,318 @@
+"""bench_audit.py
+
+Offline benchmark of the audit path against a local fixture server.
+
+The saved pages (samples/*.json raw_html and generated-sites/, see bench_parse.load_pages) are
+served from 127.0.0.1 over HTTP and, when the `openssl` CLI is available, over HTTPS with a
+self-signed certificate (the broken-TLS case: fetch_url falls back to an unverified fetch). Every
+page is also served slow (extra latency), huge (body repeated up to --huge-mb) and behind a chain
+of redirects; /robots.txt and /sitemap.xml exist, every other path is a 404. --latency-ms is added
+to every response.
+
+Benchmarks, in order: fetch_url, parse_html, the analyzer functions, full analyze() (no AI, vision
+or Lighthouse) and compute_scores on the measures analyze() produced. Each reports ops, throughput,
+p50/p95 latency and the process's peak RSS so far. Requests to any other host are refused, so the
+run needs no network. Save a run with --save and gate later runs with --compare.
+
+Usage:
+python bench_audit.py [--repeat 3] [--concurrency 4] [--latency-ms 20] [--save bench.json]
+python bench_audit.py --compare bench.json --tolerance 0.25   # exit 1 on regression
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import resource
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bench_parse import inflate, load_pages
+
+LOCAL_HOSTS = ('127.0.0.1', 'localhost')
+ROBOTS = b'User-agent: *\nDisallow:\nSitemap: /sitemap.xml\n'
+SITEMAP = b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"><url><loc>/p/0</loc></url></urlset>'
+
+
+class FixtureSite:
+    """Page bodies and server-side behaviour shared by the HTTP and HTTPS servers."""
+
+    def __init__(self, pages: List[str], latency_s: float = 0.0, slow_s: float = 1.0, huge_bytes: int = 5 * 2 ** 20):
+        self.pages = [p.encode('utf-8') for p in pages]
+        self.huge = [inflate(p, max(1, math.ceil(huge_bytes / max(1, len(p))))).encode('utf-8') for p in pages]
+        self.latency_s = latency_s
+        self.slow_s = slow_s
+
+    def respond(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        parts = [p for p in path.split('?')[0].split('/') if p]
+        html = {'Content-Type': 'text/html; charset=utf-8'}
+        try:
+            if path == '/robots.txt':
+                return 200, {'Content-Type': 'text/plain'}, ROBOTS
+            if path == '/sitemap.xml':
+                return 200, {'Content-Type': 'application/xml'}, SITEMAP
+            if len(parts) == 2 and parts[0] in ('p', 'slow'):
+                if parts[0] == 'slow':
+                    time.sleep(self.slow_s)
+                return 200, html, self.pages[int(parts[1])]
+            if len(parts) == 2 and parts[0] == 'huge':
+                return 200, html, self.huge[int(parts[1])]
+            if len(parts) == 3 and parts[0] == 'redirect':
+                hops = int(parts[1])
+                target = f'/p/{parts[2]}' if hops <= 1 else f'/redirect/{hops - 1}/{parts[2]}'
+                return 302, {'Location': target}, b''
+        except (ValueError, IndexError):
+            pass
+        return 404, html, b'<html><body>not found</body></html>'
+
+    def handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, with_body: bool) -> None:
+                if site.latency_s:
+                    time.sleep(site.latency_s)
+                status, headers, body = site.respond(self.path)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._send(True)
+
+            def do_HEAD(self):
+                self._send(False)
+
+            def log_message(self, *args):
+                pass
+        return Handler
+
+
+def _self_signed_cert(workdir: str) -> Optional[Tuple[str, str]]:
+    """(certfile, keyfile) made with the openssl CLI, or None when it is not installed."""
+    if not shutil.which('openssl'):
+        return None
+    cert, key = os.path.join(workdir, 'cert.pem'), os.path.join(workdir, 'key.pem')
+    res = subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+                          '-keyout', key, '-out', cert], capture_output=True)
+    return (cert, key) if res.returncode == 0 else None
+
+
+def start_servers(site: FixtureSite, workdir: str) -> Tuple[str, Optional[str], List[ThreadingHTTPServer]]:
+    """Start the HTTP (and if possible HTTPS) fixture servers on free ports; returns their base URLs."""
+    servers = []
+    http = ThreadingHTTPServer(('127.0.0.1', 0), site.handler())
+    http.daemon_threads = True
+    servers.append(http)
+    https_base = None
+    pair = _self_signed_cert(workdir)
+    if pair:
+        https = ThreadingHTTPServer(('127.0.0.1', 0), site.handler())
+        https.daemon_threads = True
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(*pair)
+        https.socket = ctx.wrap_socket(https.socket, server_side=True)
+        servers.append(https)
+        https_base = f'https://127.0.0.1:{https.server_address[1]}'
+    for srv in servers:
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{http.server_address[1]}', https_base, servers
+
+
+class _LocalOnlyAdapter(HTTPAdapter):
+    """Refuses every host but the fixture server, so saved pages cannot reach the network."""
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).hostname
+        if host not in LOCAL_HOSTS:
+            raise requests.exceptions.ConnectionError(f'offline benchmark: {host} is not reachable')
+        return super().send(request, **kwargs)
+
+
+def go_offline() -> None:
+    from fetcher import MAX_WORKERS, get_session
+    adapter = _LocalOnlyAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+    session = get_session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def fixture_urls(n_pages: int, http_base: str, https_base: Optional[str], redirects: int) -> List[Tuple[str, str]]:
+    """(case, url) for every page and case."""
+    urls = []
+    for i in range(n_pages):
+        urls += [('plain', f'{http_base}/p/{i}'), ('slow', f'{http_base}/slow/{i}'), ('huge', f'{http_base}/huge/{i}'),
+                 ('redirect', f'{http_base}/redirect/{redirects}/{i}')]
+        if https_base:
+            urls.append(('broken_tls', f'{https_base}/p/{i}'))
+    urls.append(('missing', f'{http_base}/missing'))
+    return urls
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_bench(name: str, fn: Callable[[Any], Any], items: List[Any], concurrency: int = 1) -> Tuple[Dict[str, Any], List[Any]]:
+    """Call `fn` on every item (on `concurrency` threads); returns (stats, results)."""
+    latencies: List[float] = [0.0] * len(items)
+
+    def _one(i: int) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return fn(items[i])
+        finally:
+            latencies[i] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(_one, range(len(items))))
+    else:
+        results = [_one(i) for i in range(len(items))]
+    wall = time.perf_counter() - t0
+    stats = {
+        'bench': name,
+        'ops': len(items),
+        'wall_s': round(wall, 4),
+        'throughput_per_s': round(len(items) / wall, 2) if wall > 0 else 0.0,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+    return stats, results
+
+
+def run_analyzers(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    import page_scan
+    from analyzer import (count_security_headers, external_resource_ratio, h1_stats, heading_stats, paragraph_stats,
+                          text_to_html_ratio)
+    raw, body = parsed.get('raw_html', ''), parsed.get('body_text', '')
+    return {
+        'text_html_ratio': text_to_html_ratio(raw, body),
+        'heading_stats': heading_stats(parsed.get('headings', [])),
+        'h1_stats': h1_stats(parsed.get('headings', [])),
+        'paragraph_stats': paragraph_stats(parsed.get('paragraph_lengths', [])),
+        'page_scan': page_scan.scan(raw, body),
+        'external_resource_ratio': external_resource_ratio(parsed, '127.0.0.1'),
+        'security_headers': count_security_headers({}),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Regressions against a saved run: p50 up or throughput down by more than `tolerance`."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r['bench']: r for r in json.load(f)['results']}
+    problems = []
+    for r in results:
+        b = baseline.get(r['bench'])
+        if not b:
+            continue
+        if b['p50_ms'] > 0 and r['p50_ms'] > b['p50_ms'] * (1 + tolerance):
+            problems.append(f"{r['bench']}: p50 {b['p50_ms']}ms -> {r['p50_ms']}ms")
+        if b['throughput_per_s'] > 0 and r['throughput_per_s'] < b['throughput_per_s'] * (1 - tolerance):
+            problems.append(f"{r['bench']}: throughput {b['throughput_per_s']}/s -> {r['throughput_per_s']}/s")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=3, help='Passes over the corpus per benchmark (default 3)')
+    ap.add_argument('--concurrency', type=int, default=4, help='Concurrent fetches / audits (default 4)')
+    ap.add_argument('--latency-ms', type=float, default=20, help='Latency added to every fixture response (default 20)')
+    ap.add_argument('--slow-ms', type=float, default=1000, help='Extra latency of the /slow/ pages (default 1000)')
+    ap.add_argument('--huge-mb', type=float, default=5, help='Body size of the /huge/ pages (default 5)')
+    ap.add_argument('--redirects', type=int, default=5, help='Hops in the redirect chain (default 5)')
+    ap.add_argument('--only', nargs='*', help='Run only these benchmarks (fetch_url parse_html analyzers analyze compute_scores)')
+    ap.add_argument('--save', help='Write the results here as JSON')
+    ap.add_argument('--compare', help='Results JSON of an earlier run; exit 1 on regression')
+    ap.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50/throughput regression for --compare (default 0.25)')
+    args = ap.parse_args()
+
+    import http_cache
+    http_cache.configure(None)
+    go_offline()
+    from scorer import compute_scores
+    from scraper import fetch_url, parse_html
+    from website_quality_checker import analyze
+
+    pages = [html for _, _, html in load_pages()]
+    if not pages:
+        print('No sample pages found.')
+        return 1
+    site = FixtureSite(pages, latency_s=args.latency_ms / 1000, slow_s=args.slow_ms / 1000,
+                       huge_bytes=int(args.huge_mb * 2 ** 20))
+    workdir = tempfile.mkdtemp(prefix='bench_audit_')
+    http_base, https_base, servers = start_servers(site, workdir)
+    cases = fixture_urls(len(pages), http_base, https_base, args.redirects)
+    print(f'{len(pages)} pages, {len(cases)} fixture URLs on {http_base}'
+          + (f' and {https_base} (self-signed)' if https_base else ' (no openssl: broken-TLS cases skipped)'))
+
+    want = lambda name: not args.only or name in args.only
+    results: List[Dict[str, Any]] = []
+    urls = [u for _, u in cases] * args.repeat
+    bodies = [p.decode('utf-8') for p in site.pages + site.huge] * args.repeat
+    try:
+        if want('fetch_url'):
+            results.append(run_bench('fetch_url', fetch_url, urls, args.concurrency)[0])
+        parsed = [parse_html(http_base + '/p/0', b) for b in bodies[:len(site.pages) * 2]]
+        if want('parse_html'):
+            results.append(run_bench('parse_html', lambda b: parse_html(http_base + '/p/0', b), bodies)[0])
+        if want('analyzers'):
+            results.append(run_bench('analyzers', run_analyzers, parsed * args.repeat)[0])
+        measures: List[Dict[str, Any]] = []
+        if want('analyze') or want('compute_scores'):
+            stats, measures = run_bench('analyze', lambda u: analyze(u, use_ai=False, use_lighthouse=False), urls, args.concurrency)
+            if want('analyze'):
+                results.append(stats)
+        if want('compute_scores'):
+            results.append(run_bench('compute_scores', compute_scores, measures * max(1, 2000 // max(1, len(measures))))[0])
+    finally:
+        for srv in servers:
+            srv.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'bench':16} {'ops':>6} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'peak RSS MB':>12}")
+    for r in results:
+        print(f"{r['bench']:16} {r['ops']:6} {r['throughput_per_s']:10} {r['p50_ms']:10} {r['p95_ms']:10} {r['peak_rss_mb']:12}")
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f'Wrote {args.save}')
+    if args.compare:
+        problems = compare(results, args.compare, args.tolerance)
+        for p in problems:
+            print(f'REGRESSION {p}')
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
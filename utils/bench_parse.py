@@ -0,0 +1,157 @@
+"""bench_parse.py
+
+Benchmark parse_html backends against the previous multi-pass implementation on the saved pages
+in samples/ (raw_html inside the JSON reports) and generated-sites/.
+
+Usage: python bench_parse.py [--repeat 20] [--inflate 1]
+"""
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from scraper import parse_html
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_html_multipass(base_url: str, html: str) -> Dict:
+    """The original parse_html: one find_all() walk per element type."""
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except Exception:
+        soup = BeautifulSoup(html, "html.parser")
+
+    meta = {}
+    title_tag = soup.find("title")
+    meta['title'] = title_tag.get_text(strip=True) if title_tag else ""
+    meta_tags = {}
+    for m in soup.find_all("meta"):
+        if m.get('name'):
+            meta_tags[m.get('name').lower()] = m.get('content', '')
+        elif m.get('property'):
+            meta_tags[m.get('property').lower()] = m.get('content', '')
+    meta['meta'] = meta_tags
+    headings = []
+    for level in range(1,7):
+        for h in soup.find_all(f'h{level}'):
+            headings.append({'tag': f'h{level}', 'text': h.get_text(strip=True)})
+    body = soup.body.get_text(separator=' ', strip=True) if soup.body else ''
+    links = []
+    for a in soup.find_all('a', href=True):
+        href = a['href'].strip()
+        links.append({'href': href, 'url': urljoin(base_url, href), 'text': a.get_text(strip=True)})
+    images = []
+    for img in soup.find_all('img'):
+        src = img.get('src') or ''
+        images.append({'src': urljoin(base_url, src), 'alt': img.get('alt',''), 'title': img.get('title','')})
+    css_links = []
+    for l in soup.find_all('link', href=True):
+        rel = l.get('rel')
+        if not rel:
+            continue
+        rels = rel if isinstance(rel, (list, tuple)) else [rel]
+        if any('stylesheet' in str(r).lower() for r in rels):
+            css_links.append(urljoin(base_url, l['href']))
+    inline_styles = [tag.get('style','') for tag in soup.find_all(True) if tag.get('style')]
+    scripts = []
+    for s in soup.find_all('script'):
+        src = s.get('src') or ''
+        scripts.append({'src': urljoin(base_url, src) if src else '', 'inline': not bool(src), 'text_len': len(s.get_text() or '')})
+    favicon_tag = soup.find('link', rel=lambda r: r and 'icon' in str(r).lower())
+    favicon = urljoin(base_url, favicon_tag['href']) if favicon_tag and favicon_tag.get('href') else None
+    paragraphs = [p.get_text(strip=True) for p in soup.find_all('p')]
+    paragraph_lengths = [len(p.split()) for p in paragraphs]
+    social_domains = ('facebook.com','twitter.com','linkedin.com','instagram.com','youtube.com')
+    social_links = [a['href'] for a in soup.find_all('a', href=True) if any(d in a['href'] for d in social_domains)]
+    viewport = any(k for k in meta_tags.keys() if 'viewport' in k) or bool(soup.find('meta', attrs={'name':'viewport'}))
+    canonical_tag = soup.find('link', rel='canonical')
+    canonical = canonical_tag['href'] if canonical_tag and canonical_tag.get('href') else None
+    return {
+        'meta': meta, 'headings': headings, 'body_text': body, 'links': links, 'images': images,
+        'css_links': css_links, 'inline_styles': inline_styles, 'scripts': scripts, 'favicon': favicon,
+        'paragraphs': paragraphs, 'paragraph_lengths': paragraph_lengths, 'social_links': social_links,
+        'viewport': viewport, 'canonical': canonical, 'raw_html': html
+    }
+
+
+def load_pages() -> List[Tuple[str, str, str]]:
+    """Return (name, url, html) for every saved page we can find."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(HERE, 'samples', '*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+        except Exception:
+            continue
+        html = report.get('measures', {}).get('parsed', {}).get('raw_html')
+        if html:
+            pages.append((os.path.basename(path), report.get('url', 'https://example.com/'), html))
+    for path in sorted(glob.glob(os.path.join(HERE, 'generated-sites', '*', 'index.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((os.path.relpath(path, HERE), 'https://example.com/', f.read()))
+    return pages
+
+
+def inflate(html: str, times: int) -> str:
+    """Repeat the <body> contents to simulate a heavy page."""
+    if times <= 1:
+        return html
+    lo = html.lower()
+    start, end = lo.find('<body'), lo.rfind('</body>')
+    if start == -1 or end == -1:
+        return html * times
+    start = lo.find('>', start) + 1
+    return html[:start] + html[start:end] * times + html[end:]
+
+
+def diff_keys(a: Dict, b: Dict) -> List[str]:
+    return [k for k in a if a.get(k) != b.get(k)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=20)
+    ap.add_argument('--inflate', type=int, default=1, help='Repeat each page body N times')
+    args = ap.parse_args()
+
+    impls = {
+        'multipass': parse_html_multipass,
+        'soup': lambda u, h: parse_html(u, h, backend='soup'),
+        'lxml': lambda u, h: parse_html(u, h, backend='lxml'),
+    }
+    pages = [(n, u, inflate(h, args.inflate)) for n, u, h in load_pages()]
+    if not pages:
+        print('No sample pages found.')
+        return
+
+    print(f"{'page':45} {'KB':>7} " + ' '.join(f'{k:>11}' for k in impls) + '  mismatches vs multipass')
+    totals = {k: 0.0 for k in impls}
+    for name, url, html in pages:
+        baseline = parse_html_multipass(url, html)
+        row = []
+        notes = []
+        for key, fn in impls.items():
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                res = fn(url, html)
+            took = (time.perf_counter() - t0) / args.repeat
+            totals[key] += took
+            row.append(f'{took * 1000:9.2f}ms')
+            if key != 'multipass':
+                bad = diff_keys(baseline, res)
+                if bad:
+                    notes.append(f"{key}: {','.join(bad)}")
+        print(f'{name[:45]:45} {len(html) / 1024:7.1f} ' + ' '.join(f'{c:>11}' for c in row) + '  ' + ('; '.join(notes) or 'none'))
+    base = totals['multipass']
+    print('total speedup vs multipass: ' + ', '.join(f'{k} {base / v:.2f}x' for k, v in totals.items() if v and k != 'multipass'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""bench_prefilter.py
+
+Measure how well vision_prefilter agrees with the GPT vision verdict and how many model calls it saves.
+
+A labelled sample is a pair `<name>.png` (1280x720 viewport screenshot) + `<name>.json`
+({"label": "YES" | "NO", "dom_styles": {...}, "url": ...}). Build a set from live sites with
+--collect, which renders each URL once and asks the model (this costs one vision call per URL).
+
+Usage:
+python bench_prefilter.py --samples prefilter_samples
+python bench_prefilter.py --collect urls.txt --samples prefilter_samples
+"""
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import vision_prefilter
+
+
+def load_samples(root: str) -> List[Tuple[str, bytes, dict]]:
+    samples = []
+    for path in sorted(glob.glob(os.path.join(root, '*.json'))):
+        png = path[:-5] + '.png'
+        if not os.path.exists(png):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if str(meta.get('label', '')).upper() not in ('YES', 'NO'):
+            continue
+        with open(png, 'rb') as f:
+            samples.append((os.path.basename(path)[:-5], f.read(), meta))
+    return samples
+
+
+def collect(url_file: str, root: str) -> None:
+    """Render every URL and label it with the model, bypassing the prefilter and the verdict cache."""
+    from fetcher import run_sync
+    from playwright_capture import render_page
+    from report_io import report_path
+    from simplevison import analyze_screenshot_bytes
+    from website_quality_checker import read_urls
+
+    os.makedirs(root, exist_ok=True)
+    for url in read_urls(url_file):
+        rendered = run_sync(render_page(url))
+        if rendered.get('error'):
+            print(f'{url}: {rendered["error"]}')
+            continue
+        try:
+            verdict = analyze_screenshot_bytes(rendered['screenshot_png'])
+        except Exception as e:
+            print(f'{url}: model error {e}')
+            continue
+        base = report_path(root, url, ext='')
+        with open(base + '.png', 'wb') as f:
+            f.write(rendered['screenshot_png'])
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'label': verdict.get('redesign_candidate'), 'dom_styles': rendered.get('dom_styles')}, f)
+        print(f'{url}: {verdict.get("redesign_candidate")}')
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--samples', default='prefilter_samples', help='Directory of <name>.png + <name>.json pairs')
+    ap.add_argument('--collect', metavar='URLS', help='Render and label these URLs into --samples first')
+    ap.add_argument('--verbose', action='store_true', help='Print features for every sample')
+    args = ap.parse_args()
+
+    if args.collect:
+        collect(args.collect, args.samples)
+    if vision_prefilter.np is None:
+        print('numpy and Pillow are required.')
+        return
+    samples = load_samples(args.samples)
+    if not samples:
+        print(f'No labelled samples in {args.samples}.')
+        return
+
+    confusion: Dict[Tuple[str, str], int] = {}
+    took = 0.0
+    for name, png, meta in samples:
+        label = meta['label'].upper()
+        t0 = time.perf_counter()
+        verdict = vision_prefilter.classify(png, meta.get('dom_styles'))
+        took += time.perf_counter() - t0
+        decided = verdict['redesign_candidate'] if verdict else 'LLM'
+        confusion[(label, decided)] = confusion.get((label, decided), 0) + 1
+        if args.verbose:
+            feats = verdict['features'] if verdict else {
+                'image': vision_prefilter.image_features(png), 'dom': vision_prefilter.dom_features(meta.get('dom_styles'))}
+            print(f'{name[:40]:40} label={label:3} prefilter={decided:3} {json.dumps(feats, default=str)}')
+
+    n = len(samples)
+    settled = sum(v for (_, d), v in confusion.items() if d != 'LLM')
+    agree = sum(v for (l, d), v in confusion.items() if l == d)
+    print(f"{'label':6} {'->YES':>6} {'->NO':>6} {'->LLM':>6}")
+    for label in ('YES', 'NO'):
+        print(f"{label:6} " + ' '.join(f"{confusion.get((label, d), 0):6}" for d in ('YES', 'NO', 'LLM')))
+    print(f'samples: {n}, settled locally: {settled} ({settled / n:.1%} of vision calls saved)')
+    print(f'agreement with model on settled samples: {agree / settled:.1%}' if settled else 'agreement: n/a (nothing settled)')
+    print(f'mean prefilter time: {took / n * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
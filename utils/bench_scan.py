@@ -0,0 +1,81 @@
+"""bench_scan.py
+
+Compare page_scan.scan() with the scans it replaced (find_contact_info over raw_html + body_text,
+the copyright regex in analyze(), has_structured_data and the lowercased booking check in
+_heuristic_suggestions) on the saved pages inflated to multi-MB documents.
+
+Usage: python bench_scan.py [--mb 4] [--repeat 3]
+"""
+from __future__ import annotations
+import argparse
+import math
+import re
+import time
+from typing import Any, Dict
+
+from bench_parse import inflate, load_pages
+from page_scan import scan
+from scraper import parse_html
+
+
+def legacy_scan(raw_html: str, body_text: str) -> Dict[str, Any]:
+    """The pre-page_scan code paths, verbatim."""
+    text = raw_html + ' ' + body_text
+    emails = re.findall(r'[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,6}', text)
+    phones = re.findall(r'\+?\d[\d \-()]{7,}\d', text)
+    addresses = ['found'] if 'address' in text.lower() or 'street' in text.lower() else []
+    m = re.search(r'©?\s*(?:copyright)?\s*(\d{4})', raw_html, flags=re.I)
+    schema = 'application/ld+json' in raw_html or 'schema.org' in raw_html
+    raw = raw_html.lower()
+    booking = 'book' in raw or 'appointment' in raw
+    return {'emails': set(emails), 'phones': set(phones), 'addresses': addresses, 'year': m.group(1) if m else None,
+            'schema': schema, 'booking': booking}
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--mb', type=float, default=4, help='Inflate every page to about this many MB (default 4)')
+    ap.add_argument('--repeat', type=int, default=3, help='Best of N runs (default 3)')
+    args = ap.parse_args()
+
+    pages = load_pages()
+    if not pages:
+        print('No sample pages found.')
+        return
+    print(f"{'page':45} {'MB':>6} {'legacy ms':>10} {'scan ms':>10} {'speedup':>8}  differences")
+    total_old = total_new = 0.0
+    for name, url, html in pages:
+        html = inflate(html, max(1, math.ceil(args.mb * 2 ** 20 / max(1, len(html)))))
+        body = parse_html(url, html).get('body_text', '')
+        old = legacy_scan(html, body)
+        new = scan(html, body)
+        diffs = []
+        for key in ('emails', 'phones'):
+            if old[key] != set(new[key]):
+                diffs.append(f'{key} -{len(old[key] - set(new[key]))}/+{len(set(new[key]) - old[key])}')
+        if old['addresses'] != new['addresses']:
+            diffs.append('addresses')
+        if old['schema'] != bool(new['schema_markers']):
+            diffs.append('schema')
+        if old['booking'] != bool(new['booking_keywords']):
+            diffs.append('booking')
+        t_old = _timed(lambda: legacy_scan(html, body), args.repeat)
+        t_new = _timed(lambda: scan(html, body), args.repeat)
+        total_old += t_old
+        total_new += t_new
+        print(f"{name[:45]:45} {len(html) / 2 ** 20:6.1f} {t_old * 1000:10.1f} {t_new * 1000:10.1f} {t_old / t_new:7.1f}x  "
+              f"{', '.join(diffs) or '-'} (legacy year {old['year']}, copyright years {new['copyright_years'] or '-'})")
+    print(f"{'total':45} {'':6} {total_old * 1000:10.1f} {total_new * 1000:10.1f} {total_old / total_new:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
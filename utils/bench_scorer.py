@@ -0,0 +1,106 @@
+"""bench_scorer.py
+
+Compare scorer.compute_scores (one dict at a time) with batch_scorer.compute_scores_batch on a
+corpus of saved reports, and check that both give identical scores.
+
+The corpus is every report in samples/*.json plus any JSON-lines files passed with --reports,
+replicated (with jittered inputs) up to --rows rows.
+
+Usage: python bench_scorer.py [--rows 50000] [--reports batch_results.jsonl ...]
+"""
+from __future__ import annotations
+import argparse
+import copy
+import glob
+import json
+import os
+import random
+import time
+from typing import Dict, List
+
+from batch_scorer import compute_scores_batch, extract_columns, score_columns
+from scorer import compute_scores
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_measures(paths: List[str]) -> List[Dict]:
+    out = []
+    for path in sorted(glob.glob(os.path.join(HERE, 'samples', '*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+        except Exception:
+            continue
+        if report.get('measures'):
+            out.append(report['measures'])
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    report = json.loads(line)
+                    if report.get('measures'):
+                        out.append(report['measures'])
+    return out
+
+
+def jitter(measures: Dict, rng: random.Random) -> Dict:
+    """Vary the numeric inputs so the corpus exercises every branch of the scorer."""
+    m = copy.copy(measures)
+    m['response_time_s'] = round(rng.uniform(0, 12), 3)
+    m['broken_links'] = rng.randint(0, 8)
+    m['text_html_ratio'] = round(rng.random(), 3)
+    m['images_with_alt_ratio'] = round(rng.random(), 3)
+    m['keyword_relevance'] = round(rng.random(), 3)
+    m['external_resource_ratio'] = round(rng.random(), 3)
+    m['has_ssl'] = rng.random() < 0.7
+    m['mobile_friendly'] = rng.random() < 0.6
+    m['h1_stats'] = {'h1_count': rng.randint(0, 3)}
+    m['paragraph_stats'] = {'avg_words': rng.uniform(0, 150)}
+    if rng.random() < 0.3:
+        m['lighthouse'] = {k: round(rng.random(), 2) for k in ('performance', 'accessibility', 'seo', 'best-practices')}
+    else:
+        m['lighthouse'] = None
+    return m
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, default=50000)
+    ap.add_argument('--reports', nargs='*', default=[], help='JSON-lines report files to include')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    base = load_measures(args.reports)
+    if not base:
+        print('No reports found.')
+        return
+    rng = random.Random(args.seed)
+    corpus = base + [jitter(base[i % len(base)], rng) for i in range(max(0, args.rows - len(base)))]
+    print(f'{len(corpus)} rows from {len(base)} reports')
+
+    t0 = time.perf_counter()
+    scalar = [compute_scores(m) for m in corpus]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cols = extract_columns(corpus)
+    t_extract = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    score_columns(cols)
+    t_score = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch = compute_scores_batch(corpus)
+    t_batch = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(scalar, batch) if a != b)
+    print(f'scalar compute_scores:      {t_scalar * 1000:9.1f}ms')
+    print(f'extract_columns:            {t_extract * 1000:9.1f}ms  (once per corpus; reusable across weight profiles)')
+    print(f'score_columns:              {t_score * 1000:9.1f}ms  ({t_scalar / max(t_score, 1e-9):.0f}x faster than scalar)')
+    print(f'compute_scores_batch (all): {t_batch * 1000:9.1f}ms  ({t_scalar / t_batch:.1f}x)')
+    print(f"mismatching rows: {mismatches}" + ('' if not mismatches else f" (first: {next((a, b) for a, b in zip(scalar, batch) if a != b)})"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""browser_pool.py
+
+Long-lived Playwright Chromium shared by every render in the process.
+
+The pool owns one browser on a dedicated event-loop thread and hands each job a fresh context,
+so callers on any thread or event loop can render concurrently without paying browser startup.
+The browser is replaced after `recycle_after` pages or once its processes grow past `max_rss_mb`.
+"""
+from __future__ import annotations
+import asyncio
+import atexit
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+DEFAULT_MAX_PAGES = 4
+DEFAULT_RECYCLE_AFTER = 100
+DEFAULT_MAX_RSS_MB = 1536
+# RSS is sampled through CDP, so only check it every few pages.
+RSS_CHECK_EVERY = 10
+
+PageJob = Callable[[Any], Awaitable[Any]]
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        pass
+    return 0
+
+
+class BrowserPool:
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES, recycle_after: int = DEFAULT_RECYCLE_AFTER,
+                 max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB, headless: bool = True):
+        self.max_pages = max(1, max_pages)
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.pages_served = 0
+        self.browsers_launched = 0
+        self._start_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # everything below is only touched on the pool's own loop
+        self._pw = None
+        self._browser = None
+        self._browser_pages = 0
+        self._active: Dict[Any, int] = {}
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+
+    # --- loop thread -------------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _serve():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_serve, name='browser-pool', daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    # --- coroutines that run on the pool loop ------------------------------------------------
+
+    async def _needs_recycle(self) -> bool:
+        if self._browser is None or not self._browser.is_connected():
+            return True
+        if self.recycle_after and self._browser_pages >= self.recycle_after:
+            return True
+        if self.max_rss_mb and self._browser_pages and self._browser_pages % RSS_CHECK_EVERY == 0:
+            rss = await self._browser_rss()
+            if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+                return True
+        return False
+
+    async def _browser_rss(self) -> Optional[int]:
+        """Total RSS of the browser's processes (Linux only), or None if it cannot be measured."""
+        try:
+            session = await self._browser.new_browser_cdp_session()
+            try:
+                info = await session.send('SystemInfo.getProcessInfo')
+            finally:
+                await session.detach()
+            total = sum(_rss_bytes(int(p['id'])) for p in info.get('processInfo', []))
+            return total or None
+        except Exception:
+            return None
+
+    async def _acquire_browser(self):
+        async with self._launch_lock:
+            if await self._needs_recycle():
+                if self._pw is None:
+                    from playwright.async_api import async_playwright
+                    self._pw = await async_playwright().start()
+                old = self._browser
+                self._browser = await self._pw.chromium.launch(headless=self.headless)
+                self._browser_pages = 0
+                self.browsers_launched += 1
+                if old is not None and not self._active.get(old):
+                    self._active.pop(old, None)
+                    await self._close_browser(old)
+            browser = self._browser
+            self._active[browser] = self._active.get(browser, 0) + 1
+            self._browser_pages += 1
+            return browser
+
+    async def _release_browser(self, browser) -> None:
+        self._active[browser] -= 1
+        if browser is not self._browser and self._active[browser] <= 0:
+            self._active.pop(browser, None)
+            await self._close_browser(browser)
+
+    async def _close_browser(self, browser) -> None:
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    async def _run(self, job: PageJob, context_opts: Dict[str, Any]) -> Any:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_pages)
+            self._launch_lock = asyncio.Lock()
+        async with self._sem:
+            browser = await self._acquire_browser()
+            context = None
+            try:
+                context = await browser.new_context(**context_opts)
+                page = await context.new_page()
+                return await job(page)
+            finally:
+                self.pages_served += 1
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                await self._release_browser(browser)
+
+    async def _shutdown(self) -> None:
+        browsers = set(self._active)
+        if self._browser is not None:
+            browsers.add(self._browser)
+        for browser in browsers:
+            await self._close_browser(browser)
+        self._active.clear()
+        self._browser = None
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+            self._pw = None
+
+    # --- public API (callable from any thread / loop) ----------------------------------------
+
+    async def run(self, job: PageJob, **context_opts) -> Any:
+        """Run `await job(page)` in a fresh browser context; usable from any event loop."""
+        fut = asyncio.run_coroutine_threadsafe(self._run(job, context_opts), self._ensure_loop())
+        return await asyncio.wrap_future(fut)
+
+    def run_sync(self, job: PageJob, timeout: Optional[float] = None, **context_opts) -> Any:
+        """Blocking variant of run() for sync callers (any thread, but not the pool's own loop)."""
+        fut = asyncio.run_coroutine_threadsafe(self._run(job, context_opts), self._ensure_loop())
+        return fut.result(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {'pages_served': self.pages_served, 'browsers_launched': self.browsers_launched}
+
+    def close(self) -> None:
+        with self._start_lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(30)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(5)
+        self._sem = None
+        self._launch_lock = None
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def configure(**kwargs) -> BrowserPool:
+    """Replace the process-wide pool (e.g. to change max_pages) and return it."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, BrowserPool(**kwargs)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def get_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+    return _pool
+
+
+@atexit.register
+def _close_pool() -> None:
+    if _pool is not None:
+        _pool.close()
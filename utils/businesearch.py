@@ -1,6 +1,186 @@
+import os
 import requests
 import time
 import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, MutableMapping, Optional, Tuple
+from cachetools import TTLCache
+
+# Overridable so tests and benchmarks can point at a local fake Places server.
+PLACES_API_BASE = os.environ.get("PLACES_API_BASE", "https://maps.googleapis.com/maps/api/place")
+DETAIL_FIELDS = "name,formatted_address,website,rating,user_ratings_total,url"
+# Google caps Nearby Search at 3 pages of 20.
+MAX_NEARBY_RESULTS = 60
+# A next_page_token takes ~2s to become valid.
+PAGE_TOKEN_DELAY_S = 2.0
+
+# place_id -> details, shared by every search in the process (jittered searches overlap heavily)
+details_cache: MutableMapping[str, Dict] = TTLCache(maxsize=20000, ttl=24 * 3600)
+_details_cache_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate` calls per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+def _session() -> requests.Session:
+    s = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def _json_object(resp: requests.Response) -> Optional[Dict]:
+    """The JSON object in `resp`, or None for an HTML error page, a truncated body or non-object JSON."""
+    try:
+        data = resp.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def get_place_details(api_key: str, place_id: str, session: Optional[requests.Session] = None,
+                      limiter: Optional[TokenBucket] = None, base_url: Optional[str] = None) -> Dict:
+    """Fetch detailed info for a place including website (cached by place_id)."""
+    with _details_cache_lock:
+        cached = details_cache.get(place_id)
+    if cached is not None:
+        return cached
+    if limiter:
+        limiter.acquire()
+    params = {"place_id": place_id, "fields": DETAIL_FIELDS, "key": api_key}
+    try:
+        resp = (session or requests).get(f"{base_url or PLACES_API_BASE}/details/json", params=params, timeout=15)
+    except requests.RequestException:
+        return {}
+    if resp.status_code != 200:
+        return {}
+    data = _json_object(resp)
+    if data is None:
+        return {}
+    result = data.get("result", {})
+    if result:
+        with _details_cache_lock:
+            details_cache[place_id] = result
+    return result
+
+
+def fetch_nearby_page(api_key: str, params: Dict, session: Optional[requests.Session] = None,
+                      limiter: Optional[TokenBucket] = None, base_url: Optional[str] = None,
+                      token_delay_s: float = 0.0) -> Tuple[List[Dict], Optional[str]]:
+    """Fetch one Nearby Search page; returns (results, next_page_token).
+
+    When following a page token, waits `token_delay_s` first and retries briefly while Google
+    still reports the token as INVALID_REQUEST.
+    """
+    if token_delay_s:
+        time.sleep(token_delay_s)
+    url = f"{base_url or PLACES_API_BASE}/nearbysearch/json"
+    for attempt in range(3):
+        if limiter:
+            limiter.acquire()
+        try:
+            response = (session or requests).get(url, params=params, timeout=15)
+        except requests.RequestException:
+            return [], None
+        if response.status_code != 200:
+            return [], None
+        data = _json_object(response)
+        if data is None:
+            return [], None
+        if data.get("status") == "INVALID_REQUEST" and "pagetoken" in params and attempt < 2:
+            time.sleep(1.0)
+            continue
+        return data.get("results", []), data.get("next_page_token")
+    return [], None
+
+
+def _to_business(details: Dict) -> Dict:
+    return {
+        "name": details.get("name"),
+        "address": details.get("formatted_address"),
+        "rating": details.get("rating"),
+        "user_ratings_total": details.get("user_ratings_total"),
+        "website": details.get("website"),
+        "google_maps_url": details.get("url")
+    }
+
+
+def jitter_location(lat_lng, radius_meters=5000):
+    """Slightly jitter the lat/lng to get different nearby search results."""
+    lat, lng = map(float, lat_lng.split(","))
+    delta_deg = radius_meters / 111_000  # approx. degrees per meter
+    lat += random.uniform(-delta_deg / 2, delta_deg / 2)
+    lng += random.uniform(-delta_deg / 2, delta_deg / 2)
+    return f"{lat},{lng}"
+
+
+def iter_local_businesses(
+    api_key: str,
+    location: str,
+    radius: int = 5000,
+    business_type: str = "restaurant",
+    randomize_location: bool = True,
+    workers: int = 8,
+    rate_per_s: float = 10.0,
+    base_url: Optional[str] = None,
+    limiter: Optional[TokenBucket] = None,
+) -> Iterator[Dict]:
+    """Yield businesses as soon as their details arrive.
+
+    Detail lookups run concurrently under a token-bucket rate limit, and the wait for the next
+    page token overlaps with detail fetches for the current page.
+    """
+    search_location = jitter_location(location, radius) if randomize_location else location
+    session = _session()
+    limiter = limiter or TokenBucket(rate_per_s, burst=max(1, workers))
+    first = {"location": search_location, "radius": radius, "type": business_type, "key": api_key}
+    seen = set()
+    listed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers) + 1) as pool:
+        page_fut = pool.submit(fetch_nearby_page, api_key, first, session, limiter, base_url)
+        pending = set()
+        while page_fut is not None or pending:
+            done, _ = wait(pending | ({page_fut} if page_fut else set()), return_when=FIRST_COMPLETED)
+            if page_fut is not None and page_fut in done:
+                results, token = page_fut.result()
+                page_fut = None
+                for place in results:
+                    place_id = place.get("place_id")
+                    if not place_id or place_id in seen:
+                        continue
+                    seen.add(place_id)
+                    pending.add(pool.submit(get_place_details, api_key, place_id, session, limiter, base_url))
+                listed += len(results)
+                if token and listed < MAX_NEARBY_RESULTS:
+                    page_fut = pool.submit(fetch_nearby_page, api_key, {"pagetoken": token, "key": api_key},
+                                           session, limiter, base_url, PAGE_TOKEN_DELAY_S)
+            for fut in done & pending:
+                pending.discard(fut)
+                yield _to_business(fut.result())
+
 
 def find_local_businesses(
     api_key: str,
@@ -8,7 +188,10 @@ def find_local_businesses(
     radius: int = 5000,
     business_type: str = "restaurant",
     max_results: int = 20,
-    randomize_location: bool = True
+    randomize_location: bool = True,
+    workers: int = 8,
+    rate_per_s: float = 10.0,
+    base_url: Optional[str] = None,
 ):
     """
     Find local businesses using Google Places API with randomized results.
@@ -20,75 +203,17 @@ def find_local_businesses(
         business_type (str): Type of business (see Google Places types).
         max_results (int): Maximum number of businesses to return.
         randomize_location (bool): Slightly randomize location to vary results.
+        workers (int): Concurrent Place Details requests.
+        rate_per_s (float): Upper bound on Places API calls per second.
+        base_url (str): Places API base URL (defaults to PLACES_API_BASE).
 
     Returns:
         List[dict]: Each dict contains name, address, rating, user_ratings_total, website, google_maps_url
     """
-
-    def jitter_location(lat_lng, radius_meters=5000):
-        """Slightly jitter the lat/lng to get different nearby search results."""
-        lat, lng = map(float, lat_lng.split(","))
-        delta_deg = radius_meters / 111_000  # approx. degrees per meter
-        lat += random.uniform(-delta_deg / 2, delta_deg / 2)
-        lng += random.uniform(-delta_deg / 2, delta_deg / 2)
-        return f"{lat},{lng}"
-
-    def get_place_details(place_id):
-        """Fetch detailed info for a place including website."""
-        url = "https://maps.googleapis.com/maps/api/place/details/json"
-        params = {
-            "place_id": place_id,
-            "fields": "name,formatted_address,website,rating,user_ratings_total,url",
-            "key": api_key
-        }
-        resp = requests.get(url, params=params)
-        if resp.status_code != 200:
-            return {}
-        return resp.json().get("result", {})
-
-    # Optionally randomize location
-    search_location = jitter_location(location, radius) if randomize_location else location
-
-    all_businesses = []
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        "location": search_location,
-        "radius": radius,
-        "type": business_type,
-        "key": api_key
-    }
-
-    # Fetch all available pages (up to 3)
-    while url and len(all_businesses) < 60:
-        response = requests.get(url, params=params if url.endswith("json") else None)
-        if response.status_code != 200:
-            break
-        data = response.json()
-
-        for place in data.get("results", []):
-            place_id = place.get("place_id")
-            if not place_id:
-                continue
-
-            details = get_place_details(place_id)
-            all_businesses.append({
-                "name": details.get("name"),
-                "address": details.get("formatted_address"),
-                "rating": details.get("rating"),
-                "user_ratings_total": details.get("user_ratings_total"),
-                "website": details.get("website"),
-                "google_maps_url": details.get("url")
-            })
-            time.sleep(0.1)  # avoid rate limit
-
-        # Check if there’s another page
-        next_page_token = data.get("next_page_token")
-        if next_page_token:
-            url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-            params = {"pagetoken": next_page_token, "key": api_key}
-            time.sleep(2)  # wait for token to activate
-        else:
-            url = None
+    all_businesses = list(iter_local_businesses(
+        api_key, location, radius=radius, business_type=business_type,
+        randomize_location=randomize_location, workers=workers, rate_per_s=rate_per_s, base_url=base_url,
+    ))
 
     # Randomly sample from all businesses
     if not all_businesses:
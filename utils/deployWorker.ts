@@ -0,0 +1,113 @@
+// Long-running deploy worker. Python (deploy_client.py) starts it once and talks to it over
+// stdin/stdout, one JSON object per line:
+//
+//   in:  {"id": "job-1", "prompt": "...", "siteFolderName": "site-123"}
+//   out: {"id": "job-1", "ok": true, "url": "https://...", "elapsedMs": 5321}
+//        {"id": "job-1", "ok": false, "error": "...", "elapsedMs": 12}
+//
+// Jobs run concurrently up to --concurrency (default 3). The worker prints {"ready": true, ...}
+// once started and exits when stdin closes and every job has finished. All logging goes to
+// stderr so stdout carries only protocol lines.
+//
+// --provider stub (or DEPLOY_PROVIDER=stub) replaces OpenAI + Vercel with a local stand-in that
+// returns https://<siteFolderName>.stub.local after --stub-delay-ms, for tests.
+import * as readline from "readline";
+
+interface DeployJob {
+  id: string;
+  prompt: string;
+  siteFolderName: string;
+}
+
+interface DeployResult {
+  id: string;
+  ok: boolean;
+  url?: string;
+  error?: string;
+  elapsedMs: number;
+}
+
+type Provider = (job: DeployJob) => Promise<{ url: string }>;
+
+function argValue(name: string): string | undefined {
+  const i = process.argv.indexOf(name);
+  return i !== -1 ? process.argv[i + 1] : undefined;
+}
+
+const concurrency = Math.max(1, Number(argValue("--concurrency") || process.env.DEPLOY_CONCURRENCY || 3));
+const providerName = argValue("--provider") || process.env.DEPLOY_PROVIDER || "vercel";
+const stubDelayMs = Number(argValue("--stub-delay-ms") || 0);
+
+// generateAndDeploySite logs with console.log; keep stdout for the protocol.
+console.log = (...args: unknown[]) => console.error(...args);
+
+function send(obj: object): void {
+  process.stdout.write(JSON.stringify(obj) + "\n");
+}
+
+async function stubProvider(job: DeployJob): Promise<{ url: string }> {
+  if (!job.prompt) throw new Error("empty prompt");
+  await new Promise((r) => setTimeout(r, stubDelayMs));
+  return { url: `https://${job.siteFolderName}.stub.local` };
+}
+
+let realProvider: Provider | undefined;
+async function vercelProvider(job: DeployJob): Promise<{ url: string }> {
+  if (!realProvider) {
+    // loaded once, on the first real deploy, so the stub never needs openai/node-fetch
+    const mod = await import("./generateAndDeploy.js");
+    realProvider = (j) => mod.generateAndDeploySite({ prompt: j.prompt, siteFolderName: j.siteFolderName });
+  }
+  return realProvider(job);
+}
+
+const provider: Provider = providerName === "stub" ? stubProvider : vercelProvider;
+
+let running = 0;
+let inputClosed = false;
+const waiting: DeployJob[] = [];
+
+function maybeExit(): void {
+  if (inputClosed && running === 0 && waiting.length === 0) process.exit(0);
+}
+
+function pump(): void {
+  while (running < concurrency && waiting.length > 0) {
+    const job = waiting.shift() as DeployJob;
+    running++;
+    const started = Date.now();
+    provider(job)
+      .then(({ url }) => ({ id: job.id, ok: true, url, elapsedMs: Date.now() - started }) as DeployResult)
+      .catch((err: unknown) => ({ id: job.id, ok: false, error: String((err as Error)?.message || err), elapsedMs: Date.now() - started }) as DeployResult)
+      .then((res) => {
+        send(res);
+        running--;
+        pump();
+        maybeExit();
+      });
+  }
+}
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on("line", (line) => {
+  if (!line.trim()) return;
+  let job: DeployJob;
+  try {
+    job = JSON.parse(line);
+  } catch {
+    send({ id: null, ok: false, error: "invalid JSON", elapsedMs: 0 });
+    return;
+  }
+  if (!job.id || !job.siteFolderName) {
+    send({ id: job.id ?? null, ok: false, error: "id and siteFolderName are required", elapsedMs: 0 });
+    return;
+  }
+  waiting.push(job);
+  pump();
+});
+rl.on("close", () => {
+  inputClosed = true;
+  maybeExit();
+});
+
+send({ ready: true, provider: providerName, concurrency });
@@ -0,0 +1,208 @@
+"""deploy_client.py
+
+Python side of the persistent Node deploy worker (deployWorker.js). The worker is started once and
+fed deploy jobs as JSON lines on stdin; results come back on stdout as jobs finish, so Node start-up
+and module loading are paid once per process instead of once per site. The worker runs up to
+`concurrency` deploys at a time.
+
+provider='stub' (or DEPLOY_PROVIDER=stub) swaps OpenAI + Vercel for a local stand-in.
+"""
+from __future__ import annotations
+import atexit
+import hashlib
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional
+
+WORKER_JS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'deployWorker.js')
+DEFAULT_CONCURRENCY = 3
+DEFAULT_TIMEOUT_S = 600
+
+PROMPT_TEMPLATE = (
+    'Create a modern, professional, and visually appealing lead generation website for a business called "{name}". '
+    'The website should effectively showcase the company\'s services, highlight its unique value propositions, and '
+    'include clear calls to action to capture potential client information. Use a clean and user-friendly design '
+    'that aligns with the industry, responsive on desktop and mobile. Include sections such as About Us, Services, '
+    'Testimonials, and Contact Information.{details}'
+)
+
+
+def build_prompt(report: Dict[str, Any]) -> str:
+    """Per-site deploy prompt from an audit report (vision verdict, business details, suggestions)."""
+    measures = report.get('measures') or {}
+    verdict = measures.get('ai_verdict') or {}
+    business = report.get('business') or {}
+    name = verdict.get('business_name') or business.get('name') or (measures.get('meta') or {}).get('title') or report.get('url', '')
+    details = []
+    if verdict.get('site_description'):
+        details.append(f"Site purpose: {verdict['site_description']}")
+    if business.get('address'):
+        details.append(f"Address: {business['address']}")
+    if verdict.get('reasons'):
+        details.append('Problems with the current site to solve: ' + '; '.join(verdict['reasons']))
+    if measures.get('ai_suggestions'):
+        details.append('Also: ' + '; '.join(measures['ai_suggestions']))
+    details.append(f"Current site: {report.get('url', '')}")
+    return PROMPT_TEMPLATE.format(name=name, details=''.join(f' {d}.' for d in details))
+
+
+def site_folder_name(url: str) -> str:
+    return f"site-{int(time.time() * 1000)}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+class _WorkerProcess:
+    """One running `node deployWorker.js` with its own ready flag, in-flight jobs and reader thread.
+
+    Everything is per process so that a restart cannot mix up generations: the reader of a dead
+    process only ever fails that process's jobs."""
+
+    def __init__(self, args: List[str], cwd: str):
+        self.proc = subprocess.Popen(args, cwd=cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+        self.ready = threading.Event()
+        self.exited = False
+        self.pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read, name=f'deploy-worker-{self.proc.pid}', daemon=True)
+        self.reader.start()
+
+    def alive(self) -> bool:
+        return not self.exited and self.proc.poll() is None
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if msg.get('ready'):
+                self.ready.set()
+                continue
+            with self._lock:
+                fut = self.pending.pop(str(msg.get('id')), None)
+            if fut is not None:
+                fut.set_result(msg)
+        # worker exited: fail whatever was still in flight on this process
+        with self._lock:
+            self.exited = True
+            pending, self.pending = self.pending, {}
+        self.ready.set()  # wake a start-up wait; it checks `exited`
+        for job_id, fut in pending.items():
+            fut.set_result({'id': job_id, 'ok': False, 'error': f'deploy worker exited ({self.proc.poll()})'})
+
+    def send(self, job: Dict[str, Any]) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if self.exited:
+                fut.set_result({'id': job['id'], 'ok': False, 'error': 'deploy worker exited'})
+                return fut
+            self.pending[job['id']] = fut
+        try:
+            self.proc.stdin.write(json.dumps(job) + '\n')
+            self.proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            with self._lock:
+                self.pending.pop(job['id'], None)
+            if not fut.done():
+                fut.set_result({'id': job['id'], 'ok': False, 'error': f'deploy worker unavailable: {e}'})
+        return fut
+
+    def close(self, timeout: float) -> None:
+        try:
+            self.proc.stdin.close()  # the worker finishes in-flight deploys, then exits
+            self.proc.wait(timeout)
+        except Exception:
+            self.proc.kill()
+
+
+class DeployWorker:
+    """Python handle on the deploy worker; submit() may be called from any thread. A worker that
+    died is restarted on the next submit()."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, provider: Optional[str] = None,
+                 node: str = 'node', script: str = WORKER_JS, stub_delay_ms: int = 0):
+        self.concurrency = max(1, concurrency)
+        self.provider = provider or os.environ.get('DEPLOY_PROVIDER') or 'vercel'
+        self.node = node
+        self.script = script
+        self.stub_delay_ms = stub_delay_ms
+        self.jobs_sent = 0
+        self.starts = 0
+        self._process: Optional[_WorkerProcess] = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _ensure_started(self) -> _WorkerProcess:
+        with self._lock:
+            process = self._process
+            if process is None or not process.alive():
+                args = [self.node, self.script, '--concurrency', str(self.concurrency), '--provider', self.provider]
+                if self.stub_delay_ms:
+                    args += ['--stub-delay-ms', str(self.stub_delay_ms)]
+                process = self._process = _WorkerProcess(args, os.path.dirname(self.script))
+                self.starts += 1
+        if not process.ready.wait(30) or process.exited:
+            raise RuntimeError('deploy worker did not start')
+        return process
+
+    def submit(self, prompt: str, site_folder: str) -> Future:
+        """Queue one deploy; the future resolves to {'id', 'ok', 'url' | 'error', 'elapsedMs'}."""
+        process = self._ensure_started()
+        job_id = f'job-{next(self._ids)}'
+        with self._lock:
+            self.jobs_sent += 1
+        return process.send({'id': job_id, 'prompt': prompt, 'siteFolderName': site_folder})
+
+    def deploy_report(self, report: Dict[str, Any]) -> Future:
+        return self.submit(build_prompt(report), site_folder_name(report.get('url', '')))
+
+    def deploy_many(self, reports: Iterable[Dict[str, Any]], timeout: float = DEFAULT_TIMEOUT_S) -> List[Dict[str, Any]]:
+        """Deploy a batch of reports concurrently; results are returned in input order."""
+        futs = [(r.get('url'), self.deploy_report(r)) for r in reports]
+        out = []
+        for url, fut in futs:
+            try:
+                res = fut.result(timeout)
+            except Exception as e:
+                res = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+            out.append(dict(res, site=url))
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None:
+            process.close(DEFAULT_TIMEOUT_S)
+
+
+_worker: Optional[DeployWorker] = None
+_worker_lock = threading.Lock()
+
+
+def configure(**kwargs) -> DeployWorker:
+    """Replace the process-wide worker (e.g. to change concurrency or provider) and return it."""
+    global _worker
+    with _worker_lock:
+        old, _worker = _worker, DeployWorker(**kwargs)
+    if old is not None:
+        old.close()
+    return _worker
+
+
+def get_worker() -> DeployWorker:
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = DeployWorker()
+    return _worker
+
+
+@atexit.register
+def _close_worker() -> None:
+    if _worker is not None:
+        _worker.close()
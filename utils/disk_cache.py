@@ -0,0 +1,109 @@
+"""disk_cache.py
+
+Small persistent key/value cache on SQLite with max-age expiry and LRU eviction by total size.
+Safe to share between threads; WAL mode lets several processes use the same file.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+class DiskCache:
+    def __init__(self, path: str, max_age_s: Optional[float] = None, max_bytes: Optional[int] = None, table: str = 'entries'):
+        if not table.isidentifier():
+            raise ValueError(f'invalid table name: {table!r}')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_age_s = max_age_s
+        self.max_bytes = max_bytes
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)')
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Return (value, created_timestamp) or None. Expired entries are dropped."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f'SELECT value, created FROM {self.table} WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.max_age_s is not None and now - created > self.max_age_s:
+                self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(f'UPDATE {self.table} SET accessed = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+        return bytes(value), created
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, sqlite3.Binary(value), len(value), now, now),
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as freshly validated (resets its age)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(f'UPDATE {self.table} SET created = ?, accessed = ? WHERE key = ?', (now, now, key))
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def keys(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute(f'SELECT key FROM {self.table}')]
+
+    def items(self):
+        """All (key, value) pairs, without touching access times or expiring anything."""
+        with self._lock:
+            return [(r[0], bytes(r[1])) for r in self._conn.execute(f'SELECT key, value FROM {self.table}')]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n, total = self._conn.execute(f'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}').fetchone()
+        return {'entries': n, 'bytes': total}
+
+    def _evict_locked(self) -> None:
+        if self.max_age_s is not None:
+            self._conn.execute(f'DELETE FROM {self.table} WHERE created < ?', (time.time() - self.max_age_s,))
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute(f'SELECT COALESCE(SUM(size), 0) FROM {self.table}').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently used entries until we are back under the limit
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute(f'SELECT key, size FROM {self.table} ORDER BY accessed ASC'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany(f'DELETE FROM {self.table} WHERE key = ?', victims)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,100 @@
+"""fetcher.py
+
+Shared asyncio fetch layer. Blocking `requests` calls run on a thread pool over one pooled
+`requests.Session`, and per-host semaphores cap how many requests hit the same site at once,
+so the page, CSS, robots/sitemap, link checks and TLS handshake of an audit can fan out together.
+"""
+from __future__ import annotations
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, Optional
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrument
+
+# Upper bound on blocking calls in flight across all audits in this process.
+MAX_WORKERS = 64
+# Default number of concurrent requests allowed against a single host.
+PER_HOST_LIMIT = 6
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class _CountingSession(requests.Session):
+    """Session that reports every response to the audit timer of the calling context (instrument.py)."""
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        instrument.count_response(resp, streamed=kwargs.get('stream', False))
+        return resp
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session (keep-alive connections are reused across audits)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                s = _CountingSession()
+                adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+                s.mount('http://', adapter)
+                s.mount('https://', adapter)
+                _session = s
+    return _session
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fetch')
+    return _executor
+
+
+class AsyncFetcher:
+    """Per-audit handle on the shared pool. Create one inside the running event loop."""
+
+    def __init__(self, per_host: int = PER_HOST_LIMIT):
+        self.per_host = max(1, per_host)
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+
+    def _sem(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable on the shared pool without a per-host limit (in a copy of the caller's context)."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        async with self._sem(url):
+            return await self.run(get_session().request, method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('HEAD', url, **kwargs)
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """Run a coroutine to completion from sync code, even if the caller is already inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(contextvars.copy_context().run, asyncio.run, coro).result()
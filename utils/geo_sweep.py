@@ -0,0 +1,298 @@
+"""geo_sweep.py
+
+Deterministic coverage sweep for business discovery. A bounding box (or polygon) is tiled into
+overlapping search circles on a hex grid; each circle runs a Nearby Search, and any circle that
+hits Google's 60-result cap is split into smaller circles. Place IDs go through a persistent
+seen-set once they have been returned, so the same business is never returned twice across runs.
+
+Usage: python geo_sweep.py --bbox 29.60,-82.40,29.70,-82.25 --radius 1500 --type restaurant --out leads.jsonl
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import businesearch
+from businesearch import MAX_NEARBY_RESULTS, PAGE_TOKEN_DELAY_S, TokenBucket
+from disk_cache import DEFAULT_CACHE_DIR
+
+METERS_PER_DEG = 111_000  # approx. meters per degree of latitude
+MIN_RADIUS_M = 150
+
+LatLng = Tuple[float, float]
+BBox = Tuple[float, float, float, float]  # south, west, north, east
+
+
+class Cell:
+    __slots__ = ('lat', 'lng', 'radius', 'depth')
+
+    def __init__(self, lat: float, lng: float, radius: float, depth: int = 0):
+        self.lat, self.lng, self.radius, self.depth = lat, lng, radius, depth
+
+    def location(self) -> str:
+        return f"{self.lat:.6f},{self.lng:.6f}"
+
+    def __repr__(self) -> str:
+        return f"Cell({self.location()}, r={self.radius:.0f}, depth={self.depth})"
+
+
+def _to_xy(p: LatLng, origin: LatLng) -> Tuple[float, float]:
+    """Equirectangular projection around `origin`, in meters. Fine at city scale."""
+    return ((p[1] - origin[1]) * METERS_PER_DEG * math.cos(math.radians(origin[0])),
+            (p[0] - origin[0]) * METERS_PER_DEG)
+
+
+def _point_in_polygon(x: float, y: float, poly: Sequence[Tuple[float, float]]) -> bool:
+    inside = False
+    j = len(poly) - 1
+    for i in range(len(poly)):
+        xi, yi = poly[i]
+        xj, yj = poly[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / ((yj - yi) or 1e-12) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _segment_distance(px: float, py: float, a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    (ax, ay), (bx, by) = a, b
+    dx, dy = bx - ax, by - ay
+    t = 0.0 if dx == dy == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _circle_touches_polygon(cell: Cell, polygon: Sequence[LatLng]) -> bool:
+    origin = (cell.lat, cell.lng)
+    poly = [_to_xy(p, origin) for p in polygon]
+    if _point_in_polygon(0.0, 0.0, poly):
+        return True
+    return any(_segment_distance(0.0, 0.0, poly[i - 1], poly[i]) <= cell.radius for i in range(len(poly)))
+
+
+def hex_tile(bbox: BBox, radius: float, depth: int = 0) -> List[Cell]:
+    """Cover `bbox` with circles of `radius` on a hex grid (every point is inside at least one circle).
+
+    Each circle covers the hexagon around its centre, so rows run from `south` until one is at or
+    past `north`, and every row (odd rows shifted half a step west) runs until a column is at or past
+    `east`. Longitude steps use the latitude nearest the equator, where a degree is widest."""
+    south, west, north, east = bbox
+    widest_lat = 0.0 if south <= 0.0 <= north else min(abs(south), abs(north))
+    lat_step = 1.5 * radius / METERS_PER_DEG
+    lng_step = math.sqrt(3) * radius / (METERS_PER_DEG * max(0.01, math.cos(math.radians(widest_lat))))
+    cells = []
+    row = 0
+    while True:
+        lat = south + row * lat_step
+        col = 0
+        while True:
+            lng = west + (col - (0.5 if row % 2 else 0.0)) * lng_step
+            cells.append(Cell(lat, lng, radius, depth))
+            if lng >= east:
+                break
+            col += 1
+        if lat >= north:
+            break
+        row += 1
+    return cells
+
+
+def plan_cells(radius: float, bbox: Optional[BBox] = None, polygon: Optional[Sequence[LatLng]] = None) -> List[Cell]:
+    """Initial cells for a sweep over a bbox or polygon (lat, lng vertices)."""
+    if polygon:
+        lats = [p[0] for p in polygon]
+        lngs = [p[1] for p in polygon]
+        bbox = (min(lats), min(lngs), max(lats), max(lngs))
+    if bbox is None:
+        raise ValueError('bbox or polygon is required')
+    cells = hex_tile(bbox, radius)
+    if polygon:
+        cells = [c for c in cells if _circle_touches_polygon(c, polygon)]
+    return cells
+
+
+def split_cell(cell: Cell) -> List[Cell]:
+    """Replace a saturated cell with half-radius cells covering it."""
+    r = cell.radius / 2
+    dlat = cell.radius / METERS_PER_DEG
+    dlng = cell.radius / (METERS_PER_DEG * max(0.01, math.cos(math.radians(cell.lat))))
+    children = hex_tile((cell.lat - dlat, cell.lng - dlng, cell.lat + dlat, cell.lng + dlng), r, cell.depth + 1)
+    origin = (cell.lat, cell.lng)
+    return [c for c in children if math.hypot(*_to_xy((c.lat, c.lng), origin)) <= cell.radius + r]
+
+
+class SeenPlaces:
+    """Persistent set of place_ids already returned by a sweep."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS seen (place_id TEXT PRIMARY KEY, first_seen REAL NOT NULL)')
+            self._conn.commit()
+
+    def __contains__(self, place_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM seen WHERE place_id = ?', (place_id,)).fetchone() is not None
+
+    def add(self, place_id: str) -> bool:
+        """Record `place_id`; returns True only the first time it is seen."""
+        with self._lock:
+            cur = self._conn.execute('INSERT OR IGNORE INTO seen (place_id, first_seen) VALUES (?, ?)', (place_id, time.time()))
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def search_cell(api_key: str, cell: Cell, business_type: str, session, limiter: TokenBucket,
+                base_url: Optional[str] = None) -> Tuple[List[Dict], int]:
+    """All Nearby Search results for one cell (up to 3 pages); returns (results, api_calls)."""
+    params = {"location": cell.location(), "radius": int(cell.radius), "type": business_type, "key": api_key}
+    out: List[Dict] = []
+    delay = 0.0
+    calls = 0
+    while True:
+        results, token = businesearch.fetch_nearby_page(api_key, params, session, limiter, base_url, delay)
+        calls += 1
+        out.extend(results)
+        if not token or len(out) >= MAX_NEARBY_RESULTS:
+            return out, calls
+        params = {"pagetoken": token, "key": api_key}
+        delay = PAGE_TOKEN_DELAY_S
+
+
+def sweep(api_key: str, radius: float, business_type: str = "restaurant", bbox: Optional[BBox] = None,
+          polygon: Optional[Sequence[LatLng]] = None, seen: Optional[SeenPlaces] = None, workers: int = 8,
+          rate_per_s: float = 10.0, base_url: Optional[str] = None, fetch_details: bool = True,
+          stats: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+    """Yield every not-yet-seen business in the area, each exactly once.
+
+    Cells run with bounded concurrency; a cell that returns the 60-result cap is split into
+    half-radius cells (down to MIN_RADIUS_M). A place only enters `seen` once it has been handed
+    to the consumer (its details fetched, the yield resumed), so a failed details call, a crash or
+    a consumer that stops early leaves it to be found by the next sweep. `stats` (if given) is
+    filled with call counts.
+    """
+    stats = stats if stats is not None else {}
+    for k in ('cells_planned', 'cells_searched', 'cells_split', 'nearby_calls', 'details_calls', 'details_failed',
+              'new_places', 'duplicates'):
+        stats.setdefault(k, 0)
+    cells = plan_cells(radius, bbox=bbox, polygon=polygon)
+    stats['cells_planned'] = len(cells)
+    session = businesearch._session()
+    limiter = TokenBucket(rate_per_s, burst=max(1, workers))
+    run_seen = set()  # handed out or in flight in this run
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        cell_futs: Dict[Future, Cell] = {pool.submit(search_cell, api_key, c, business_type, session, limiter, base_url): c for c in cells}
+        detail_futs: Dict[Future, Dict] = {}
+        while cell_futs or detail_futs:
+            done, _ = wait(set(cell_futs) | set(detail_futs), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in cell_futs:
+                    cell = cell_futs.pop(fut)
+                    results, calls = fut.result()
+                    stats['cells_searched'] += 1
+                    stats['nearby_calls'] += calls
+                    if len(results) >= MAX_NEARBY_RESULTS and cell.radius / 2 >= MIN_RADIUS_M:
+                        stats['cells_split'] += 1
+                        for child in split_cell(cell):
+                            cell_futs[pool.submit(search_cell, api_key, child, business_type, session, limiter, base_url)] = child
+                    for place in results:
+                        place_id = place.get("place_id")
+                        if not place_id:
+                            continue
+                        if place_id in run_seen or (seen is not None and place_id in seen):
+                            stats['duplicates'] += 1
+                            continue
+                        run_seen.add(place_id)
+                        stats['new_places'] += 1
+                        if fetch_details:
+                            stats['details_calls'] += 1
+                            detail_futs[pool.submit(businesearch.get_place_details, api_key, place_id, session, limiter, base_url)] = place
+                        else:
+                            yield {"place_id": place_id, "name": place.get("name"), "address": place.get("vicinity")}
+                            if seen is not None:
+                                seen.add(place_id)
+                else:
+                    place = detail_futs.pop(fut)
+                    details = fut.result()
+                    if not details:
+                        # let an overlapping cell (or the next sweep) try this place again
+                        stats['details_failed'] += 1
+                        run_seen.discard(place["place_id"])
+                        continue
+                    biz = businesearch._to_business(details)
+                    biz["place_id"] = place["place_id"]
+                    yield biz
+                    if seen is not None:
+                        seen.add(biz["place_id"])
+
+
+def _parse_floats(text: str) -> List[float]:
+    return [float(x) for x in text.split(',')]
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Sweep an area for businesses on a deterministic grid.')
+    area = ap.add_mutually_exclusive_group(required=True)
+    area.add_argument('--bbox', help='south,west,north,east')
+    area.add_argument('--polygon', help='JSON file with [[lat, lng], ...] vertices')
+    ap.add_argument('--radius', type=float, default=2000, help='Search circle radius in meters (default 2000)')
+    ap.add_argument('--type', default='restaurant', help='Google Places type')
+    ap.add_argument('--seen', default=os.path.join(DEFAULT_CACHE_DIR, 'seen_places.sqlite'), help='Persistent seen-set path')
+    ap.add_argument('--workers', type=int, default=8)
+    ap.add_argument('--rate', type=float, default=10.0, help='Max Places API calls per second')
+    ap.add_argument('--plan-only', action='store_true', help='Print the planned cells and exit')
+    ap.add_argument('--out', default='-', help="JSON-lines output (default stdout)")
+    args = ap.parse_args()
+
+    bbox = tuple(_parse_floats(args.bbox)) if args.bbox else None
+    polygon = None
+    if args.polygon:
+        with open(args.polygon, 'r', encoding='utf-8') as f:
+            polygon = [tuple(p) for p in json.load(f)]
+    if args.plan_only:
+        cells = plan_cells(args.radius, bbox=bbox, polygon=polygon)
+        print(f'{len(cells)} cells (min {len(cells)} nearby calls, max {3 * len(cells)} before splits)')
+        return
+
+    api_key = os.environ.get('GOOGLE_API_KEY') or os.environ.get('PLACES_API_KEY')
+    if not api_key:
+        ap.error('set GOOGLE_API_KEY (or PLACES_API_KEY)')
+    seen = SeenPlaces(args.seen)
+    stats: Dict[str, int] = {}
+    out = open(args.out, 'a', encoding='utf-8') if args.out != '-' else None
+    try:
+        for biz in sweep(api_key, args.radius, args.type, bbox=bbox, polygon=polygon, seen=seen,
+                         workers=args.workers, rate_per_s=args.rate, stats=stats):
+            line = json.dumps(biz)
+            if out:
+                out.write(line + '\n')
+                out.flush()
+            else:
+                print(line)
+    finally:
+        if out:
+            out.close()
+        seen.close()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
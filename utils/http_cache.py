@@ -0,0 +1,94 @@
+"""http_cache.py
+
+Persistent page cache for scraper.fetch_url. Stores status, body, headers and timing per URL and
+revalidates stale entries with ETag / Last-Modified so re-audits mostly cost a 304.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+
+# Served without touching the network for this long (the old in-process TTL).
+DEFAULT_FRESH_S = 3600
+# Entries older than this are dropped instead of revalidated.
+DEFAULT_MAX_AGE_S = 14 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class CachedResponse:
+    def __init__(self, data: Dict[str, Any], created: float):
+        self.data = data
+        self.created = created
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self.created
+
+    def validators(self) -> Dict[str, str]:
+        h = {k.lower(): v for k, v in self.data['headers'].items()}
+        out = {}
+        if h.get('etag'):
+            out['If-None-Match'] = h['etag']
+        if h.get('last-modified'):
+            out['If-Modified-Since'] = h['last-modified']
+        return out
+
+    def as_result(self, cache_status: str, elapsed_s: Optional[float] = None) -> Tuple[Optional[int], str, Dict[str, str], float, int]:
+        d = self.data
+        headers = dict(d['headers'])
+        headers['cache_status'] = cache_status
+        return d['status'], d['text'], headers, d['elapsed_s'] if elapsed_s is None else elapsed_s, d['content_len']
+
+
+class HttpCache:
+    def __init__(self, path: str, fresh_s: float = DEFAULT_FRESH_S, max_age_s: float = DEFAULT_MAX_AGE_S, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.fresh_s = fresh_s
+        self.store = DiskCache(path, max_age_s=max_age_s, max_bytes=max_bytes, table='http')
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        hit = self.store.get(url)
+        if hit is None:
+            return None
+        blob, created = hit
+        try:
+            return CachedResponse(json.loads(zlib.decompress(blob)), created)
+        except Exception:
+            self.store.delete(url)
+            return None
+
+    def save(self, url: str, status: int, text: str, headers: Dict[str, str], elapsed_s: float, content_len: int) -> None:
+        data = {'status': status, 'text': text, 'headers': headers, 'elapsed_s': elapsed_s, 'content_len': content_len}
+        self.store.set(url, zlib.compress(json.dumps(data).encode('utf-8'), 6))
+
+    def revalidated(self, url: str) -> None:
+        self.store.touch(url)
+
+
+_lock = threading.Lock()
+_cache: Optional[HttpCache] = None
+_configured = False
+
+
+def configure(path: Optional[str] = os.path.join(DEFAULT_CACHE_DIR, 'http.sqlite'), fresh_s: float = DEFAULT_FRESH_S,
+              max_age_s: float = DEFAULT_MAX_AGE_S, max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[HttpCache]:
+    """Set up the process-wide cache used by fetch_url. Pass path=None to disable caching."""
+    global _cache, _configured
+    with _lock:
+        _cache = HttpCache(path, fresh_s=fresh_s, max_age_s=max_age_s, max_bytes=max_bytes) if path else None
+        _configured = True
+    return _cache
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    if not _configured:
+        try:
+            configure()
+        except Exception:
+            # unwritable cache dir etc. -- fetch without a cache rather than failing the audit
+            configure(None)
+    return _cache
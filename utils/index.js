@@ -36,7 +36,8 @@ var __generator = (this && this.__generator) || function (thisArg, body) {
 };
 Object.defineProperty(exports, "__esModule", { value: true });
 var generateAndDeploy_1 = require("./generateAndDeploy");
-var analysis = require("./analysis.json");
+// analysis report path may be passed as the first argument (main.py writes one per URL)
+var analysis = require(process.argv[2] ? require("path").resolve(process.argv[2]) : "./analysis.json");
 
 (function () { return __awaiter(void 0, void 0, void 0, function () {
     var url;
@@ -0,0 +1,283 @@
+"""instrument.py
+
+Per-stage timing for audits.
+
+An AuditTimer is bound to the running audit through a context variable, so everything done on the
+audit's behalf -- in its event loop or on the shared fetch pool (fetcher copies the context into
+pool threads) -- is attributed to it. `stage(name)` / `timed(name, awaitable)` time one stage;
+HTTP requests made through fetcher.get_session() inside a stage add to its request count and body
+bytes (after decompression; streamed bodies count what was actually read). Stages of one audit
+overlap, so their wall times do not add up to the audit's `total_s`.
+
+Batch runs aggregate the per-audit blocks with StageHistograms and write them periodically as
+Prometheus text (textfile-collector style) or JSON lines via MetricsExporter. `profiled()` wraps
+an audit in cProfile or pyinstrument when configure_profiling() was called.
+"""
+from __future__ import annotations
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, List, Optional
+
+# Upper bounds (seconds) of the stage wall-time histogram buckets.
+BUCKETS_S = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OTHER = 'other'
+
+
+class AuditTimer:
+    """Wall time, calls, requests and bytes per stage of one audit. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.total_s = 0.0
+
+    @classmethod
+    def from_dict(cls, timings: Optional[Dict[str, Any]]) -> 'AuditTimer':
+        """Resume a timer from an earlier as_dict() (the pipeline times one audit across stages)."""
+        timer = cls()
+        if timings:
+            timer.total_s = timings.get('total_s', 0.0)
+            timer.stages = {k: dict(v) for k, v in timings.get('stages', {}).items()}
+        return timer
+
+    def record(self, stage: str, wall_s: float = 0.0, calls: int = 0, requests: int = 0, bytes: int = 0) -> None:
+        with self._lock:
+            s = self.stages.setdefault(stage, {'wall_s': 0.0, 'calls': 0, 'requests': 0, 'bytes': 0})
+            s['wall_s'] += wall_s
+            s['calls'] += calls
+            s['requests'] += requests
+            s['bytes'] += bytes
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {k: dict(v, wall_s=round(v['wall_s'], 4)) for k, v in self.stages.items()}
+        return {
+            'total_s': round(self.total_s, 4),
+            'requests': sum(s['requests'] for s in stages.values()),
+            'bytes': sum(s['bytes'] for s in stages.values()),
+            'stages': stages,
+        }
+
+
+_timer: contextvars.ContextVar[Optional[AuditTimer]] = contextvars.ContextVar('audit_timer', default=None)
+_stage: contextvars.ContextVar[str] = contextvars.ContextVar('audit_stage', default=OTHER)
+
+
+def current() -> Optional[AuditTimer]:
+    return _timer.get()
+
+
+@contextmanager
+def audit(timer: Optional[AuditTimer] = None) -> Iterator[AuditTimer]:
+    """Bind a timer to the code inside the block and add the block's wall time to its total.
+
+    Without `timer`, reuses the one already bound (so audit() around analyze() times both as one
+    audit) or starts a new one."""
+    active = _timer.get()
+    if timer is None and active is not None:
+        yield active
+        return
+    timer = timer or AuditTimer()
+    token = _timer.set(timer)
+    t0 = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        timer.total_s += time.perf_counter() - t0
+        _timer.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as one call of stage `name`; requests made inside are attributed to it."""
+    timer = _timer.get()
+    if timer is None:
+        yield
+        return
+    token = _stage.set(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, wall_s=time.perf_counter() - t0, calls=1)
+        _stage.reset(token)
+
+
+async def timed(name: str, aw: Awaitable) -> Any:
+    """Await `aw` as stage `name`. Wrap the coroutine before scheduling it so the task carries the stage."""
+    with stage(name):
+        return await aw
+
+
+def count_response(resp: Any, streamed: bool = False) -> None:
+    """Attribute one HTTP response to the current audit stage (called by fetcher's session).
+
+    Streamed bodies are not counted here; whoever reads them reports the bytes with count_bytes()."""
+    timer = _timer.get()
+    if timer is None:
+        return
+    size = 0 if streamed or not resp._content else len(resp._content)
+    timer.record(_stage.get(), requests=1, bytes=size)
+
+
+def count_bytes(n: int) -> None:
+    """Attribute `n` body bytes read from a streamed response to the current audit stage."""
+    timer = _timer.get()
+    if timer is not None and n:
+        timer.record(_stage.get(), bytes=n)
+
+
+# --- aggregation and export ----------------------------------------------------------------------
+
+class StageHistograms:
+    """Aggregate of many audits' timings: a wall-time histogram plus request/byte counters per stage."""
+
+    def __init__(self, buckets: tuple = BUCKETS_S):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.audits = 0
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def _observe_locked(self, name: str, wall_s: float, requests: int = 0, bytes: int = 0) -> None:
+        h = self.stages.setdefault(name, {'counts': [0] * (len(self.buckets) + 1), 'sum_s': 0.0, 'count': 0,
+                                          'requests': 0, 'bytes': 0})
+        idx = next((i for i, b in enumerate(self.buckets) if wall_s <= b), len(self.buckets))
+        h['counts'][idx] += 1
+        h['sum_s'] += wall_s
+        h['count'] += 1
+        h['requests'] += requests
+        h['bytes'] += bytes
+
+    def observe(self, timings: Optional[Dict[str, Any]]) -> None:
+        """Add one audit's timings block (AuditTimer.as_dict()); the audit total is stage 'audit'."""
+        if not timings:
+            return
+        with self._lock:
+            self.audits += 1
+            self._observe_locked('audit', timings.get('total_s', 0.0), timings.get('requests', 0), timings.get('bytes', 0))
+            for name, s in timings.get('stages', {}).items():
+                self._observe_locked(name, s['wall_s'], s.get('requests', 0), s.get('bytes', 0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {}
+            for name, h in self.stages.items():
+                cumulative, running = [], 0
+                for c in h['counts']:
+                    running += c
+                    cumulative.append(running)
+                stages[name] = {'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], cumulative)),
+                                'sum_s': round(h['sum_s'], 4), 'count': h['count'],
+                                'requests': h['requests'], 'bytes': h['bytes']}
+            return {'ts': time.time(), 'audits': self.audits, 'stages': stages}
+
+    def prometheus_text(self, prefix: str = 'audit') -> str:
+        snap = self.snapshot()
+        lines: List[str] = [
+            f'# HELP {prefix}_stage_seconds Wall time of each audit stage (stage="audit" is the whole audit).',
+            f'# TYPE {prefix}_stage_seconds histogram',
+        ]
+        for name, h in sorted(snap['stages'].items()):
+            for le, n in h['buckets'].items():
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{le}"}} {n}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h["sum_s"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h["count"]}')
+        for metric, key, help_text in (('requests', 'requests', 'HTTP requests made by each stage.'),
+                                       ('bytes', 'bytes', 'HTTP body bytes received by each stage.')):
+            lines.append(f'# HELP {prefix}_stage_{metric}_total {help_text}')
+            lines.append(f'# TYPE {prefix}_stage_{metric}_total counter')
+            for name, h in sorted(snap['stages'].items()):
+                lines.append(f'{prefix}_stage_{metric}_total{{stage="{name}"}} {h[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Write StageHistograms to `path` every `every_s` seconds and on close().
+
+    fmt='prom' rewrites the file atomically with the Prometheus text format (point a node_exporter
+    textfile collector at it); fmt='jsonl' appends one snapshot per line."""
+
+    def __init__(self, path: str, fmt: str = 'prom', every_s: float = 30.0):
+        if fmt not in ('prom', 'jsonl'):
+            raise ValueError(f'unknown metrics format {fmt!r}')
+        self.path = path
+        self.fmt = fmt
+        self.every_s = every_s
+        self.histograms = StageHistograms()
+        self._lock = threading.Lock()
+        self._last = time.monotonic()
+
+    def observe(self, timings: Optional[Dict[str, Any]]) -> None:
+        self.histograms.observe(timings)
+        if time.monotonic() - self._last >= self.every_s:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last = time.monotonic()
+            if self.fmt == 'jsonl':
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(self.histograms.snapshot()) + '\n')
+            else:
+                tmp = f'{self.path}.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write(self.histograms.prometheus_text())
+                os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        self.flush()
+
+
+# --- profiling -----------------------------------------------------------------------------------
+
+_profile_dir: Optional[str] = None
+_profiler = 'cprofile'
+
+
+def configure_profiling(out_dir: Optional[str], tool: str = 'cprofile') -> None:
+    """Profile every audit into `out_dir` (cProfile .prof or pyinstrument .html). None turns it off."""
+    global _profile_dir, _profiler
+    if tool not in ('cprofile', 'pyinstrument'):
+        raise ValueError(f'unknown profiler {tool!r}')
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    _profile_dir, _profiler = out_dir, tool
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[None]:
+    """Profile the block when profiling is configured; the output file is `<out_dir>/<name>.prof|.html`.
+
+    Both profilers follow the calling thread, i.e. the audit's event loop (parsing, measures,
+    scoring); blocking calls on the fetch pool show up as time spent awaiting them."""
+    if not _profile_dir:
+        yield
+        return
+    base = os.path.join(_profile_dir, name)
+    if _profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler(async_mode='enabled')
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(base + '.html', 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # Python 3.12+ allows one cProfile at a time; concurrent audits go unprofiled
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(base + '.prof')
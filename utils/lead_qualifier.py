@@ -0,0 +1,103 @@
+"""lead_qualifier.py
+
+Bounds on the final score of a partly audited site, for the staged (early-exit) mode of analyze().
+
+Every expensive stage only feeds a few scorer inputs (see STAGE_INPUTS), and compute_scores is
+monotone in each of them, so scoring the measures once with every pending input at its worst value
+and once at its best gives the lowest and highest total the audit can still end with. The vision
+verdict moves the total by at most ±AI_REDO_DELTA on top. Once both bounds sit on the same side of
+the lead threshold the remaining stages cannot change the outcome and are skipped.
+
+A skipped stage's input is set to None and listed in measures['unmeasured'], so suggestions and
+the measures store do not mistake the scorer's default for a measurement.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from scorer import AI_REDO_DELTA, compute_scores
+
+_LH_CATEGORIES = ('performance', 'accessibility', 'seo', 'best-practices')
+
+# stage -> (measures at their worst, measures at their best)
+STAGE_INPUTS: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {
+    'ssl': ({'has_ssl': False}, {'has_ssl': True}),
+    'robots_sitemap': ({'robots_sitemap': {'robots': False, 'sitemap': False}},
+                       {'robots_sitemap': {'robots': True, 'sitemap': True}}),
+    # 7 broken links already zero the broken-link sub-score
+    'broken_links': ({'broken_links': 7}, {'broken_links': 0}),
+    'lighthouse': ({'lighthouse': {k: 0.0 for k in _LH_CATEGORIES}}, {'lighthouse': {k: 1.0 for k in _LH_CATEGORIES}}),
+}
+
+
+# network stage -> the measure it fills (lighthouse=None already means "no Lighthouse data")
+STAGE_MEASURE = {'ssl': 'has_ssl', 'robots_sitemap': 'robots_sitemap', 'broken_links': 'broken_links'}
+
+
+def total_bounds(measures: Dict[str, Any], pending: Iterable[str], weights: Optional[Dict[str, float]] = None,
+                 params: Optional[Dict[str, Dict[str, float]]] = None) -> Tuple[int, int]:
+    """Lowest and highest final total (vision delta included, clamped like finalize_report) still possible."""
+    pending = set(pending)
+    worst, best = dict(measures), dict(measures)
+    for stage in pending & set(STAGE_INPUTS):
+        worst.update(STAGE_INPUTS[stage][0])
+        best.update(STAGE_INPUTS[stage][1])
+    lo, hi = compute_scores(worst, weights, params)['total'], compute_scores(best, weights, params)['total']
+    if 'vision' in pending:
+        lo, hi = lo - AI_REDO_DELTA, hi + AI_REDO_DELTA
+    return max(0, min(100, lo)), max(0, min(100, hi))
+
+
+def decide(lo: int, hi: int, threshold: float) -> Optional[str]:
+    """'lead' if the total is certainly under `threshold`, 'not_lead' if certainly not, else None."""
+    if hi < threshold:
+        return 'lead'
+    if lo >= threshold:
+        return 'not_lead'
+    return None
+
+
+def checkpoint(measures: Dict[str, Any], threshold: float, pending: Iterable[str], skippable: Iterable[str]) -> Optional[str]:
+    """Bound the total with `pending` stages still to run and record it in measures['qualification'].
+
+    When that settles the outcome, every stage in `skippable` is marked skipped with the reason; returns
+    the decision (or None to keep going)."""
+    pending = list(pending)
+    q = measures.setdefault('qualification', {'threshold': threshold, 'decided': None, 'checkpoints': [], 'skipped': {}})
+    lo, hi = total_bounds(measures, pending)
+    q['checkpoints'].append({'pending': pending, 'bounds': [lo, hi]})
+    decision = decide(lo, hi, threshold)
+    if decision:
+        q['decided'] = decision
+        side = 'under' if decision == 'lead' else 'at or over'
+        for stage in skippable:
+            q['skipped'][stage] = f'total bounded to [{lo}, {hi}], {side} threshold {threshold:g}'
+    return decision
+
+
+def mark_unmeasured(measures: Dict[str, Any], stages: Iterable[str]) -> None:
+    """Set the inputs of skipped network `stages` to None and list them in measures['unmeasured']."""
+    unmeasured = measures.setdefault('unmeasured', [])
+    for stage in stages:
+        key = STAGE_MEASURE.get(stage)
+        if key:
+            measures[key] = None
+            if key not in unmeasured:
+                unmeasured.append(key)
+
+
+def unmeasured_stages(unmeasured: Iterable[str]) -> List[str]:
+    """The stages whose inputs are listed in `unmeasured` (a measures['unmeasured'] list)."""
+    keys = set(unmeasured or ())
+    return [stage for stage, key in STAGE_MEASURE.items() if key in keys]
+
+
+def skip(measures: Dict[str, Any], stage: str, reason: str) -> None:
+    measures.setdefault('qualification', {'threshold': None, 'decided': None, 'checkpoints': [], 'skipped': {}})['skipped'][stage] = reason
+
+
+def skipped(measures: Dict[str, Any], stage: str) -> bool:
+    return stage in (measures.get('qualification') or {}).get('skipped', {})
+
+
+def decided(measures: Dict[str, Any]) -> Optional[str]:
+    return (measures.get('qualification') or {}).get('decided')
@@ -0,0 +1,281 @@
+"""lighthouse_runner.py
+
+Runs the Lighthouse CLI for audits. The binary is resolved once per process, every run writes to
+its own temp file, and a bounded pool of headless Chrome instances is reused over their
+remote-debugging ports so runs don't pay Chrome startup. Async callers get their own threads, one
+per pooled Chrome (run_lighthouse_async), so queued audits never hold threads of the shared fetch
+pool. Only category scores and key metrics are kept; the multi-MB raw report is returned only on
+request.
+"""
+from __future__ import annotations
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from analyzer import parse_lighthouse_json
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_TIMEOUT_S = 30
+# Restart a pooled Chrome after this many audits to keep memory in check.
+CHROME_RECYCLE_AFTER = 50
+
+KEY_METRICS = {
+    'first-contentful-paint': 'fcp_ms',
+    'largest-contentful-paint': 'lcp_ms',
+    'total-blocking-time': 'tbt_ms',
+    'cumulative-layout-shift': 'cls',
+    'speed-index': 'speed_index_ms',
+    'interactive': 'tti_ms',
+    'server-response-time': 'ttfb_ms',
+}
+
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+
+_resolve_lock = threading.Lock()
+
+
+def resolve_lighthouse() -> Optional[List[str]]:
+    """Command prefix for the Lighthouse CLI, or None if it is not available.
+
+    Prefers a `lighthouse` on PATH; otherwise asks npx once for the path of its cached copy so
+    later runs skip npx's package resolution. The result is cached for the process.
+    """
+    with _resolve_lock:
+        return _resolve_lighthouse()
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_lighthouse() -> Optional[List[str]]:
+    exe = shutil.which('lighthouse')
+    if exe:
+        return [exe]
+    npx = shutil.which('npx')
+    if not npx:
+        return None
+    try:
+        proc = subprocess.run([npx, '--yes', '--package=lighthouse', '-c', 'command -v lighthouse'],
+                              capture_output=True, text=True, timeout=120)
+        path = proc.stdout.strip().splitlines()[-1] if proc.returncode == 0 and proc.stdout.strip() else ''
+        if path and os.path.exists(path):
+            return [path]
+    except (subprocess.SubprocessError, OSError):
+        pass
+    return None
+
+
+def resolve_chrome() -> Optional[str]:
+    """Chrome/Chromium executable for the pool: $CHROME_PATH, then PATH, then Playwright's bundled build."""
+    with _resolve_lock:
+        return _resolve_chrome()
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_chrome() -> Optional[str]:
+    env = os.environ.get('CHROME_PATH')
+    if env and os.path.exists(env):
+        return env
+    for name in CHROME_CANDIDATES:
+        exe = shutil.which(name)
+        if exe:
+            return exe
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            path = p.chromium.executable_path
+        if path and os.path.exists(path):
+            return path
+    except Exception:
+        pass
+    return None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class ChromeInstance:
+    """A headless Chrome listening on a remote-debugging port, with its own throwaway profile."""
+
+    def __init__(self, exe: str, startup_timeout: float = 15):
+        self.port = _free_port()
+        self.runs = 0
+        self._profile = tempfile.mkdtemp(prefix='lh-chrome-')
+        self.proc = subprocess.Popen(
+            [exe, '--headless=new', f'--remote-debugging-port={self.port}', f'--user-data-dir={self._profile}',
+             '--no-first-run', '--no-default-browser-check', '--disable-gpu', '--disable-dev-shm-usage', 'about:blank'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + startup_timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                break
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{self.port}/json/version', timeout=1).read()
+                return
+            except Exception:
+                time.sleep(0.2)
+        self.close()
+        raise RuntimeError('chrome did not open its debugging port')
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        shutil.rmtree(self._profile, ignore_errors=True)
+
+
+def summarize_lighthouse(lh_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a Lighthouse report to category scores and a handful of key metrics."""
+    audits = lh_json.get('audits', {}) or {}
+    metrics = {}
+    for audit_id, key in KEY_METRICS.items():
+        value = (audits.get(audit_id) or {}).get('numericValue')
+        if isinstance(value, (int, float)):
+            metrics[key] = round(float(value), 3)
+    return {
+        'categories': parse_lighthouse_json(lh_json),
+        'metrics': metrics,
+        'lighthouse_version': lh_json.get('lighthouseVersion'),
+        'final_url': lh_json.get('finalDisplayedUrl') or lh_json.get('finalUrl'),
+    }
+
+
+class LighthouseRunner:
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, timeout: int = DEFAULT_TIMEOUT_S,
+                 recycle_after: int = CHROME_RECYCLE_AFTER):
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        # each slot holds a ChromeInstance (or None until first use); taking a slot bounds concurrency
+        self._slots: 'queue.Queue[Optional[ChromeInstance]]' = queue.Queue()
+        for _ in range(max(1, concurrency)):
+            self._slots.put(None)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='lighthouse')
+        self._all: List[ChromeInstance] = []
+        self._lock = threading.Lock()
+
+    def _chrome(self, inst: Optional[ChromeInstance]) -> Optional[ChromeInstance]:
+        if inst is not None and inst.alive() and inst.runs < self.recycle_after:
+            return inst
+        if inst is not None:
+            inst.close()
+            with self._lock:
+                if inst in self._all:
+                    self._all.remove(inst)
+        exe = resolve_chrome()
+        if not exe:
+            return None  # let Lighthouse launch its own Chrome
+        try:
+            new = ChromeInstance(exe)
+        except Exception:
+            return None
+        with self._lock:
+            self._all.append(new)
+        return new
+
+    def run(self, url: str, keep_raw: bool = False, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Audit `url`; returns summarize_lighthouse() output (plus 'raw' if keep_raw) or None.
+
+        `timeout` overrides the runner's per-run timeout for this call."""
+        cmd = resolve_lighthouse()
+        if not cmd:
+            return None
+        inst = self._slots.get()
+        try:
+            inst = self._chrome(inst)
+            with tempfile.TemporaryDirectory(prefix='lh-') as tmp:
+                out_path = os.path.join(tmp, 'report.json')
+                args = cmd + [url, '--quiet', '--output=json', f'--output-path={out_path}']
+                if inst is not None:
+                    args.append(f'--port={inst.port}')
+                    inst.runs += 1
+                else:
+                    args.append('--chrome-flags=--headless=new')
+                try:
+                    proc = subprocess.run(args, capture_output=True, text=True,
+                                          timeout=self.timeout if timeout is None else timeout)
+                except (subprocess.SubprocessError, OSError):
+                    return None
+                if proc.returncode != 0 or not os.path.exists(out_path):
+                    return None
+                with open(out_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            summary = summarize_lighthouse(data)
+            if keep_raw:
+                summary['raw'] = data
+            return summary
+        except Exception:
+            return None
+        finally:
+            self._slots.put(inst)
+
+    async def run_async(self, url: str, keep_raw: bool = False, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """run() on the runner's own threads (one per Chrome slot): audits beyond the pool size wait
+        in the executor queue instead of parking threads of the shared fetch pool."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(ctx.run, self.run, url, keep_raw, timeout))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            insts, self._all = self._all, []
+        for inst in insts:
+            inst.close()
+
+
+_runner: Optional[LighthouseRunner] = None
+_runner_lock = threading.Lock()
+
+
+def configure(**kwargs) -> LighthouseRunner:
+    global _runner
+    with _runner_lock:
+        old, _runner = _runner, LighthouseRunner(**kwargs)
+    if old is not None:
+        old.close()
+    return _runner
+
+
+def get_runner() -> LighthouseRunner:
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = LighthouseRunner()
+    return _runner
+
+
+def run_lighthouse(url: str, keep_raw: bool = False) -> Optional[Dict[str, Any]]:
+    return get_runner().run(url, keep_raw=keep_raw)
+
+
+async def run_lighthouse_async(url: str, keep_raw: bool = False) -> Optional[Dict[str, Any]]:
+    return await get_runner().run_async(url, keep_raw=keep_raw)
+
+
+@atexit.register
+def _close_runner() -> None:
+    if _runner is not None:
+        _runner.close()
@@ -1,114 +1,118 @@
 #!/usr/bin/env python3
 """Simple orchestrator:
-Run the website quality checker, read analysis.json, and if score < 50 run node deployer and print any URL found.
+Audit one or more URLs in this process, and for every site scoring under the threshold hand a
+deploy job to the persistent Node deploy worker (deploy_client.py) and print the deployed URL.
 
-Usage: python utils/main.py <url>
+The checker is imported rather than spawned, so bs4/lxml/openai/playwright are loaded once per
+invocation and reports are passed in memory. Each report is also written to its own
+`<out-dir>/<host>-<hash>.json`, so concurrent runs never share a file. Deploys run in the
+worker while later URLs are still being audited.
+
+Usage: python utils/main.py <url> [<url> ...] [--urls FILE] [--out-dir reports] [--workers 4]
 """
 from __future__ import annotations
-import subprocess
+import argparse
 import sys
 import os
-import json
-import re
-
-
-def run_checker(url: str, utils_cwd: str) -> tuple[int, str, str]:
-    cmd = [sys.executable, "website_quality_checker.py", url]
-    print(f"Running: {' '.join(cmd)} (cwd={utils_cwd})")
-    proc = subprocess.run(cmd, cwd=utils_cwd, capture_output=True, text=True)
-    if proc.stdout:
-        print(proc.stdout)
-    if proc.returncode != 0:
-        print("Checker returned non-zero:", proc.returncode)
-        if proc.stderr:
-            print(proc.stderr)
-    return proc.returncode, proc.stdout or "", proc.stderr or ""
-
-
-def read_analysis(utils_cwd: str) -> dict | None:
-    path = os.path.join(utils_cwd, "analysis.json")
-    if not os.path.exists(path):
-        print(f"Missing analysis file: {path}")
-        return None
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print("Failed to read analysis.json:", e)
-        return None
-
+from concurrent.futures import Future, ThreadPoolExecutor
 
-def run_node_index(utils_cwd: str) -> tuple[int, str]:
-    cmd = ["node", "index.js"]
-    print(f"Running: {' '.join(cmd)} (cwd={utils_cwd})")
-    proc = subprocess.run(cmd, cwd=utils_cwd, capture_output=True, text=True)
-    out = (proc.stdout or "") + "\n" + (proc.stderr or "")
-    if proc.stdout:
-        print(proc.stdout)
-    if proc.stderr:
-        print(proc.stderr)
-    return proc.returncode, out
+import deploy_client
+import report_io
 
+DEFAULT_THRESHOLD = 50
 
-def extract_url(text: str) -> str | None:
-    # find the first http(s) URL-like substring
-    m = re.search(r"https?://[^\s'\"]+", text)
-    return m.group(0) if m else None
 
-
-def main(argv: list[str]):
-    if len(argv) < 2:
-        print("Usage: python utils/main.py <url>")
-        return 2
-    url = argv[1]
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    utils_cwd = os.path.abspath(os.path.dirname(__file__))
-
-    # 1) Run checker in utils folder so analysis.json ends up next to index.js
-    rc, out, err = run_checker(url, utils_cwd)
-    if rc != 0:
-        print("Warning: checker exited with non-zero code; continuing to attempt to read analysis.json if present.")
-
-    analysis = read_analysis(utils_cwd)
-    if not analysis:
-        print("No analysis.json produced. Exiting.")
-        return 1
-
-    score = None
+def audit_url(url: str, out_dir: str, artifacts: report_io.ArtifactStore | None = None, **audit_opts) -> tuple[dict, str]:
+    """Audit `url` in-process and write the compact report to its own path; returns (report, path)."""
+    from website_quality_checker import audit
     try:
-        score = analysis.get('scores', {}).get('total')
-    except Exception:
-        score = None
+        report = report_io.slim_report(audit(url, **audit_opts), artifacts)
+    except Exception as e:
+        report = {'url': url, 'error': f'{type(e).__name__}: {e}'}
+    path = report_io.report_path(out_dir, url)
+    report_io.write_json(path, report)
+    return report, path
 
-    try:
-        print("Score:", score)
-    except Exception:
-        pass
 
-    if score is None:
-        print("Couldn't determine score from analysis.json; exiting.")
-        return 1
+def handle_report(url: str, report: dict, path: str, threshold: float = DEFAULT_THRESHOLD,
+                  deploy: bool = True) -> int | Future:
+    """Queue a redesign deploy if `report` scores under `threshold`.
 
+    Returns the deploy future, or 0 / 1 (nothing to deploy / audit failed)."""
+    if report.get('error'):
+        print(f"{url}: audit failed: {report['error']}")
+        return 1
+    score = report.get('scores', {}).get('total')
+    print(f"{url}: score {score} ({path})")
     try:
         numeric = float(score)
     except Exception:
-        print("Score is not numeric; exiting.")
+        print(f"{url}: score is not numeric; skipping.")
         return 1
 
-    if numeric >= 50:
-        print("Score >= 50 — no redeploy action required.")
+    if numeric >= threshold:
+        print(f"{url}: score >= {threshold:g} — no redeploy action required.")
+        return 0
+    if not deploy:
         return 0
+    return deploy_client.get_worker().deploy_report(report)
 
-    # Score < 50: run node utils/index.js and extract URL
-    rc2, combined = run_node_index(utils_cwd)
-    found = extract_url(combined or "")
-    if found:
-        print("Deployment URL found:", found)
+
+def wait_deploy(url: str, fut: Future) -> int:
+    try:
+        res = fut.result(deploy_client.DEFAULT_TIMEOUT_S)
+    except Exception as e:
+        res = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    if res.get('ok'):
+        print(f"{url}: deployment URL found:", res.get('url'))
         return 0
-    else:
-        print("No http(s) URL found in node output. Raw output below:\n")
-        print(combined)
-        return 1
+    print(f"{url}: deploy failed: {res.get('error')}")
+    return 1
+
+
+def main(argv: list[str]):
+    ap = argparse.ArgumentParser(prog='main.py', description='Audit sites and deploy redesigns for low scorers.')
+    ap.add_argument('urls', nargs='*')
+    ap.add_argument('--urls', dest='url_file', metavar='FILE', help="Also audit every URL in FILE (one per line, '-' for stdin)")
+    ap.add_argument('--out-dir', default='reports', help='Directory for per-URL reports (default utils/reports)')
+    ap.add_argument('--artifacts-dir', default='artifacts', help='Content-addressed store for raw artifacts')
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Deploy sites scoring under this (default 50)')
+    ap.add_argument('--workers', type=int, default=1, help='Concurrent audits (default 1)')
+    ap.add_argument('--no-ai', action='store_true')
+    ap.add_argument('--no-vision', action='store_true')
+    ap.add_argument('--no-lighthouse', action='store_true')
+    ap.add_argument('--no-deploy', action='store_true', help='Audit and score only')
+    ap.add_argument('--qualify', action='store_true', help='Skip audit stages that cannot move a site across --threshold')
+    ap.add_argument('--deploy-concurrency', type=int, default=deploy_client.DEFAULT_CONCURRENCY, help='Deploys run at once by the Node worker')
+    ap.add_argument('--deploy-provider', choices=('vercel', 'stub'), help="'stub' deploys nowhere (for tests); default vercel or $DEPLOY_PROVIDER")
+    args = ap.parse_args(argv[1:])
+
+    urls = list(args.urls)
+    if args.url_file:
+        from website_quality_checker import read_urls
+        urls.extend(read_urls(args.url_file))
+    if not urls:
+        ap.print_usage()
+        return 2
+
+    utils_cwd = os.path.abspath(os.path.dirname(__file__))
+    out_dir = os.path.join(utils_cwd, args.out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    artifacts = report_io.ArtifactStore(os.path.join(utils_cwd, args.artifacts_dir)) if args.artifacts_dir else None
+    audit_opts = {'use_ai': not args.no_ai, 'use_vision': not args.no_vision, 'use_lighthouse': not args.no_lighthouse}
+    if args.qualify:
+        audit_opts['qualify_threshold'] = args.threshold
+
+    deploy_client.configure(concurrency=args.deploy_concurrency, provider=args.deploy_provider)
+
+    def _one(url: str) -> int | Future:
+        report, path = audit_url(url, out_dir, artifacts, **audit_opts)
+        return handle_report(url, report, path, threshold=args.threshold, deploy=not args.no_deploy)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        outcomes = list(pool.map(_one, urls))
+    codes = [wait_deploy(u, o) if isinstance(o, Future) else o for u, o in zip(urls, outcomes)]
+    return 1 if any(codes) else 0
 
 
 if __name__ == '__main__':
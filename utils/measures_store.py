@@ -0,0 +1,92 @@
+"""measures_store.py
+
+Keeps the scorer inputs of every audited URL (the subset of `measures` compute_scores reads, plus
+the vision decision) in SQLite, so rescore.py can re-run the scorer with new weights or thresholds
+without fetching anything again. finalize_report() records into the process-wide store.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+
+# Top-level measures compute_scores reads; 'meta' and 'parsed' are trimmed to the fields it uses.
+SCORER_KEYS = (
+    'lighthouse', 'has_ssl', 'mobile_friendly', 'response_time_s', 'security_headers', 'broken_links',
+    'text_html_ratio', 'heading_stats', 'h1_stats', 'paragraph_stats', 'images_with_alt_ratio', 'canonical',
+    'robots_sitemap', 'contact_info_found', 'has_schema', 'copyright_fresh', 'keyword_relevance',
+    'external_resource_ratio',
+)
+
+
+def scorer_inputs(measures: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of `measures` that compute_scores depends on. Inputs a staged audit never measured
+    (measures['unmeasured']) are left out rather than stored as the scorer's defaults."""
+    unmeasured = set(measures.get('unmeasured') or ())
+    out = {k: measures[k] for k in SCORER_KEYS if k in measures and k not in unmeasured}
+    meta = measures.get('meta') or {}
+    out['meta'] = {'title': meta.get('title') or '', 'meta': {'description': (meta.get('meta') or {}).get('description')}}
+    out['parsed'] = {'social_links': (measures.get('parsed') or {}).get('social_links', [])}
+    return out
+
+
+class MeasuresStore:
+    def __init__(self, path: str):
+        self._db = DiskCache(path, table='measures')
+
+    def record(self, url: str, measures: Dict[str, Any]) -> None:
+        redo = measures.get('ai_redo_recommendation') or {}
+        entry = {'url': url, 'measures': scorer_inputs(measures), 'ai_decision': redo.get('decision')}
+        if measures.get('unmeasured'):
+            entry['unmeasured'] = list(measures['unmeasured'])
+        self._db.set(url, json.dumps(entry, default=str).encode('utf-8'))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        hit = self._db.get(url)
+        return json.loads(hit[0]) if hit else None
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Every stored entry: {'url', 'measures', 'ai_decision'}, plus 'unmeasured' for staged audits that stopped early."""
+        for _, value in self._db.items():
+            yield json.loads(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._db.stats()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+_lock = threading.Lock()
+_store: Optional[MeasuresStore] = None
+_configured = False
+
+
+def configure(path: Optional[str] = os.path.join(DEFAULT_CACHE_DIR, 'measures.sqlite')) -> Optional[MeasuresStore]:
+    """Set up the process-wide store used by finalize_report(). Pass path=None to stop recording."""
+    global _store, _configured
+    with _lock:
+        _store = MeasuresStore(path) if path else None
+        _configured = True
+    return _store
+
+
+def get_store() -> Optional[MeasuresStore]:
+    if not _configured:
+        try:
+            configure()
+        except Exception:
+            # unwritable cache dir etc. -- audit without recording rather than failing
+            configure(None)
+    return _store
+
+
+def record(url: str, measures: Dict[str, Any]) -> None:
+    store = get_store()
+    if store is not None:
+        try:
+            store.record(url, measures)
+        except Exception:
+            pass
@@ -0,0 +1,124 @@
+"""page_scan.py
+
+One scan of a page for every text marker the audit looks for: e-mail addresses, phone numbers,
+address hints, copyright years, structured-data markers and booking keywords.
+
+The document is walked once by each of two precompiled scanners, and nothing page-sized is built:
+
+- contact tokens: a single finditer() of one regex for e-mails and phone numbers. E-mails are
+  matched from their '@' (rare in HTML, so the engine skips ahead quickly) and the local part is
+  read backwards from a short window; phones are maximal runs of digits/separators, trimmed.
+- words: a sweep over WINDOW-sized lowercased slices (the only copies made) that checks the
+  address and booking keywords and finds copyright marks with str.find(); the copyright regex is
+  then only tried at those marks. Copyright notices sit in footers, so the raw HTML is swept to the
+  end; the body text sweep (address hints only) stops at the first hit. Schema markers are plain
+  case-sensitive substring checks, as has_structured_data always did.
+
+scan() takes the raw HTML and the extracted body text separately (no `raw_html + ' ' + body_text`)
+and reads the body text for contact details only. E-mails and phones are exactly what the
+find_contact_info patterns matched, except that digits inside an e-mail's domain are no longer
+also reported as a phone number.
+"""
+from __future__ import annotations
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+WINDOW = 1 << 16
+
+ADDRESS_KEYWORDS = ('address', 'street')
+BOOKING_KEYWORDS = ('book', 'appointment')
+SCHEMA_MARKERS = ('application/ld+json', 'schema.org')
+# Lowercase forms of the marks that can start a copyright notice.
+COPYRIGHT_MARKS = ('©', '&copy;', '&#169;', '&#xa9;', 'copyright')
+
+_CONTACT = re.compile(r'@(?P<domain>[\w.-]+\.[a-zA-Z]{2,6})|(?P<phone>[\d+][\d \-()]{7,})')
+# The local part of an e-mail, read backwards from its '@'.
+_LOCAL_PART = re.compile(r'[\w.-]+\Z')
+_LOCAL_PART_MAX = 256
+_PHONE_MIN = 9  # '\+?\d[\d \-()]{7,}\d' without the '+'
+
+_YEAR = r'(?:19|20)\d{2}'
+_MARK = r'(?:©|&copy;|&\#169;|&\#xa9;|\bcopyright\b)'
+_COPYRIGHT = re.compile(rf'''
+    {_MARK}(?:\s|&nbsp;|{_MARK}|\(c\)|[,:.])*
+    (?P<year>{_YEAR})(?:\s*(?:-|–|&ndash;|&\#8211;|to)\s*(?P<year2>{_YEAR}))?
+''', re.I | re.X)
+
+
+def _contacts(text: str, emails: Set[str], phones: Set[str]) -> None:
+    for m in _CONTACT.finditer(text):
+        if m.lastgroup == 'domain':
+            at = m.start()
+            local = _LOCAL_PART.search(text, max(0, at - _LOCAL_PART_MAX), at)
+            if local:
+                emails.add(local.group() + m.group())
+            continue
+        # a run of phone characters: the number starts at its first digit and ends at its last one
+        phone = m.group()
+        if phone[0] == '+' and not phone[1].isdigit():
+            phone = phone[1:].lstrip(' -()')
+        phone = phone.rstrip(' -()')
+        if len(phone) - phone.startswith('+') >= _PHONE_MIN:
+            phones.add(phone)
+
+
+def _words(text: str, keywords: Tuple[str, ...], years: Optional[Set[int]] = None) -> Set[str]:
+    """The lowercase `keywords` found in `text` case-insensitively; adds copyright years to `years` if given."""
+    found: Set[str] = set()
+    overlap = max(len(w) for w in keywords + COPYRIGHT_MARKS) - 1
+    for start in range(0, len(text), WINDOW):
+        window = text[start:start + WINDOW + overlap]
+        low = window.lower()
+        found.update(w for w in keywords if w in low)
+        if years is None:
+            if len(found) == len(keywords):
+                break
+            continue
+        if len(low) != len(window):  # e.g. 'İ' lowercases to two characters: offsets no longer line up
+            notices = _COPYRIGHT.finditer(text, start, start + WINDOW)
+        else:
+            notices = (_COPYRIGHT.match(text, start + i) for i in _marks(low))
+        for m in notices:
+            if m:
+                years.add(int(m.group('year')))
+                if m.group('year2'):
+                    years.add(int(m.group('year2')))
+    return found
+
+
+def _marks(low: str) -> Iterator[int]:
+    """Offsets in the first WINDOW characters of `low` where a copyright mark starts."""
+    for mark in COPYRIGHT_MARKS:
+        i = low.find(mark)
+        while -1 < i < WINDOW:
+            yield i
+            i = low.find(mark, i + 1)
+
+
+def scan(raw_html: str, body_text: str = '') -> Dict[str, Any]:
+    """Every marker in `raw_html`, plus contact details from `body_text`.
+
+    Returns emails / phones (deduplicated), addresses (['found'] when an address hint occurs),
+    copyright_years (sorted), schema_markers and booking_keywords (sorted, lowercase)."""
+    raw_html, body_text = raw_html or '', body_text or ''
+    emails: Set[str] = set()
+    phones: Set[str] = set()
+    years: Set[int] = set()
+    _contacts(raw_html, emails, phones)
+    _contacts(body_text, emails, phones)
+    found = _words(raw_html, ADDRESS_KEYWORDS + BOOKING_KEYWORDS, years)
+    address = bool(found & set(ADDRESS_KEYWORDS)) or bool(body_text and _words(body_text, ADDRESS_KEYWORDS))
+    return {
+        'emails': list(emails),
+        'phones': list(phones),
+        'addresses': ['found'] if address else [],
+        'copyright_years': sorted(years),
+        # matched case-sensitively, as has_structured_data always did
+        'schema_markers': [marker for marker in SCHEMA_MARKERS if marker in raw_html],
+        'booking_keywords': sorted(found & set(BOOKING_KEYWORDS)),
+    }
+
+
+def contact_info(result: Dict[str, Any]) -> Dict[str, List[str]]:
+    """The find_contact_info() shape of a scan() result."""
+    return {'emails': result['emails'], 'phones': result['phones'], 'addresses': result['addresses']}
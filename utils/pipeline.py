@@ -0,0 +1,490 @@
+"""pipeline.py
+
+Streaming lead pipeline: discover -> fetch/parse -> render -> LLM -> score -> deploy.
+
+Each stage is a pool of worker threads reading from a bounded queue, so a slow stage pushes back
+on the ones before it instead of buffering every lead in memory, and a lead that scores under the
+threshold is handed to the deployer while discovery is still paging. Every stage keeps its own
+counters (items, errors, busy time, time spent waiting for input or blocked on the next queue,
+peak queue depth); the busiest stage is reported as the bottleneck.
+
+Usage:
+python pipeline.py --location 29.6516,-82.3248 --radius 5000 --type restaurant --output leads.jsonl
+python pipeline.py --bbox 29.60,-82.40,29.70,-82.25 --radius 1500 --type restaurant
+python pipeline.py --urls urls.txt --no-deploy
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from fetcher import run_sync
+import report_io
+
+Lead = Dict[str, Any]
+StageFn = Callable[[Lead], Optional[Lead]]
+
+DEFAULT_THRESHOLD = 50
+DEFAULT_QUEUE_SIZE = 16
+
+# Pushed once per downstream worker when a stage has drained.
+_STOP = object()
+
+
+class StageMetrics:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_s = 0.0
+        self.wait_in_s = 0.0
+        self.blocked_out_s = 0.0
+        self.max_queue_depth = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, **deltas: float) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def snapshot(self, queue_depth: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished or time.perf_counter()
+            wall = (end - self.started) if self.started else 0.0
+            return {
+                'workers': self.workers,
+                'items_in': self.items_in,
+                'items_out': self.items_out,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'busy_s': round(self.busy_s, 3),
+                'wait_in_s': round(self.wait_in_s, 3),
+                'blocked_out_s': round(self.blocked_out_s, 3),
+                'mean_item_s': round(self.busy_s / self.items_in, 3) if self.items_in else 0.0,
+                # share of the stage's worker-seconds spent doing work; ~1.0 means it is the limit
+                'utilization': round(self.busy_s / (wall * self.workers), 3) if wall > 0 else 0.0,
+                'queue_depth': queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+            }
+
+
+class Stage:
+    """`workers` threads applying `fn` to leads from a bounded input queue.
+
+    `fn` returns the lead to pass on, or None to drop it. A lead that raised is marked with
+    lead['error'] and passed on untouched; later stages skip it unless `handles_errors` is set.
+    """
+
+    def __init__(self, name: str, fn: StageFn, workers: int = 1, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 handles_errors: bool = False):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.handles_errors = handles_errors
+        self.inbox: 'queue.Queue[Any]' = queue.Queue(maxsize=max(1, queue_size))
+        self.metrics = StageMetrics(name, self.workers)
+        self.next: Optional[Stage] = None
+        self._threads: List[threading.Thread] = []
+        self._live = self.workers
+        self._live_lock = threading.Lock()
+
+    def put(self, lead: Any) -> float:
+        """Enqueue `lead`, blocking while the queue is full; returns the time spent blocked."""
+        t0 = time.perf_counter()
+        self.inbox.put(lead)
+        blocked = time.perf_counter() - t0
+        depth = self.inbox.qsize()
+        if depth > self.metrics.max_queue_depth:
+            self.metrics.max_queue_depth = depth
+        return blocked
+
+    def start(self) -> None:
+        self.metrics.started = time.perf_counter()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f'{self.name}-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def join(self) -> None:
+        for t in self._threads:
+            t.join()
+
+    def _forward(self, lead: Lead) -> None:
+        if self.next is not None:
+            self.metrics.add(blocked_out_s=self.next.put(lead))
+
+    def _work(self) -> None:
+        m = self.metrics
+        while True:
+            t0 = time.perf_counter()
+            lead = self.inbox.get()
+            m.add(wait_in_s=time.perf_counter() - t0)
+            if lead is _STOP:
+                break
+            if lead.get('error') and not self.handles_errors:
+                self._forward(lead)
+                continue
+            t1 = time.perf_counter()
+            try:
+                out = self.fn(lead)
+            except Exception as e:
+                lead['error'] = f'{self.name}: {type(e).__name__}: {e}'
+                out = lead
+                m.add(errors=1)
+            m.add(items_in=1, busy_s=time.perf_counter() - t1)
+            if out is None:
+                m.add(dropped=1)
+                continue
+            m.add(items_out=1)
+            self._forward(out)
+        with self._live_lock:
+            self._live -= 1
+            last = self._live == 0
+        if last:
+            m.finished = time.perf_counter()
+            if self.next is not None:
+                for _ in range(self.next.workers):
+                    self.next.put(_STOP)
+
+
+class Pipeline:
+    """Stages connected in order; the source iterator is drained on its own thread."""
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError('a pipeline needs at least one stage')
+        self.stages = stages
+        for a, b in zip(stages, stages[1:]):
+            a.next = b
+        self.source_metrics = StageMetrics('discover', 1)
+
+    def _feed(self, source: Iterable[Lead]) -> None:
+        m = self.source_metrics
+        first = self.stages[0]
+        m.started = time.perf_counter()
+        try:
+            it = iter(source)
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    lead = next(it)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    print(f'Warning: discovery failed: {type(e).__name__}: {e}', file=sys.stderr)
+                    m.add(errors=1)
+                    break
+                m.add(items_in=1, items_out=1, busy_s=time.perf_counter() - t0)
+                m.add(blocked_out_s=first.put(lead))
+        finally:
+            m.finished = time.perf_counter()
+            for _ in range(first.workers):
+                first.put(_STOP)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        out = {'discover': self.source_metrics.snapshot()}
+        for s in self.stages:
+            out[s.name] = s.metrics.snapshot(s.inbox.qsize())
+        return out
+
+    def run(self, source: Iterable[Lead], report_every_s: Optional[float] = None) -> Dict[str, Any]:
+        """Push every lead from `source` through the stages; returns per-stage metrics and the bottleneck."""
+        started = time.perf_counter()
+        for s in self.stages:
+            s.start()
+        feeder = threading.Thread(target=self._feed, args=(source,), name='discover', daemon=True)
+        feeder.start()
+        last = self.stages[-1]
+        if report_every_s:
+            while any(t.is_alive() for t in last._threads):
+                time.sleep(report_every_s)
+                print(format_metrics(self.metrics()), file=sys.stderr)
+        feeder.join()
+        for s in self.stages:
+            s.join()
+        stages = self.metrics()
+        return {
+            'wall_s': round(time.perf_counter() - started, 3),
+            'stages': stages,
+            'bottleneck': max(stages, key=lambda k: stages[k]['utilization']),
+        }
+
+
+def format_metrics(stages: Dict[str, Dict[str, Any]]) -> str:
+    rows = [f"{'stage':10} {'in':>6} {'out':>6} {'err':>4} {'busy_s':>8} {'util':>5} {'queue':>5}"]
+    for name, s in stages.items():
+        rows.append(f"{name:10} {s['items_in']:6} {s['items_out']:6} {s['errors']:4} {s['busy_s']:8.1f} "
+                    f"{s['utilization']:5.2f} {s['queue_depth']:5}")
+    return '\n'.join(rows)
+
+
+# --- sources -------------------------------------------------------------------------------------
+
+def leads_from_businesses(businesses: Iterable[Dict]) -> Iterator[Lead]:
+    """Wrap Places results as leads; businesses without a website are skipped."""
+    for biz in businesses:
+        if biz.get('website'):
+            yield {'url': biz['website'], 'business': biz}
+
+
+def leads_from_urls(urls: Iterable[str]) -> Iterator[Lead]:
+    for u in urls:
+        yield {'url': u}
+
+
+# --- stage functions -----------------------------------------------------------------------------
+
+def fetch_stage(use_lighthouse: bool = True, use_vision: bool = True, **analyze_opts) -> StageFn:
+    """analyze() without AI suggestions (the LLM stage adds them). With `qualify_threshold` in
+    `analyze_opts` the audit is staged and later stages honour measures['qualification']."""
+    from website_quality_checker import analyze
+
+    def _fetch(lead: Lead) -> Lead:
+        lead['measures'] = analyze(lead['url'], use_ai=False, use_lighthouse=use_lighthouse, use_vision=use_vision,
+                                   **analyze_opts)
+        return lead
+    return _fetch
+
+
+@contextmanager
+def _lead_timer(measures: Dict[str, Any]) -> Iterator[None]:
+    """Add the block to the audit timings that the fetch stage started in measures['timings']."""
+    import instrument
+    with instrument.audit(instrument.AuditTimer.from_dict(measures.get('timings'))) as timer:
+        yield
+    measures['timings'] = timer.as_dict()
+
+
+def render_stage() -> StageFn:
+    import instrument
+    import lead_qualifier
+    from playwright_capture import render_page
+    from website_quality_checker import record_render
+
+    def _render(lead: Lead) -> Lead:
+        if lead_qualifier.skipped(lead['measures'], 'vision'):
+            return lead
+        with _lead_timer(lead['measures']):
+            rendered = run_sync(instrument.timed('render', render_page(lead['url'])))
+        record_render(lead['measures'], rendered)
+        if rendered.get('error'):
+            lead['measures']['ai_verdict_error'] = rendered['error']
+        else:
+            lead['rendered'] = rendered
+        return lead
+    return _render
+
+
+def llm_stage(use_ai: bool = True, use_vision: bool = True) -> StageFn:
+    import instrument
+    import lead_qualifier
+    from ai_quick_suggester import generate_suggestions
+    from simplevison import ai_verdict
+    from website_quality_checker import record_ai_verdict
+
+    def _llm(lead: Lead) -> Lead:
+        measures = lead['measures']
+        with _lead_timer(measures):
+            if use_ai and lead_qualifier.decided(measures) == 'not_lead':
+                lead_qualifier.skip(measures, 'suggestions', 'not a lead; suggestions only feed the redesign prompt')
+                measures['ai_suggestions'] = []
+            elif use_ai:
+                info = {}
+                try:
+                    with instrument.stage('suggestions'):
+                        measures['ai_suggestions'] = generate_suggestions(measures, info=info)
+                except Exception:
+                    measures['ai_suggestions'] = []
+                measures['ai_suggestions_cache'] = info.get('cache')
+            else:
+                measures['ai_suggestions'] = []
+            rendered = lead.pop('rendered', None)
+            if use_vision and rendered is not None:
+                info = {}
+                try:
+                    judge = ai_verdict(lead['url'], rendered=rendered, info=info, meta=measures.get('meta'))
+                    verdict = run_sync(instrument.timed('vision', judge))
+                    record_ai_verdict(measures, verdict, info)
+                except Exception as e:
+                    measures['ai_verdict_error'] = str(e)
+        return lead
+    return _llm
+
+
+def score_stage(out_f, threshold: float = DEFAULT_THRESHOLD, artifacts: Optional[report_io.ArtifactStore] = None,
+                full: bool = False, metrics=None) -> StageFn:
+    """Build the report, append it to `out_f` (JSON lines) and pass on only leads under `threshold`.
+
+    `metrics` (an instrument.MetricsExporter) receives every report's timings block."""
+    from website_quality_checker import finalize_report
+    write_lock = threading.Lock()
+
+    def _score(lead: Lead) -> Optional[Lead]:
+        if lead.get('error'):
+            report = {'url': lead['url'], 'error': lead['error']}
+        else:
+            report = finalize_report(lead['url'], lead.pop('measures'))
+            if metrics is not None:
+                metrics.observe(report.get('timings'))
+            if not full:
+                report = report_io.slim_report(report, artifacts)
+        if lead.get('business'):
+            report['business'] = lead['business']
+        line = report_io.dumps(report) + b'\n'
+        with write_lock:
+            out_f.write(line)
+            out_f.flush()
+        total = report.get('scores', {}).get('total')
+        print(f"{lead['url']} -> {total if total is not None else 'error'}")
+        if total is None or total >= threshold:
+            return None
+        lead['report'] = report
+        return lead
+    return _score
+
+
+def deploy_stage(deploy_fn: Callable[[Lead], Dict[str, Any]], out_f) -> StageFn:
+    """Run `deploy_fn(lead)` and append {'url', 'deploy': result} to `out_f` (JSON lines)."""
+    write_lock = threading.Lock()
+
+    def _deploy(lead: Lead) -> Lead:
+        result = deploy_fn(lead)
+        line = report_io.dumps({'url': lead['url'], 'deploy': result}) + b'\n'
+        with write_lock:
+            out_f.write(line)
+            out_f.flush()
+        print(f"Deployed {lead['url']}: {result.get('url') or result.get('error')}")
+        return lead
+    return _deploy
+
+
+def worker_deploy(lead: Lead) -> Dict[str, Any]:
+    """Deploy through the persistent Node deploy worker (deploy_client.py) with a prompt built from the report."""
+    import deploy_client
+    try:
+        return deploy_client.get_worker().deploy_report(lead['report']).result(deploy_client.DEFAULT_TIMEOUT_S)
+    except Exception as e:
+        return {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+
+
+def build_pipeline(out_f, deploy_f=None, threshold: float = DEFAULT_THRESHOLD, use_ai: bool = True,
+                   use_vision: bool = True, fetch_workers: int = 8, render_workers: int = 4, llm_workers: int = 4,
+                   score_workers: int = 1, deploy_workers: int = 2, queue_size: int = DEFAULT_QUEUE_SIZE,
+                   deploy_fn: Optional[Callable[[Lead], Dict[str, Any]]] = worker_deploy,
+                   artifacts: Optional[report_io.ArtifactStore] = None, full: bool = False, metrics=None,
+                   **analyze_opts) -> Pipeline:
+    """Assemble the standard stages. The render stage is left out without vision, the LLM stage
+    without both AI and vision, and the deploy stage when `deploy_f` or `deploy_fn` is None."""
+    stages = [Stage('fetch', fetch_stage(use_vision=use_vision, **analyze_opts), fetch_workers, queue_size)]
+    if use_vision:
+        stages.append(Stage('render', render_stage(), render_workers, queue_size))
+    if use_ai or use_vision:
+        stages.append(Stage('llm', llm_stage(use_ai=use_ai, use_vision=use_vision), llm_workers, queue_size))
+    stages.append(Stage('score', score_stage(out_f, threshold, artifacts, full, metrics), score_workers, queue_size,
+                        handles_errors=True))
+    if deploy_f is not None and deploy_fn is not None:
+        stages.append(Stage('deploy', deploy_stage(deploy_fn, deploy_f), deploy_workers, queue_size))
+    return Pipeline(stages)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Discover, audit, score and deploy leads as one streaming pipeline.')
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument('--location', help='"lat,lng" centre for a Nearby Search')
+    src.add_argument('--bbox', help='south,west,north,east for a grid sweep (see geo_sweep.py)')
+    src.add_argument('--urls', help="File of URLs, one per line ('-' for stdin)")
+    ap.add_argument('--radius', type=float, default=5000, help='Search radius in meters')
+    ap.add_argument('--type', default='restaurant', help='Google Places type')
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Deploy leads scoring under this (default 50)')
+    ap.add_argument('--output', default='pipeline_results.jsonl', help='JSON-lines reports')
+    ap.add_argument('--deploy-output', default='deploys.jsonl', help='JSON-lines deploy results')
+    ap.add_argument('--no-deploy', action='store_true', help='Score only; do not deploy low-scoring leads')
+    ap.add_argument('--no-ai', action='store_true', help='Skip AI suggestions')
+    ap.add_argument('--no-vision', action='store_true', help='Skip the render stage and the vision verdict')
+    ap.add_argument('--no-lighthouse', action='store_true', help='Skip the Lighthouse run')
+    ap.add_argument('--qualify', action='store_true', help='Skip the stages (Lighthouse, render, vision, ...) that cannot move a site across --threshold')
+    ap.add_argument('--full', action='store_true', help='Embed raw artifacts in the reports')
+    ap.add_argument('--artifacts-dir', default='artifacts', help='Content-addressed store for raw artifacts')
+    ap.add_argument('--fetch-workers', type=int, default=8)
+    ap.add_argument('--render-workers', type=int, default=4)
+    ap.add_argument('--llm-workers', type=int, default=4)
+    ap.add_argument('--score-workers', type=int, default=1)
+    ap.add_argument('--deploy-workers', type=int, default=2, help='Deploys in flight (the Node worker runs them concurrently)')
+    ap.add_argument('--deploy-provider', choices=('vercel', 'stub'), help="'stub' deploys nowhere (for tests)")
+    ap.add_argument('--ai-batch', type=int, default=0, metavar='N', help='Pack up to N sites into one AI suggestion request')
+    ap.add_argument('--ai-token-budget', type=int, help='Prompt + answer tokens allowed per batched AI request (default 6000)')
+    ap.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help='Bound on each stage queue')
+    ap.add_argument('--metrics-every', type=float, help='Print stage metrics to stderr every N seconds')
+    ap.add_argument('--metrics-out', help='Write per-audit-stage timing histograms here while running (see instrument.py)')
+    ap.add_argument('--metrics-format', choices=('prom', 'jsonl'), default='prom', help='Prometheus text (rewritten) or JSON lines (appended); default prom')
+    args = ap.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if args.urls:
+        from website_quality_checker import read_urls
+        source = leads_from_urls(read_urls(args.urls))
+    else:
+        api_key = os.environ.get('GOOGLE_API_KEY') or os.environ.get('PLACES_API_KEY')
+        if not api_key:
+            ap.error('set GOOGLE_API_KEY (or PLACES_API_KEY)')
+        if args.bbox:
+            import geo_sweep
+            bbox = tuple(float(x) for x in args.bbox.split(','))
+            seen = geo_sweep.SeenPlaces(os.path.join(geo_sweep.DEFAULT_CACHE_DIR, 'seen_places.sqlite'))
+            source = leads_from_businesses(geo_sweep.sweep(api_key, args.radius, args.type, bbox=bbox, seen=seen))
+        else:
+            import businesearch
+            source = leads_from_businesses(businesearch.iter_local_businesses(
+                api_key, args.location, radius=int(args.radius), business_type=args.type))
+
+    artifacts = report_io.ArtifactStore(args.artifacts_dir) if args.artifacts_dir and not args.full else None
+    if args.ai_batch > 1:
+        import ai_quick_suggester
+        ai_quick_suggester.configure_batching(
+            args.ai_batch, token_budget=args.ai_token_budget or ai_quick_suggester.DEFAULT_BATCH_TOKEN_BUDGET)
+    if not args.no_deploy:
+        import deploy_client
+        deploy_client.configure(concurrency=args.deploy_workers, provider=args.deploy_provider)
+    deploy_f = None if args.no_deploy else open(args.deploy_output, 'ab')
+    metrics = None
+    if args.metrics_out:
+        import instrument
+        metrics = instrument.MetricsExporter(args.metrics_out, args.metrics_format, args.metrics_every or 30.0)
+    try:
+        with open(args.output, 'ab') as out_f:
+            pipeline = build_pipeline(
+                out_f, deploy_f, threshold=args.threshold, use_ai=not args.no_ai, use_vision=not args.no_vision,
+                fetch_workers=args.fetch_workers, render_workers=args.render_workers, llm_workers=args.llm_workers,
+                score_workers=args.score_workers, deploy_workers=args.deploy_workers, queue_size=args.queue_size,
+                artifacts=artifacts, full=args.full, use_lighthouse=not args.no_lighthouse, keep_lighthouse_raw=args.full,
+                qualify_threshold=args.threshold if args.qualify else None, metrics=metrics,
+            )
+            summary = pipeline.run(source, report_every_s=args.metrics_every)
+    finally:
+        if deploy_f is not None:
+            deploy_f.close()
+        if metrics is not None:
+            metrics.close()
+    if not args.no_ai:
+        import ai_quick_suggester
+        summary['suggestion_cache'] = ai_quick_suggester.cache_stats()
+        summary['suggestion_batches'] = ai_quick_suggester.batch_stats()
+    print(format_metrics(summary['stages']))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,103 @@
 
 Capture computed styles and optional screenshot using Playwright.
 This module is optional — it fails gracefully if Playwright is not installed.
+Pages are rendered in the shared browser pool (browser_pool.py) instead of a fresh Chromium per call.
 """
 from __future__ import annotations
+import asyncio
 import base64
-import json
 from typing import Dict, Any, Optional
 
+from browser_pool import get_pool
+from fetcher import run_sync
+
+# JS expression to collect computed styles for some selectors
+DOM_STYLES_JS = r'''
+(function(){
+    const selectors = ['body','header','nav','main','footer','h1','h2','h3','p','a','img','.hero','section'];
+    const out = [];
+    function styleFor(el){
+        const cs = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return {
+            fontFamily: cs.fontFamily || null,
+            fontSize: cs.fontSize || null,
+            fontWeight: cs.fontWeight || null,
+            color: cs.color || null,
+            backgroundColor: cs.backgroundColor || null,
+            display: cs.display || null,
+            width: rect.width || null,
+            height: rect.height || null,
+            margin: cs.margin || null,
+            padding: cs.padding || null,
+            textTransform: cs.textTransform || null
+        };
+    }
+    selectors.forEach(sel => {
+        const nodes = Array.from(document.querySelectorAll(sel)).slice(0,5);
+        nodes.forEach((n, idx) => {
+            out.push({selector: sel, index: idx, text: n.innerText ? n.innerText.trim().slice(0,200) : '', computed: styleFor(n)});
+        });
+    });
+    // add top-level metrics
+    const fonts = Array.from(new Set(Array.from(document.querySelectorAll('*')).map(n=>window.getComputedStyle(n).fontFamily).filter(Boolean))).slice(0,20);
+    return {elements: out, fonts: fonts, title: document.title || ''};
+})()
+'''
+
+VIEWPORTS = {'desktop': {'width': 1280, 'height': 800}, 'mobile': {'width': 375, 'height': 812}}
+# Viewport the vision verdict is tuned for.
+RENDER_VIEWPORT = {'width': 1280, 'height': 720}
+
+# Resolves once web fonts are loaded and the DOM has been quiet for `quietMs` (or `maxMs` passed).
+# Replaces a fixed sleep after navigation: fast pages are captured sooner, and pages that are
+# still hydrating get a little longer.
+READY_JS = r'''
+({quietMs, maxMs}) => new Promise(resolve => {
+    const start = performance.now();
+    let last = start;
+    const obs = new MutationObserver(() => { last = performance.now(); });
+    obs.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const fontsReady = (document.fonts && document.fonts.ready) ? document.fonts.ready : Promise.resolve();
+    fontsReady.then(() => {
+        const tick = () => {
+            const now = performance.now();
+            if (now - last >= quietMs || now - start >= maxMs) {
+                obs.disconnect();
+                resolve(Math.round(now - start));
+            } else {
+                setTimeout(tick, 50);
+            }
+        };
+        tick();
+    });
+})
+'''
+
+
+def _dom_job(url: str, timeout: int, take_screenshot: bool):
+    async def _job(page):
+        page.set_default_navigation_timeout(timeout * 1000)
+        await page.goto(url, wait_until='networkidle')
+        dom = await page.evaluate(DOM_STYLES_JS)
+        img = await page.screenshot(full_page=True) if take_screenshot else None
+        return dom, img
+    return _job
+
+
+async def capture_dom_styles_async(url: str, timeout: int = 20, device: str = 'desktop', take_screenshot: bool = False) -> Dict[str, Any]:
+    """Async variant of capture_dom_styles; many URLs can be awaited together (bounded by the pool)."""
+    try:
+        import playwright  # noqa: F401
+    except Exception as e:
+        return {'error': f'playwright_unavailable: {e}'}
+
+    try:
+        dom, img = await get_pool().run(_dom_job(url, timeout, take_screenshot), viewport=VIEWPORTS.get(device, VIEWPORTS['mobile']))
+    except Exception as e:
+        return {'error': f'playwright_error: {e}'}
+    return _result(dom, img)
+
 
 def capture_dom_styles(url: str, timeout: int = 20, device: str = 'desktop', take_screenshot: bool = False) -> Dict[str, Any]:
     """Attempt to render the page with Playwright and capture computed styles.
@@ -18,69 +109,77 @@ def capture_dom_styles(url: str, timeout: int = 20, device: str = 'desktop', tak
       - error: present if any failure
     """
     try:
-        from playwright.sync_api import sync_playwright
+        import playwright  # noqa: F401
+    except Exception as e:
+        return {'error': f'playwright_unavailable: {e}'}
+
+    try:
+        dom, img = get_pool().run_sync(_dom_job(url, timeout, take_screenshot), viewport=VIEWPORTS.get(device, VIEWPORTS['mobile']))
+    except Exception as e:
+        return {'error': f'playwright_error: {e}'}
+    return _result(dom, img)
+
+
+async def render_page(url: str, timeout: int = 20, full_page: bool = False, capture_styles: bool = True,
+                      network_idle_ms: int = 5000, quiet_ms: int = 300, max_settle_ms: int = 3000) -> Dict[str, Any]:
+    """Navigate once and collect everything the audit needs from a rendered page.
+
+    Returns a dict with keys:
+      - screenshot_png: viewport screenshot bytes (1280x720)
+      - full_page_png: full-page screenshot bytes (only if full_page True)
+      - dom_styles / fonts: computed-style summary (only if capture_styles True)
+      - timings_ms: navigation and readiness timings
+      - error: present if any failure
+    """
+    try:
+        import playwright  # noqa: F401
     except Exception as e:
         return {'error': f'playwright_unavailable: {e}'}
 
-    result: Dict[str, Any] = {'dom_styles': []}
+    async def _job(page):
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        page.set_default_navigation_timeout(timeout * 1000)
+        await page.goto(url, wait_until='domcontentloaded')
+        t_dom = loop.time()
+        try:
+            # most pages go idle quickly; long-polling / analytics-heavy ones just hit the cap
+            await page.wait_for_load_state('networkidle', timeout=network_idle_ms)
+        except Exception:
+            pass
+        try:
+            settle = await page.evaluate(READY_JS, {'quietMs': quiet_ms, 'maxMs': max_settle_ms})
+        except Exception:
+            settle = None
+        t_ready = loop.time()
+        out: Dict[str, Any] = {'screenshot_png': await page.screenshot(full_page=False)}
+        if full_page:
+            out['full_page_png'] = await page.screenshot(full_page=True)
+        if capture_styles:
+            dom = await page.evaluate(DOM_STYLES_JS)
+            out['dom_styles'] = dom
+            out['fonts'] = (dom or {}).get('fonts', [])
+        out['timings_ms'] = {
+            'domcontentloaded': round((t_dom - t0) * 1000),
+            'ready': round((t_ready - t0) * 1000),
+            'settle': settle,
+            'total': round((loop.time() - t0) * 1000),
+        }
+        return out
+
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(viewport={'width': 1280, 'height': 800} if device == 'desktop' else {'width': 375, 'height': 812})
-            page = context.new_page()
-            page.set_default_navigation_timeout(timeout * 1000)
-            page.goto(url, wait_until='networkidle')
-
-            # JS expression to collect computed styles for some selectors
-            js = r'''
-            (function(){
-                const selectors = ['body','header','nav','main','footer','h1','h2','h3','p','a','img','.hero','section'];
-                const out = [];
-                function styleFor(el){
-                    const cs = window.getComputedStyle(el);
-                    const rect = el.getBoundingClientRect();
-                    return {
-                        fontFamily: cs.fontFamily || null,
-                        fontSize: cs.fontSize || null,
-                        fontWeight: cs.fontWeight || null,
-                        color: cs.color || null,
-                        backgroundColor: cs.backgroundColor || null,
-                        display: cs.display || null,
-                        width: rect.width || null,
-                        height: rect.height || null,
-                        margin: cs.margin || null,
-                        padding: cs.padding || null,
-                        textTransform: cs.textTransform || null
-                    };
-                }
-                selectors.forEach(sel => {
-                    const nodes = Array.from(document.querySelectorAll(sel)).slice(0,5);
-                    nodes.forEach((n, idx) => {
-                        out.push({selector: sel, index: idx, text: n.innerText ? n.innerText.trim().slice(0,200) : '', computed: styleFor(n)});
-                    });
-                });
-                // add top-level metrics
-                const fonts = Array.from(new Set(Array.from(document.querySelectorAll('*')).map(n=>window.getComputedStyle(n).fontFamily).filter(Boolean))).slice(0,20);
-                return {elements: out, fonts: fonts, title: document.title || ''};
-            })()
-            '''
-
-            dom = page.evaluate(js)
-            result['dom_styles'] = dom
-
-            if take_screenshot:
-                img = page.screenshot(full_page=True)
-                result['screenshot_base64'] = base64.b64encode(img).decode('ascii')
-
-            try:
-                context.close()
-            except Exception:
-                pass
-            try:
-                browser.close()
-            except Exception:
-                pass
+        return await get_pool().run(_job, viewport=RENDER_VIEWPORT)
     except Exception as e:
         return {'error': f'playwright_error: {e}'}
 
+
+def render_page_sync(url: str, **kwargs) -> Dict[str, Any]:
+    """Blocking wrapper around render_page for sync callers."""
+    return run_sync(render_page(url, **kwargs))
+
+
+def _result(dom: Any, img: Optional[bytes]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {'dom_styles': dom}
+    if img is not None:
+        result['screenshot_base64'] = base64.b64encode(img).decode('ascii')
     return result
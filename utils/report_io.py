@@ -0,0 +1,97 @@
+"""report_io.py
+
+Report serialization. Compact reports keep scores, indicators and the scalar measures; bulky raw
+artifacts (raw HTML, the full parsed page, the Lighthouse report) are written once to a
+content-addressed store and referenced by sha256. Uses orjson when installed.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# parsed-page fields small enough to keep inline (the scorer reads social_links)
+SLIM_PARSED_KEYS = ('social_links', 'favicon', 'canonical', 'viewport')
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        opts = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=opts)
+    return json.dumps(obj, indent=2 if indent else None, default=str).encode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: str, obj: Any, indent: bool = True) -> None:
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, indent=indent))
+
+
+def report_path(out_dir: str, url: str, ext: str = '.json') -> str:
+    """Unique per-URL report path: `<out_dir>/<host>-<sha1 of url>.json`, so concurrent runs never share a file."""
+    host = re.sub(r'[^A-Za-z0-9.-]+', '_', urlparse(url).netloc or 'site')[:60]
+    return os.path.join(out_dir, f"{host}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}{ext}")
+
+
+class ArtifactStore:
+    """Content-addressed, gzip-compressed JSON blobs under `root/<aa>/<sha256>.json.gz`."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f'{digest}.json.gz')
+
+    def put(self, obj: Any) -> str:
+        data = dumps(obj)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with gzip.open(tmp, 'wb', compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return f'sha256:{digest}'
+
+    def get(self, ref: str) -> Any:
+        digest = ref.split(':', 1)[-1]
+        with gzip.open(self._path(digest), 'rb') as f:
+            return loads(f.read())
+
+
+def slim_report(report: Dict[str, Any], store: Optional[ArtifactStore] = None) -> Dict[str, Any]:
+    """Return a compact copy of `report`: raw HTML, the full parsed page and any raw Lighthouse
+    report are moved to `store` (or dropped when no store is given) and referenced under
+    measures['artifacts']."""
+    measures = dict(report.get('measures') or {})
+    parsed = dict(measures.get('parsed') or {})
+    artifacts: Dict[str, str] = {}
+    if store is not None:
+        if parsed.get('raw_html'):
+            artifacts['raw_html'] = store.put(parsed['raw_html'])
+        rest = {k: v for k, v in parsed.items() if k != 'raw_html'}
+        if rest:
+            artifacts['parsed'] = store.put(rest)
+        if measures.get('lighthouse_raw'):
+            artifacts['lighthouse_raw'] = store.put(measures['lighthouse_raw'])
+    measures.pop('lighthouse_raw', None)
+    measures['parsed'] = {k: parsed[k] for k in SLIM_PARSED_KEYS if k in parsed}
+    if artifacts:
+        measures['artifacts'] = artifacts
+    out = dict(report)
+    out['measures'] = measures
+    return out
@@ -0,0 +1,197 @@
+"""rescore.py
+
+Re-score every audited site with a new weight/threshold profile, without re-crawling.
+
+Reads the scorer inputs kept by measures_store (every audit records them), recomputes the totals
+under a baseline profile (the built-in WEIGHTS/PARAMS unless --baseline is given) and under the new
+profile with the vectorized scorer, and prints which sites crossed the lead threshold either way.
+
+A profile is JSON; every field is optional and falls back to the built-in value:
+
+    {"weights": {"technical": 0.3, "ux_design": 0.25, "seo": 0.2, "credibility": 0.15, "content": 0.1},
+     "params": {"technical": {"response_max_s": 6.0}, "credibility": {"social_target": 2}},
+     "threshold": 45,
+     "ai_redo_delta": 20}
+
+Usage:
+python rescore.py --profile new_profile.json [--baseline old_profile.json] [--leads leads.jsonl]
+python rescore.py --import batch_results.jsonl --profile new_profile.json   # backfill from old reports
+"""
+from __future__ import annotations
+import argparse
+import copy
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import lead_qualifier
+import measures_store
+from disk_cache import DEFAULT_CACHE_DIR
+from scorer import AI_REDO_DELTA, PARAMS, WEIGHTS, compute_scores
+
+DEFAULT_THRESHOLD = 50
+
+
+def default_profile() -> Dict[str, Any]:
+    return {'weights': dict(WEIGHTS), 'params': copy.deepcopy(PARAMS), 'threshold': DEFAULT_THRESHOLD,
+            'ai_redo_delta': AI_REDO_DELTA}
+
+
+def load_profile(path: Optional[str]) -> Dict[str, Any]:
+    """The built-in profile with the overrides from the JSON file at `path` applied."""
+    profile = default_profile()
+    if not path:
+        return profile
+    with open(path, 'r', encoding='utf-8') as f:
+        overrides = json.load(f)
+    unknown = set(overrides) - set(profile)
+    if unknown:
+        raise ValueError(f'{path}: unknown profile fields {sorted(unknown)}')
+    for name, value in (overrides.get('weights') or {}).items():
+        if name not in profile['weights']:
+            raise ValueError(f'{path}: unknown weight {name!r}')
+        profile['weights'][name] = float(value)
+    for category, values in (overrides.get('params') or {}).items():
+        if category not in profile['params']:
+            raise ValueError(f'{path}: unknown params category {category!r}')
+        for name, value in values.items():
+            if name not in profile['params'][category]:
+                raise ValueError(f'{path}: unknown param {category}.{name}')
+            profile['params'][category][name] = float(value)
+    if 'threshold' in overrides:
+        profile['threshold'] = float(overrides['threshold'])
+    if 'ai_redo_delta' in overrides:
+        profile['ai_redo_delta'] = int(overrides['ai_redo_delta'])
+    return profile
+
+
+def _redo_delta(decision: Optional[str], delta: float) -> float:
+    return {'YES': -delta, 'NO': delta}.get((decision or '').upper(), 0)
+
+
+def score_entries(entries: List[Dict[str, Any]], profile: Dict[str, Any], cols=None) -> List[float]:
+    """Final totals (AI redo delta applied and clamped like finalize_report) for every stored entry.
+
+    `cols` is a batch_scorer.extract_columns() result for `entries`, reused across profiles."""
+    if cols is not None:
+        from batch_scorer import score_columns
+        totals = score_columns(cols, profile['weights'], profile['params'])['total'].tolist()
+    else:
+        totals = [compute_scores(e['measures'], profile['weights'], profile['params'])['total'] for e in entries]
+    return [max(0, min(100, t + _redo_delta(e.get('ai_decision'), profile['ai_redo_delta'])))
+            for t, e in zip(totals, entries)]
+
+
+def import_reports(store: measures_store.MeasuresStore, paths: List[str]) -> int:
+    """Backfill the store from JSON-lines report files (batch_results.jsonl, pipeline output)."""
+    n = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                report = json.loads(line)
+                if report.get('url') and report.get('measures'):
+                    store.record(report['url'], report['measures'])
+                    n += 1
+    return n
+
+
+def lead_status(entries: List[Dict[str, Any]], totals: List[float], profile: Dict[str, Any]) -> List[Optional[bool]]:
+    """Whether each site is under the profile's threshold.
+
+    A staged audit that stopped early left some inputs unmeasured; such a site is judged on the
+    lowest and highest total those inputs allow, and is None when they straddle the threshold."""
+    threshold = profile['threshold']
+    out: List[Optional[bool]] = []
+    for e, total in zip(entries, totals):
+        stages = lead_qualifier.unmeasured_stages(e.get('unmeasured'))
+        if not stages:
+            out.append(total < threshold)
+            continue
+        lo, hi = lead_qualifier.total_bounds(e['measures'], stages, profile['weights'], profile['params'])
+        delta = _redo_delta(e.get('ai_decision'), profile['ai_redo_delta'])
+        lo, hi = max(0, min(100, lo + delta)), max(0, min(100, hi + delta))
+        out.append(True if hi < threshold else False if lo >= threshold else None)
+    return out
+
+
+def diff_leads(entries: List[Dict[str, Any]], before: List[float], after: List[float],
+               was_lead: List[Optional[bool]], is_lead: List[Optional[bool]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Sites that became leads (now under the threshold) and sites that stopped being leads; sites
+    whose status is unknown (None) on either side are not counted as crossing."""
+    became, dropped = [], []
+    for e, b, a, was, now in zip(entries, before, after, was_lead, is_lead):
+        if was is not None and now is not None and was != now:
+            (became if now else dropped).append({'url': e['url'], 'before': b, 'after': a})
+    became.sort(key=lambda r: r['after'])
+    dropped.sort(key=lambda r: r['after'])
+    return {'became_leads': became, 'no_longer_leads': dropped}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--profile', help='JSON weight/threshold profile to score with (default: built-in values)')
+    ap.add_argument('--baseline', help='Profile the current lead list was scored with (default: built-in values)')
+    ap.add_argument('--store', default=os.path.join(DEFAULT_CACHE_DIR, 'measures.sqlite'), help='Measures store written by the audits')
+    ap.add_argument('--import', dest='imports', nargs='*', default=[], metavar='REPORTS', help='JSON-lines reports to load into the store first')
+    ap.add_argument('--leads', help='Write the new lead list (url, total) here as JSON lines')
+    ap.add_argument('--diff-output', help='Write the threshold-crossing diff here as JSON')
+    ap.add_argument('--show', type=int, default=20, help='Sites listed per direction of the printed diff (default 20)')
+    args = ap.parse_args()
+
+    store = measures_store.MeasuresStore(args.store)
+    if args.imports:
+        print(f'Imported {import_reports(store, args.imports)} reports into {args.store}')
+    baseline, profile = load_profile(args.baseline), load_profile(args.profile)
+
+    t0 = time.perf_counter()
+    entries = list(store.entries())
+    t_load = time.perf_counter() - t0
+    if not entries:
+        print(f'No stored measures in {args.store}; run some audits (or --import reports) first.')
+        return
+
+    t0 = time.perf_counter()
+    try:
+        from batch_scorer import extract_columns
+        cols = extract_columns(e['measures'] for e in entries)
+    except ImportError:  # numpy missing: fall back to the scalar scorer
+        cols = None
+    before = score_entries(entries, baseline, cols)
+    after = score_entries(entries, profile, cols)
+    t_score = time.perf_counter() - t0
+
+    was_lead, is_lead = lead_status(entries, before, baseline), lead_status(entries, after, profile)
+    diff = diff_leads(entries, before, after, was_lead, is_lead)
+    leads = sorted(((e['url'], a) for e, a, now in zip(entries, after, is_lead) if now), key=lambda r: r[1])
+    print(f'{len(entries)} sites: loaded in {t_load:.2f}s, scored twice in {t_score:.2f}s'
+          + ('' if cols is not None else ' (scalar scorer; install numpy for the vectorized one)'))
+    print(f"leads under {baseline['threshold']:g} before: {sum(1 for w in was_lead if w)}, "
+          f"under {profile['threshold']:g} now: {len(leads)}")
+    undecided = sum(1 for now in is_lead if now is None)
+    if undecided:
+        print(f'{undecided} sites have unmeasured inputs (staged audit) that could put them on either side; '
+              f're-audit them without --qualify to place them')
+    print(f"became leads: {len(diff['became_leads'])}, no longer leads: {len(diff['no_longer_leads'])}")
+    for sign, rows in (('+', diff['became_leads']), ('-', diff['no_longer_leads'])):
+        for row in rows[:args.show]:
+            print(f"  {sign} {row['url']}  {row['before']:g} -> {row['after']:g}")
+        if len(rows) > args.show:
+            print(f'  {sign} ... and {len(rows) - args.show} more (see --diff-output)')
+
+    if args.leads:
+        with open(args.leads, 'w', encoding='utf-8') as f:
+            for url, total in leads:
+                f.write(json.dumps({'url': url, 'total': total}) + '\n')
+        print(f'Wrote {len(leads)} leads to {args.leads}')
+    if args.diff_output:
+        with open(args.diff_output, 'w', encoding='utf-8') as f:
+            json.dump(diff, f, indent=2)
+        print(f'Wrote diff to {args.diff_output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -21,76 +21,104 @@ def normalize_0_100(x: float) -> int:
     return int(round(v * 100))
 
 
-def score_from_lighthouse(lh_scores: Dict[str,float]) -> float:
+# Points a vision verdict moves the total (finalize_report): a redesign candidate loses them, a modern site gains them.
+AI_REDO_DELTA = 30
+
+# Coefficients and cut-offs of the sub-metrics below. A re-scoring profile (see rescore.py) can
+# override any of them, together with WEIGHTS, without re-crawling.
+PARAMS = {
+    'lighthouse': {'performance': 0.5, 'accessibility': 0.25, 'seo': 0.15, 'best-practices': 0.10},
+    'technical': {'ssl': 0.35, 'mobile': 0.25, 'response': 0.2, 'security_headers': 0.1, 'broken_links': 0.1,
+                  'response_ideal_s': 1.0, 'response_max_s': 10.0, 'broken_link_penalty': 0.15},
+    'ux_design': {'text_ratio': 0.4, 'headings': 0.3, 'h1': 0.15, 'paragraphs': 0.15, 'text_ratio_scale': 2,
+                  'headings_target': 12, 'h1_multiple': 0.5, 'h1_missing': 0.2,
+                  'para_min_words': 20, 'para_max_words': 80, 'para_center_words': 40, 'para_falloff_words': 100},
+    'seo': {'title': 0.25, 'title_length': 0.2, 'description': 0.2, 'images_alt': 0.15, 'canonical': 0.1, 'sitemap': 0.1,
+            'title_min_chars': 30, 'title_max_chars': 70, 'title_center_chars': 50, 'title_falloff_chars': 100},
+    'credibility': {'contact': 0.3, 'ssl': 0.25, 'schema': 0.15, 'copyright': 0.1, 'social': 0.2, 'social_target': 3},
+    'content': {'keyword_relevance': 0.6, 'external_resources': 0.4},
+}
+
+
+def score_from_lighthouse(lh_scores: Dict[str,float], params: Dict[str, float] = None) -> float:
     # use performance & accessibility as main
+    p = params or PARAMS['lighthouse']
     perf = lh_scores.get('performance', 0.0)
     access = lh_scores.get('accessibility', 0.0)
     seo = lh_scores.get('seo', 0.0)
     bp = lh_scores.get('best-practices', 0.0)
     # weighted
-    return (0.5 * perf + 0.25 * access + 0.15 * seo + 0.10 * bp)
+    return (p['performance'] * perf + p['accessibility'] * access + p['seo'] * seo + p['best-practices'] * bp)
 
 
-def compute_scores(measures: Dict[str,Any]) -> Dict[str,Any]:
+def compute_scores(measures: Dict[str,Any], weights: Dict[str, float] = None, params: Dict[str, Dict[str, float]] = None) -> Dict[str,Any]:
     # measures is expected to contain keys from analyzer and scraper
     # We'll calculate sub-scores (0..1) for key facets and combine them into category scores,
     # then map category scores to 0..100 using weights defined in WEIGHTS.
+    # `weights` / `params` default to WEIGHTS / PARAMS.
+    weights = weights or WEIGHTS
+    params = params or PARAMS
 
     # --- Technical submetrics ---
     lh = measures.get('lighthouse') or {}
     if lh:
-        technical_sub = score_from_lighthouse(lh)  # already 0..1 like
+        technical_sub = score_from_lighthouse(lh, params['lighthouse'])  # already 0..1 like
     else:
         # Fallback technical metrics
+        t = params['technical']
         ssl_ok = 1.0 if measures.get('has_ssl') else 0.0
         mobile = 1.0 if measures.get('mobile_friendly') else 0.0
         resp_time = measures.get('response_time_s', 0.0)
         # ideal <= 1s, degrade toward 10s
-        resp_score = max(0.0, min(1.0, (10.0 - resp_time) / 9.0)) if resp_time > 0 else 0.0
+        resp_score = max(0.0, min(1.0, (t['response_max_s'] - resp_time) / (t['response_max_s'] - t['response_ideal_s']))) if resp_time > 0 else 0.0
         security_hdrs = measures.get('security_headers', {})
         security_score = sum(1 for k,v in security_hdrs.items() if v)/max(1, len(security_hdrs))
-        broken = measures.get('broken_links', 0)
-        broken_score = max(0.0, 1.0 - 0.15 * broken)
-        technical_sub = 0.35*ssl_ok + 0.25*mobile + 0.2*resp_score + 0.1*security_score + 0.1*broken_score
+        broken = measures.get('broken_links') or 0
+        broken_score = max(0.0, 1.0 - t['broken_link_penalty'] * broken)
+        technical_sub = t['ssl']*ssl_ok + t['mobile']*mobile + t['response']*resp_score + t['security_headers']*security_score + t['broken_links']*broken_score
 
     # --- UX & Design submetrics ---
+    u = params['ux_design']
     text_ratio = measures.get('text_html_ratio', 0)
     headings_total = measures.get('heading_stats', {}).get('total', 0)
     h1_count = measures.get('h1_stats', {}).get('h1_count', 0)
     para_stats = measures.get('paragraph_stats', {})
     avg_para = para_stats.get('avg_words', 0)
     # heuristics: prefer moderate paragraphs (20-80 words), many headings, good text ratio
-    text_ratio_score = min(1.0, text_ratio * 2)
-    headings_score = min(1.0, headings_total / 12)
-    h1_score = 1.0 if h1_count == 1 else (0.5 if h1_count > 1 else 0.2)
-    para_score = 1.0 if 20 <= avg_para <= 80 else max(0.0, 1.0 - abs(avg_para-40)/100)
-    ux_sub = 0.4*text_ratio_score + 0.3*headings_score + 0.15*h1_score + 0.15*para_score
+    text_ratio_score = min(1.0, text_ratio * u['text_ratio_scale'])
+    headings_score = min(1.0, headings_total / u['headings_target'])
+    h1_score = 1.0 if h1_count == 1 else (u['h1_multiple'] if h1_count > 1 else u['h1_missing'])
+    para_score = 1.0 if u['para_min_words'] <= avg_para <= u['para_max_words'] else max(0.0, 1.0 - abs(avg_para-u['para_center_words'])/u['para_falloff_words'])
+    ux_sub = u['text_ratio']*text_ratio_score + u['headings']*headings_score + u['h1']*h1_score + u['paragraphs']*para_score
 
     # --- SEO submetrics ---
+    e = params['seo']
     title_present = 1.0 if measures.get('meta',{}).get('title') else 0.0
     title_len = len(measures.get('meta',{}).get('title',''))
-    title_len_score = 1.0 if 30 <= title_len <= 70 else max(0.0, 1.0 - abs(title_len-50)/100)
+    title_len_score = 1.0 if e['title_min_chars'] <= title_len <= e['title_max_chars'] else max(0.0, 1.0 - abs(title_len-e['title_center_chars'])/e['title_falloff_chars'])
     desc = 1.0 if measures.get('meta',{}).get('meta',{}).get('description') else 0.0
     images_with_alt = measures.get('images_with_alt_ratio', 0.0)
     canonical = 1.0 if measures.get('canonical') else 0.0
-    robots = measures.get('robots_sitemap',{}).get('robots', False)
-    sitemap = measures.get('robots_sitemap',{}).get('sitemap', False)
-    seo_sub = 0.25*title_present + 0.2*title_len_score + 0.2*desc + 0.15*images_with_alt + 0.1*canonical + 0.1*(1.0 if sitemap else 0.0)
+    robots = (measures.get('robots_sitemap') or {}).get('robots', False)
+    sitemap = (measures.get('robots_sitemap') or {}).get('sitemap', False)
+    seo_sub = e['title']*title_present + e['title_length']*title_len_score + e['description']*desc + e['images_alt']*images_with_alt + e['canonical']*canonical + e['sitemap']*(1.0 if sitemap else 0.0)
 
     # --- Credibility submetrics ---
+    c = params['credibility']
     contact = 1.0 if measures.get('contact_info_found') else 0.0
     ssl = 1.0 if measures.get('has_ssl') else 0.0
     schema = 1.0 if measures.get('has_schema') else 0.0
     copyright_fresh = 1.0 if measures.get('copyright_fresh', False) else 0.0
-    social = min(1.0, len(measures.get('parsed',{}).get('social_links', []))/3)
-    cred_sub = 0.3*contact + 0.25*ssl + 0.15*schema + 0.1*copyright_fresh + 0.2*social
+    social = min(1.0, len(measures.get('parsed',{}).get('social_links', []))/c['social_target'])
+    cred_sub = c['contact']*contact + c['ssl']*ssl + c['schema']*schema + c['copyright']*copyright_fresh + c['social']*social
 
     # --- Content submetrics ---
+    n = params['content']
     keyword_relevance = measures.get('keyword_relevance', 0.0)
     external_ratio = measures.get('external_resource_ratio', 0.0)
     # penalize high external resource ratio (slow third-party resources)
     external_penalty = max(0.0, 1.0 - external_ratio)
-    content_sub = 0.6*keyword_relevance + 0.4*external_penalty
+    content_sub = n['keyword_relevance']*keyword_relevance + n['external_resources']*external_penalty
 
     # Convert submetrics (0..1) to 0..100 per category
     scores = {
@@ -103,11 +131,11 @@ def compute_scores(measures: Dict[str,Any]) -> Dict[str,Any]:
 
     # Weighted total 0..100
     total = int(round(
-        scores['technical'] * WEIGHTS['technical'] +
-        scores['ux_design'] * WEIGHTS['ux_design'] +
-        scores['seo'] * WEIGHTS['seo'] +
-        scores['credibility'] * WEIGHTS['credibility'] +
-        scores['content'] * WEIGHTS['content']
+        scores['technical'] * weights['technical'] +
+        scores['ux_design'] * weights['ux_design'] +
+        scores['seo'] * weights['seo'] +
+        scores['credibility'] * weights['credibility'] +
+        scores['content'] * weights['content']
     ))
     scores['total'] = total
 
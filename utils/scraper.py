@@ -3,135 +3,295 @@
 Responsible for fetching HTML (requests), parsing with BeautifulSoup, and extracting page elements.
 """
 from __future__ import annotations
+import asyncio
+import codecs
 import re
 import json
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import requests
-from bs4 import BeautifulSoup
-from cachetools import TTLCache, cached
+from bs4 import BeautifulSoup, Tag
 from requests.exceptions import SSLError, RequestException
+from fetcher import AsyncFetcher, get_session, run_sync
+from http_cache import get_http_cache
+import instrument
 
-cache = TTLCache(maxsize=256, ttl=3600)
+# Bodies are read in chunks of this size and cut off after max_body_bytes (after decompression).
+CHUNK_BYTES = 64 * 1024
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024
+# Content types worth reading; anything else (video, archives, images) is answered without its body.
+DEFAULT_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
 
-@cached(cache)
-def fetch_url(url: str, timeout: int = 10) -> Tuple[Optional[int], str, Dict[str,str], float, int]:
-    """Fetch URL and return (status_code, text, headers, elapsed_seconds, content_length).
+_max_body_bytes: Optional[int] = DEFAULT_MAX_BODY_BYTES
+_content_types: Optional[Tuple[str, ...]] = DEFAULT_CONTENT_TYPES
 
-    This function catches SSL and request exceptions and will attempt a best-effort
-    insecure fallback (verify=False) if the SSL chain cannot be validated. Any
-    fetch error is recorded in the returned headers under the `fetch_error` key so
-    callers can decide how to proceed.
-    """
+
+def configure_fetch(max_body_bytes: Optional[int] = DEFAULT_MAX_BODY_BYTES,
+                    content_types: Optional[Iterable[str]] = DEFAULT_CONTENT_TYPES) -> None:
+    """Set the body size cap and Content-Type allow-list of fetch_url / fetch_and_parse (None: no limit)."""
+    global _max_body_bytes, _content_types
+    _max_body_bytes = max_body_bytes
+    _content_types = tuple(t.lower() for t in content_types) if content_types is not None else None
+
+
+def _type_allowed(headers: Mapping[str, str]) -> bool:
+    ctype = (headers.get('Content-Type') or '').split(';')[0].strip().lower()
+    # no Content-Type at all: read it and let the parser decide
+    return _content_types is None or not ctype or ctype in _content_types
+
+
+class BodyStream:
+    """Decoded text chunks of a streamed response, read until max_bytes of body (then truncated).
+
+    Only one chunk is held at a time; bytes_read and truncated are final once iteration ends. The
+    charset comes from the Content-Type header (ISO-8859-1 for text/* without one, as resp.text
+    does) and defaults to UTF-8, since a stream cannot be sniffed up front."""
+
+    def __init__(self, resp: requests.Response, max_bytes: Optional[int] = None):
+        self.resp = resp
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.truncated = False
+        self.error: Optional[str] = None
+
+    def _decoder(self):
+        try:
+            return codecs.getincrementaldecoder(self.resp.encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def __iter__(self) -> Iterator[str]:
+        decoder = self._decoder()
+        try:
+            for chunk in self.resp.iter_content(CHUNK_BYTES):
+                if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+                    chunk = chunk[:self.max_bytes - self.bytes_read]
+                    self.truncated = True
+                self.bytes_read += len(chunk)
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+                if self.truncated:
+                    break
+        except RequestException as e:
+            self.error = f'body read failed: {e}'
+        finally:
+            self.resp.close()
+            instrument.count_bytes(self.bytes_read)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+def _fetch(url: str, timeout: int, consume: Callable[[Iterable[str]], Tuple[Any, str]]) -> Tuple[Optional[int], Any, Dict[str, str], float, int]:
+    """Shared body of fetch_url / fetch_and_parse: cache, streamed GET with SSL fallback, size and type limits.
+
+    `consume` turns the body's text chunks into (result, text); text is what gets cached."""
+    cache = get_http_cache()
+    entry = cache.lookup(url) if cache else None
+    if entry is not None and entry.age_s < cache.fresh_s:
+        status, text, headers, elapsed_s, content_len = entry.as_result('hit')
+        return (status, consume([text])[0], headers, elapsed_s, content_len)
+    conditional = entry.validators() if entry is not None else {}
     try:
-        resp = requests.get(url, timeout=timeout, allow_redirects=True)
-        elapsed = getattr(resp, 'elapsed', None)
-        elapsed_s = elapsed.total_seconds() if elapsed else 0.0
-        content_len = len(resp.content) if resp.content is not None else 0
-        return resp.status_code, resp.text, dict(resp.headers), elapsed_s, content_len
+        resp = get_session().get(url, timeout=timeout, allow_redirects=True, headers=conditional, stream=True)
+        headers = dict(resp.headers)
     except SSLError as e:
         # SSL verification failed; try a best-effort insecure fetch to collect content
         try:
             import warnings
             warnings.filterwarnings('ignore', message='Unverified HTTPS request')
-            resp = requests.get(url, timeout=timeout, allow_redirects=True, verify=False)
-            elapsed = getattr(resp, 'elapsed', None)
-            elapsed_s = elapsed.total_seconds() if elapsed else 0.0
-            content_len = len(resp.content) if resp.content is not None else 0
+            resp = get_session().get(url, timeout=timeout, allow_redirects=True, verify=False, headers=conditional, stream=True)
             headers = dict(resp.headers)
             headers['fetch_error'] = f'SSLError: {e}'
             headers['insecure_fallback'] = 'true'
-            return resp.status_code, resp.text, headers, elapsed_s, content_len
         except RequestException as e2:
-            return None, '', {'fetch_error': f'SSL fallback failed: {e2}'}, 0.0, 0
+            return None, consume([])[0], {'fetch_error': f'SSL fallback failed: {e2}'}, 0.0, 0
     except RequestException as e:
-        return None, '', {'fetch_error': str(e)}, 0.0, 0
+        return None, consume([])[0], {'fetch_error': str(e)}, 0.0, 0
+    elapsed = getattr(resp, 'elapsed', None)
+    elapsed_s = elapsed.total_seconds() if elapsed else 0.0
+    if resp.status_code == 304 and entry is not None:
+        resp.close()
+        cache.revalidated(url)
+        status, text, headers, _, content_len = entry.as_result('revalidated', elapsed_s)
+        return status, consume([text])[0], headers, elapsed_s, content_len
+    if not _type_allowed(resp.headers):
+        resp.close()
+        headers.setdefault('fetch_error', f"content type {resp.headers.get('Content-Type')} not fetched")
+        return resp.status_code, consume([])[0], headers, elapsed_s, 0
+    body = BodyStream(resp, _max_body_bytes)
+    result, text = consume(body)
+    if body.truncated:
+        headers['truncated'] = 'true'
+    if body.error:
+        headers.setdefault('fetch_error', body.error)
+    if cache is not None:
+        if resp.status_code == 200 and not body.error:
+            cache.save(url, resp.status_code, text, headers, elapsed_s, body.bytes_read)
+        headers = dict(headers, cache_status='miss')
+    return resp.status_code, result, headers, elapsed_s, body.bytes_read
+
+
+def _join(chunks: Iterable[str]) -> Tuple[str, str]:
+    text = ''.join(chunks)
+    return text, text
+
+
+def fetch_url(url: str, timeout: int = 10) -> Tuple[Optional[int], str, Dict[str,str], float, int]:
+    """Fetch URL and return (status_code, text, headers, elapsed_seconds, content_length).
+
+    This function catches SSL and request exceptions and will attempt a best-effort
+    insecure fallback (verify=False) if the SSL chain cannot be validated. Any
+    fetch error is recorded in the returned headers under the `fetch_error` key so
+    callers can decide how to proceed.
 
+    The body is streamed and decoded chunk by chunk (no bytes copy is kept). Bodies over the
+    configured cap are cut off there (headers['truncated'] = 'true'; content_length counts the
+    bytes read), and responses whose Content-Type is not allowed come back with an empty body
+    and a fetch_error (see configure_fetch).
+
+    Responses are kept in the persistent HTTP cache (see http_cache.py): fresh entries are
+    returned directly, stale ones are revalidated with If-None-Match / If-Modified-Since.
+    headers['cache_status'] is 'hit', 'revalidated' or 'miss' when the cache is enabled.
+    """
+    return _fetch(url, timeout, _join)
+
+
+def fetch_and_parse(url: str, timeout: int = 10) -> Tuple[Optional[int], Dict, Dict[str,str], float, int]:
+    """fetch_url() that feeds the body to the streaming parser as it arrives; returns the parse_html() dict
+    instead of the text (its raw_html is the text). Parsing time, net of waiting on the network, is
+    recorded as the 'parse' stage of the current audit."""
+    waited = [0.0]
+
+    def _reading(chunks: Iterable[str]) -> Iterator[str]:
+        it = iter(chunks)
+        while True:
+            t0 = time.perf_counter()
+            chunk = next(it, None)
+            waited[0] += time.perf_counter() - t0
+            if chunk is None:
+                return
+            yield chunk
+
+    def _parse(chunks: Iterable[str]) -> Tuple[Dict, str]:
+        t0 = time.perf_counter()
+        try:
+            parsed = parse_html_chunks(url, _reading(chunks))
+        except ImportError:  # no lxml: parse the joined text with BeautifulSoup
+            parsed = parse_html(url, ''.join(_reading(chunks)), backend='soup')
+        timer = instrument.current()
+        if timer is not None:
+            timer.record('parse', wall_s=time.perf_counter() - t0 - waited[0], calls=1)
+        return parsed, parsed['raw_html']
+
+    return _fetch(url, timeout, _parse)
+
+
+async def fetch_url_async(url: str, timeout: int = 10, fetcher: Optional[AsyncFetcher] = None) -> Tuple[Optional[int], str, Dict[str,str], float, int]:
+    """Async variant of fetch_url (same cache, same SSL fallback), run on the shared fetch pool."""
+    fetcher = fetcher or AsyncFetcher()
+    return await fetcher.run(fetch_url, url, timeout)
+
+
+async def fetch_and_parse_async(url: str, timeout: int = 10, fetcher: Optional[AsyncFetcher] = None) -> Tuple[Optional[int], Dict, Dict[str,str], float, int]:
+    """Async variant of fetch_and_parse, run on the shared fetch pool."""
+    fetcher = fetcher or AsyncFetcher()
+    return await fetcher.run(fetch_and_parse, url, timeout)
+
+
+SOCIAL_DOMAINS = ('facebook.com','twitter.com','linkedin.com','instagram.com','youtube.com')
+_HEADING_LEVELS = {f'h{i}': i for i in range(1, 7)}
+# get_text() skips strings inside these tags (bs4 stores them as Script/Stylesheet/TemplateString)
+_NON_TEXT_TAGS = ('script', 'style', 'template')
+
+
+def parse_html(base_url: str, html: str, backend: str = 'lxml') -> Dict:
+    """Extract page elements in a single pass over the document.
+
+    backend='lxml' (default) collects everything from lxml parser events without building a tree;
+    backend='soup' walks a BeautifulSoup tree once (used when lxml is not installed).
+    Both return identical dicts; see bench_parse.py.
+    """
+    if backend == 'lxml':
+        try:
+            return parse_html_chunks(base_url, [html])
+        except ImportError:
+            pass
 
-def parse_html(base_url: str, html: str) -> Dict:
     # Prefer lxml if available for speed/robustness, otherwise fall back to the built-in parser.
     try:
         soup = BeautifulSoup(html, "lxml")
     except Exception:
         soup = BeautifulSoup(html, "html.parser")
 
-    meta = {}
-    title_tag = soup.find("title")
-    meta['title'] = title_tag.get_text(strip=True) if title_tag else ""
-
+    title_tag = body_tag = favicon_tag = canonical_tag = None
     meta_tags = {}
-    for m in soup.find_all("meta"):
-        if m.get('name'):
-            meta_tags[m.get('name').lower()] = m.get('content', '')
-        elif m.get('property'):
-            meta_tags[m.get('property').lower()] = m.get('content', '')
-    meta['meta'] = meta_tags
-
-    headings = []
-    for level in range(1,7):
-        for h in soup.find_all(f'h{level}'):
-            headings.append({'tag': f'h{level}', 'text': h.get_text(strip=True)})
-
-    # body text
-    body = soup.body.get_text(separator=' ', strip=True) if soup.body else ''
-
-    # links
-    links = []
-    for a in soup.find_all('a', href=True):
-        href = a['href'].strip()
-        full = urljoin(base_url, href)
-        links.append({'href': href, 'url': full, 'text': a.get_text(strip=True)})
-
-    # images
-    images = []
-    for img in soup.find_all('img'):
-        src = img.get('src') or ''
-        images.append({
-            'src': urljoin(base_url, src),
-            'alt': img.get('alt',''),
-            'title': img.get('title','')
-        })
-
-    # css refs and inline styles
-    css_links = []
-    for l in soup.find_all('link', href=True):
-        rel = l.get('rel')
-        if not rel:
+    headings_by_level: Dict[int, List[Dict]] = {i: [] for i in range(1, 7)}
+    links, images, css_links, inline_styles, scripts, paragraphs, social_links = [], [], [], [], [], [], []
+
+    for tag in soup.descendants:
+        if not isinstance(tag, Tag):
             continue
-        rels = rel if isinstance(rel, (list, tuple)) else [rel]
-        if any('stylesheet' in str(r).lower() for r in rels):
-            css_links.append(urljoin(base_url, l['href']))
-    inline_styles = [tag.get('style','') for tag in soup.find_all(True) if tag.get('style')]
-
-    # scripts
-    scripts = []
-    for s in soup.find_all('script'):
-        src = s.get('src') or ''
-        scripts.append({'src': urljoin(base_url, src) if src else '', 'inline': not bool(src), 'text_len': len(s.get_text() or '')})
-
-    # favicon
-    favicon_tag = soup.find('link', rel=lambda r: r and 'icon' in str(r).lower())
-    favicon = urljoin(base_url, favicon_tag['href']) if favicon_tag and favicon_tag.get('href') else None
+        name = tag.name
+        attrs = tag.attrs
+        if attrs.get('style'):
+            inline_styles.append(attrs['style'])
 
-    # paragraphs and paragraphs lengths
-    paragraphs = [p.get_text(strip=True) for p in soup.find_all('p')]
-    paragraph_lengths = [len(p.split()) for p in paragraphs]
+        if name == 'a':
+            if 'href' in attrs:
+                href = attrs['href']
+                links.append({'href': href.strip(), 'url': urljoin(base_url, href.strip()), 'text': tag.get_text(strip=True)})
+                if any(d in href for d in SOCIAL_DOMAINS):
+                    social_links.append(href)
+        elif name == 'p':
+            paragraphs.append(tag.get_text(strip=True))
+        elif name in _HEADING_LEVELS:
+            headings_by_level[_HEADING_LEVELS[name]].append({'tag': name, 'text': tag.get_text(strip=True)})
+        elif name == 'img':
+            images.append({
+                'src': urljoin(base_url, attrs.get('src') or ''),
+                'alt': attrs.get('alt',''),
+                'title': attrs.get('title','')
+            })
+        elif name == 'script':
+            src = attrs.get('src') or ''
+            scripts.append({'src': urljoin(base_url, src) if src else '', 'inline': not bool(src), 'text_len': len(tag.get_text() or '')})
+        elif name == 'link':
+            rels = attrs.get('rel') or []
+            if isinstance(rels, str):
+                rels = [rels]
+            if 'href' in attrs and any('stylesheet' in str(r).lower() for r in rels):
+                css_links.append(urljoin(base_url, attrs['href']))
+            if favicon_tag is None and any('icon' in str(r).lower() for r in rels):
+                favicon_tag = tag
+            if canonical_tag is None and ('canonical' in rels or ' '.join(rels) == 'canonical'):
+                canonical_tag = tag
+        elif name == 'meta':
+            if attrs.get('name'):
+                meta_tags[attrs['name'].lower()] = attrs.get('content', '')
+            elif attrs.get('property'):
+                meta_tags[attrs['property'].lower()] = attrs.get('content', '')
+        elif name == 'title':
+            if title_tag is None:
+                title_tag = tag
+        elif name == 'body':
+            if body_tag is None:
+                body_tag = tag
 
-    # social links (simple)
-    social_domains = ('facebook.com','twitter.com','linkedin.com','instagram.com','youtube.com')
-    social_links = []
-    for a in soup.find_all('a', href=True):
-        href = a['href']
-        if any(d in href for d in social_domains):
-            social_links.append(href)
+    meta = {'title': title_tag.get_text(strip=True) if title_tag else "", 'meta': meta_tags}
+    headings = [h for level in range(1, 7) for h in headings_by_level[level]]
+    body = body_tag.get_text(separator=' ', strip=True) if body_tag else ''
+    favicon = urljoin(base_url, favicon_tag['href']) if favicon_tag and favicon_tag.get('href') else None
+    canonical = canonical_tag['href'] if canonical_tag and canonical_tag.get('href') else None
 
-    # viewport
-    viewport = any(k for k in meta_tags.keys() if 'viewport' in k) or bool(soup.find('meta', attrs={'name':'viewport'}))
+    return _assemble(meta, headings, body, links, images, css_links, inline_styles, scripts,
+                     favicon, paragraphs, social_links, canonical, html)
 
-    # canonical
-    canonical_tag = soup.find('link', rel='canonical')
-    canonical = canonical_tag['href'] if canonical_tag and canonical_tag.get('href') else None
 
+def _assemble(meta, headings, body, links, images, css_links, inline_styles, scripts,
+              favicon, paragraphs, social_links, canonical, html) -> Dict:
     return {
         'meta': meta,
         'headings': headings,
@@ -143,14 +303,182 @@ def parse_html(base_url: str, html: str) -> Dict:
         'scripts': scripts,
         'favicon': favicon,
         'paragraphs': paragraphs,
-        'paragraph_lengths': paragraph_lengths,
+        'paragraph_lengths': [len(p.split()) for p in paragraphs],
         'social_links': social_links,
-        'viewport': viewport,
+        'viewport': any('viewport' in k for k in meta['meta']),
         'canonical': canonical,
         'raw_html': html
     }
 
 
+class _ExtractTarget:
+    """lxml parser target that builds the parse_html() fields from start/end/data events.
+
+    Text is buffered between events so each text node is stripped as a whole, matching
+    BeautifulSoup's get_text(strip=True).
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.title: Optional[str] = None
+        self.meta_tags: Dict[str, str] = {}
+        self.headings_by_level: Dict[int, List[Dict]] = {i: [] for i in range(1, 7)}
+        self.links: List[Dict] = []
+        self.images: List[Dict] = []
+        self.css_links: List[str] = []
+        self.inline_styles: List[str] = []
+        self.scripts: List[Dict] = []
+        self.paragraphs: List[str] = []
+        self.social_links: List[str] = []
+        self.favicon: Optional[str] = None
+        self.favicon_seen = False
+        self.canonical: Optional[str] = None
+        self.canonical_seen = False
+        self.body_parts: List[str] = []
+        self.body_state = 0  # 0 = before <body>, 1 = inside, 2 = after
+        self._pending: List[str] = []
+        self._open: List[Tuple[str, List[str], Any]] = []  # (tag, text parts, finaliser)
+        self._non_text_depth = 0
+        self._script: Optional[Dict] = None
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending = []
+        if self._script is not None:
+            self._script['text_len'] += len(text)
+        if self._non_text_depth:
+            return
+        stripped = text.strip()
+        if not stripped:
+            return
+        for _, parts, _ in self._open:
+            parts.append(stripped)
+        if self.body_state == 1:
+            self.body_parts.append(stripped)
+
+    def start(self, tag, attrib) -> None:
+        self._flush()
+        if not isinstance(tag, str):
+            return
+        if attrib.get('style'):
+            self.inline_styles.append(attrib['style'])
+        if tag in _NON_TEXT_TAGS:
+            self._non_text_depth += 1
+
+        if tag == 'a':
+            if 'href' in attrib:
+                href = attrib['href']
+                link = {'href': href.strip(), 'url': urljoin(self.base_url, href.strip()), 'text': ''}
+                self.links.append(link)
+                if any(d in href for d in SOCIAL_DOMAINS):
+                    self.social_links.append(href)
+                self._open.append((tag, [], lambda t, link=link: link.__setitem__('text', t)))
+        elif tag == 'p':
+            idx = len(self.paragraphs)
+            self.paragraphs.append('')
+            self._open.append((tag, [], lambda t, idx=idx: self.paragraphs.__setitem__(idx, t)))
+        elif tag in _HEADING_LEVELS:
+            h = {'tag': tag, 'text': ''}
+            self.headings_by_level[_HEADING_LEVELS[tag]].append(h)
+            self._open.append((tag, [], lambda t, h=h: h.__setitem__('text', t)))
+        elif tag == 'img':
+            self.images.append({
+                'src': urljoin(self.base_url, attrib.get('src') or ''),
+                'alt': attrib.get('alt', ''),
+                'title': attrib.get('title', '')
+            })
+        elif tag == 'script':
+            src = attrib.get('src') or ''
+            self._script = {'src': urljoin(self.base_url, src) if src else '', 'inline': not bool(src), 'text_len': 0}
+            self.scripts.append(self._script)
+        elif tag == 'link':
+            rel = attrib.get('rel') or ''
+            rels = rel.split()
+            href = attrib.get('href')
+            if href is not None and 'stylesheet' in rel.lower():
+                self.css_links.append(urljoin(self.base_url, href))
+            if not self.favicon_seen and 'icon' in rel.lower():
+                self.favicon_seen = True
+                self.favicon = urljoin(self.base_url, href) if href else None
+            if not self.canonical_seen and 'canonical' in rels:
+                self.canonical_seen = True
+                self.canonical = href or None
+        elif tag == 'meta':
+            if attrib.get('name'):
+                self.meta_tags[attrib['name'].lower()] = attrib.get('content', '')
+            elif attrib.get('property'):
+                self.meta_tags[attrib['property'].lower()] = attrib.get('content', '')
+        elif tag == 'title':
+            if self.title is None:
+                self.title = ''
+                self._open.append((tag, [], lambda t: setattr(self, 'title', t)))
+        elif tag == 'body':
+            if self.body_state == 0:
+                self.body_state = 1
+
+    def end(self, tag) -> None:
+        self._flush()
+        if not isinstance(tag, str):
+            return
+        if tag in _NON_TEXT_TAGS:
+            self._non_text_depth = max(0, self._non_text_depth - 1)
+        if tag == 'script':
+            self._script = None
+        elif tag == 'body' and self.body_state == 1:
+            self.body_state = 2
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == tag:
+                _, parts, finish = self._open.pop(i)
+                finish(''.join(parts))
+                break
+
+    def data(self, data) -> None:
+        self._pending.append(data)
+
+    def comment(self, text) -> None:
+        self._flush()
+
+    def pi(self, target, data=None) -> None:
+        self._flush()
+
+    def close(self) -> Dict:
+        self._flush()
+        while self._open:
+            _, parts, finish = self._open.pop()
+            finish(''.join(parts))
+        return {
+            'meta': {'title': self.title or '', 'meta': self.meta_tags},
+            'headings': [h for level in range(1, 7) for h in self.headings_by_level[level]],
+            'body': ' '.join(self.body_parts),
+        }
+
+
+def parse_html_chunks(base_url: str, chunks: Iterable[str]) -> Dict:
+    """Streaming parse_html(): feed HTML text chunks to lxml's event parser without building a tree.
+
+    Returns the same dict as parse_html(); `raw_html` is the joined input.
+    """
+    from lxml import etree
+
+    target = _ExtractTarget(base_url)
+    parser = etree.HTMLParser(target=target)
+    seen: List[str] = []
+    for chunk in chunks:
+        if chunk:
+            seen.append(chunk)
+            parser.feed(chunk)
+    html = ''.join(seen)
+    try:
+        res = parser.close() if seen else target.close()
+    except etree.XMLSyntaxError:
+        res = target.close()
+    t = target
+    return _assemble(res['meta'], res['headings'], res['body'], t.links, t.images, t.css_links,
+                     t.inline_styles, t.scripts, t.favicon, t.paragraphs, t.social_links, t.canonical, html)
+
+
 def fetch_css_fonts(css_text: str) -> List[str]:
     # crude font-family extractor
     families = set()
@@ -163,33 +491,51 @@ def fetch_css_fonts(css_text: str) -> List[str]:
     return list(families)
 
 
-def extract_css_from_urls(css_urls: List[str], timeout: int = 8) -> str:
-    out = []
-    for url in css_urls[:10]:
+async def extract_css_from_urls_async(css_urls: List[str], timeout: int = 8, fetcher: Optional[AsyncFetcher] = None) -> str:
+    fetcher = fetcher or AsyncFetcher()
+
+    async def _one(url: str) -> str:
         try:
-            r = requests.get(url, timeout=timeout)
+            r = await fetcher.get(url, timeout=timeout)
             if r.status_code == 200:
-                out.append(r.text)
+                return r.text
         except Exception:
-            continue
-    return "\n".join(out)
+            pass
+        return ''
 
+    texts = await asyncio.gather(*(_one(u) for u in css_urls[:10]))
+    return "\n".join(t for t in texts if t)
 
-def check_robots_and_sitemap(base_url: str) -> Dict[str, bool]:
+
+def extract_css_from_urls(css_urls: List[str], timeout: int = 8) -> str:
+    return run_sync(extract_css_from_urls_async(css_urls, timeout=timeout))
+
+
+async def check_robots_and_sitemap_async(base_url: str, fetcher: Optional[AsyncFetcher] = None) -> Dict[str, bool]:
+    fetcher = fetcher or AsyncFetcher()
     parsed = urlparse(base_url)
     root = f"{parsed.scheme}://{parsed.netloc}"
-    results = {'robots': False, 'sitemap': False}
-    try:
-        r = requests.get(urljoin(root, '/robots.txt'), timeout=6)
-        results['robots'] = r.status_code == 200 and 'user-agent' in r.text.lower()
-    except Exception:
-        results['robots'] = False
-    try:
-        r2 = requests.get(urljoin(root, '/sitemap.xml'), timeout=6)
-        results['sitemap'] = r2.status_code == 200 and ('<urlset' in r2.text or '<sitemapindex' in r2.text)
-    except Exception:
-        results['sitemap'] = False
-    return results
+
+    async def _robots() -> bool:
+        try:
+            r = await fetcher.get(urljoin(root, '/robots.txt'), timeout=6)
+            return r.status_code == 200 and 'user-agent' in r.text.lower()
+        except Exception:
+            return False
+
+    async def _sitemap() -> bool:
+        try:
+            r2 = await fetcher.get(urljoin(root, '/sitemap.xml'), timeout=6)
+            return r2.status_code == 200 and ('<urlset' in r2.text or '<sitemapindex' in r2.text)
+        except Exception:
+            return False
+
+    robots, sitemap = await asyncio.gather(_robots(), _sitemap())
+    return {'robots': robots, 'sitemap': sitemap}
+
+
+def check_robots_and_sitemap(base_url: str) -> Dict[str, bool]:
+    return run_sync(check_robots_and_sitemap_async(base_url))
 
 
 def sample_internal_links(links: List[Dict], base_netloc: str, limit: int = 10) -> List[str]:
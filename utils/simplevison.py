@@ -1,12 +1,47 @@
+"""simplevison.py
+
+Screenshot-based redesign verdict with gpt-4o-mini.
+
+Screenshots are downscaled and re-encoded (JPEG by default) before they are sent, and a 64-bit
+difference hash of each one is kept with its redesign decision. A screenshot within `max_distance`
+bits of one already judged (parked domains, the same site template) reuses that decision instead of
+calling the model; the business name and description then come from the page's own metadata.
+With PREFILTER on, vision_prefilter settles clear-cut pages locally before any of that; it is off
+until its thresholds have recorded agreement with model verdicts (bench_prefilter.py).
+Screenshots stay in memory; take_screenshot() writes to a unique path only when asked to.
+"""
 import asyncio
-from playwright.async_api import async_playwright
+import tempfile
+import re
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+from playwright_capture import render_page
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+import vision_prefilter
 from openai import OpenAI
 import base64
 import os
 import json
 from dotenv import load_dotenv
 
+try:
+    from PIL import Image
+except ImportError:  # optional: without Pillow screenshots are sent as PNG and never deduplicated
+    Image = None
+
 load_dotenv()
+VISION_MAX_WIDTH = 768
+VISION_FORMAT = 'JPEG'  # or 'WEBP'
+VISION_QUALITY = 70
+# Screenshots whose difference hashes differ in at most this many of 64 bits share a verdict.
+DEFAULT_MAX_DISTANCE = 6
+DEFAULT_CACHE_MAX_AGE_S = 30 * 24 * 3600
+DEFAULT_CACHE_MAX_ENTRIES = 20000
+# Let vision_prefilter answer clear YES/NO cases without a model call. Off by default: its
+# YES_AT / NO_AT thresholds have no measured agreement with the model yet.
+PREFILTER = False
 PROMPT = """You will be shown a screenshot of a website landing page.
 
 Task:
@@ -45,35 +80,168 @@ Rules:
 - Deterministic, consistent output only.
 """
 
-async def take_screenshot(url, path="screenshot.png"):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page(viewport={"width": 1280, "height": 720})
-        await page.goto(url, wait_until="networkidle")
+def preprocess_screenshot(png_bytes: bytes, max_width: int = VISION_MAX_WIDTH, fmt: str = VISION_FORMAT,
+                          quality: int = VISION_QUALITY) -> Tuple[bytes, str, Optional[int]]:
+    """Downscale and re-encode a screenshot for the vision model.
+
+    Returns (image_bytes, mime_type, dhash). Without Pillow the PNG is passed through and dhash is None.
+    """
+    if Image is None:
+        return png_bytes, 'image/png', None
+    with Image.open(BytesIO(png_bytes)) as im:
+        im = im.convert('RGB')
+        phash = dhash(im)
+        if im.width > max_width:
+            im = im.resize((max_width, round(im.height * max_width / im.width)), Image.LANCZOS)
+        out = BytesIO()
+        im.save(out, format=fmt, quality=quality, optimize=True)
+    return out.getvalue(), f'image/{fmt.lower()}', phash
+
+
+def dhash(im: Any, size: int = 8) -> int:
+    """64-bit difference hash: each bit says whether a pixel is brighter than its right-hand neighbour."""
+    small = im.convert('L').resize((size + 1, size), Image.LANCZOS)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            i = row * (size + 1) + col
+            bits = (bits << 1) | (px[i] > px[i + 1])
+    return bits
+
+
+class VerdictCache:
+    """Redesign decisions keyed by screenshot dhash, persisted in SQLite and searched by Hamming distance.
+
+    Only the page-level decision is kept: business name, description and reasons describe one site, and
+    near-identical screenshots (one template, many businesses) must not share them. At most
+    `max_entries` hashes are held, least recently used evicted first. Lookups only compare hashes that
+    agree exactly on one of max_distance + 1 bit bands (any hash within max_distance bits does, by the
+    pigeonhole principle) instead of scanning every entry. max_distance < 0 turns the cache off, reads
+    and writes alike."""
+
+    def __init__(self, path: Optional[str], max_distance: int = DEFAULT_MAX_DISTANCE, max_age_s: float = DEFAULT_CACHE_MAX_AGE_S,
+                 max_entries: int = DEFAULT_CACHE_MAX_ENTRIES):
+        self.max_distance = max_distance
+        self.max_entries = max(1, max_entries)
+        self.enabled = max_distance >= 0
+        self.store = DiskCache(path, max_age_s=max_age_s, table='vision') if path and self.enabled else None
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[int, str]' = OrderedDict()
+        nbands = max_distance + 1 if self.enabled else 1
+        self._bands = [(64 * i // nbands, 64 * (i + 1) // nbands) for i in range(nbands)]
+        self._index: List[Dict[int, set]] = [{} for _ in self._bands]
+        self.hits = self.misses = 0
+        if self.store is not None:
+            for key in self.store.keys():
+                hit = self.store.get(key)
+                if hit is not None:
+                    decision = json.loads(hit[0]).get('redesign_candidate')
+                    if decision:
+                        self._put(int(key, 16), decision)
+
+    def _band_keys(self, phash: int) -> List[int]:
+        return [(phash >> lo) & ((1 << (hi - lo)) - 1) for lo, hi in self._bands]
+
+    def _put(self, phash: int, decision: str) -> None:
+        if phash in self._entries:
+            self._entries.move_to_end(phash)
+        else:
+            for band, key in zip(self._index, self._band_keys(phash)):
+                band.setdefault(key, set()).add(phash)
+        self._entries[phash] = decision
+        while len(self._entries) > self.max_entries:
+            old, _ = self._entries.popitem(last=False)
+            for band, key in zip(self._index, self._band_keys(old)):
+                band[key].discard(old)
+                if not band[key]:
+                    del band[key]
+            if self.store is not None:
+                self.store.delete(f'{old:016x}')
+
+    def lookup(self, phash: int) -> Optional[Dict[str, Any]]:
+        """{'redesign_candidate': ...} of the closest cached screenshot within max_distance, or None."""
+        with self._lock:
+            best = None
+            if self.enabled:
+                candidates = set()
+                for band, key in zip(self._index, self._band_keys(phash)):
+                    candidates |= band.get(key, set())
+                for h in candidates:
+                    d = bin(h ^ phash).count('1')
+                    if d <= self.max_distance and (best is None or d < best[0]):
+                        best = (d, h)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best[1])
+            return {'redesign_candidate': self._entries[best[1]]}
+
+    def add(self, phash: int, verdict: Dict[str, Any]) -> None:
+        decision = verdict.get('redesign_candidate')
+        if not self.enabled or not decision:
+            return
+        with self._lock:
+            self._put(phash, decision)
+        if self.store is not None:
+            self.store.set(f'{phash:016x}', json.dumps({'redesign_candidate': decision}).encode('utf-8'))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
 
-        # Wait briefly for animations or dynamic elements to load
-        await page.wait_for_timeout(1500)
+_cache: Optional[VerdictCache] = None
+_cache_lock = threading.Lock()
 
-        # Capture only the visible part of the screen
-        await page.screenshot(path=path, full_page=False)
 
-        await browser.close()
+def configure_cache(path: Optional[str] = os.path.join(DEFAULT_CACHE_DIR, 'vision.sqlite'),
+                    max_distance: int = DEFAULT_MAX_DISTANCE, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES) -> VerdictCache:
+    """Set up the process-wide verdict cache. path=None keeps verdicts for this process only;
+    max_distance=-1 disables it."""
+    global _cache
+    with _cache_lock:
+        _cache = VerdictCache(path, max_distance=max_distance, max_entries=max_entries)
+    return _cache
+
+
+def get_cache() -> VerdictCache:
+    if _cache is None:
+        try:
+            configure_cache()
+        except Exception:
+            configure_cache(None)
+    return _cache
+
+
+async def take_screenshot(url, path=None):
+    """Save a viewport screenshot of `url` and return its path (a unique temp file unless `path` is given)."""
+    rendered = await render_page(url, capture_styles=False)
+    if rendered.get('error'):
+        raise RuntimeError(rendered['error'])
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='screenshot-', suffix='.png')
+        os.close(fd)
+    with open(path, "wb") as f:
+        f.write(rendered['screenshot_png'])
     return path
 
 
 def analyze_screenshot_with_gpt(image_path):
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
     with open(image_path, "rb") as f:
-        image_bytes = f.read()
-        image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+        return analyze_screenshot_bytes(f.read())
+
+
+def analyze_screenshot_bytes(image_bytes, mime_type="image/png"):
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    image_b64 = base64.b64encode(image_bytes).decode("utf-8")
 
     response = client.chat.completions.create(
     model="gpt-4o-mini",
     messages=[
         {"role": "user", "content": [
             {"type": "text", "text": PROMPT},
-            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_b64}"}}
+            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_b64}"}}
         ]}
     ],
     max_tokens=100,
@@ -82,9 +250,66 @@ def analyze_screenshot_with_gpt(image_path):
     result = json.loads(response.choices[0].message.content)
     return result
 
-async def ai_verdict(url):
-    screenshot_path = await take_screenshot(url)
-    verdict = analyze_screenshot_with_gpt(screenshot_path)
+
+def judge_screenshot(png_bytes, info=None):
+    """Verdict for one screenshot: downscale it, reuse the verdict of a near-identical screenshot if
+    one exists, otherwise ask the model. `info` (if given) receives 'cache', 'phash' and 'bytes_sent'."""
+    image, mime, phash = preprocess_screenshot(png_bytes)
+    cache = get_cache() if phash is not None else None
+    verdict = cache.lookup(phash) if cache is not None else None
+    if info is not None:
+        info['phash'] = f'{phash:016x}' if phash is not None else None
+        info['cache'] = 'hit' if verdict is not None else 'miss'
+        info['bytes_sent'] = 0 if verdict is not None else len(image)
+    if verdict is None:
+        verdict = analyze_screenshot_bytes(image, mime)
+        if cache is not None:
+            cache.add(phash, verdict)
+    return verdict
+
+
+# Title segments that name the page rather than the business ("Home | Acme Plumbing").
+_GENERIC_TITLES = {'home', 'homepage', 'home page', 'welcome', 'index', 'start'}
+_TITLE_SEPARATORS = re.compile(r'\s+[|\-–—:·»]\s+')
+
+
+def site_fields(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """business_name / site_description of a page from its own metadata (og:site_name or <title>, meta
+    description), for verdicts that were not written by the model for this very page."""
+    meta = meta or {}
+    tags = meta.get('meta') or {}
+    name = (tags.get('og:site_name') or '').strip()
+    if not name:
+        parts = [p.strip() for p in _TITLE_SEPARATORS.split(meta.get('title') or '') if p.strip()]
+        name = next((p for p in parts if p.lower() not in _GENERIC_TITLES), parts[0] if parts else '')
+    out = {}
+    if name:
+        out['business_name'] = name
+    description = (tags.get('description') or tags.get('og:description') or '').strip()
+    if description:
+        out['site_description'] = description
+    return out
+
+
+async def ai_verdict(url, rendered=None, info=None, meta=None):
+    """Vision verdict for `url`. Pass the result of playwright_capture.render_page to reuse an
+    existing render instead of loading the page again, and the page's parsed `meta` (measures['meta'])
+    to name the business when the verdict comes from the prefilter or a look-alike screenshot."""
+    if rendered is None:
+        rendered = await render_page(url, capture_styles=False)
+    if rendered.get('error'):
+        raise RuntimeError(rendered['error'])
+    verdict = vision_prefilter.classify(rendered['screenshot_png'], rendered.get('dom_styles')) if PREFILTER else None
+    if verdict is not None:
+        verdict.update(site_fields(meta))
+        if info is not None:
+            info['cache'] = 'prefilter'
+            info['bytes_sent'] = 0
+    else:
+        info = info if info is not None else {}
+        verdict = judge_screenshot(rendered['screenshot_png'], info=info)
+        if info.get('cache') == 'hit':
+            verdict.update(site_fields(meta))
     print("Ai Vision Verdict:", verdict["redesign_candidate"])
     if verdict["redesign_candidate"] == "YES":
         print("Reasons:", verdict.get("reasons", []))
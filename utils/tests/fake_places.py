@@ -0,0 +1,108 @@
+"""A local stand-in for the Google Places Nearby Search and Place Details endpoints.
+
+Places carry a lat/lng; a Nearby Search returns the ones inside the requested circle (sorted by
+place_id, capped at 60 like Google) in pages of 20 linked by next_page_token. Place ids listed in
+`broken` answer their details request with an HTML error page, and `nearby_broken` does the same
+for every Nearby Search. `calls` counts requests per endpoint and place id.
+"""
+from __future__ import annotations
+import itertools
+import json
+import math
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+MAX_RESULTS = 60
+
+
+def grid_places(n: int, lat: float = 29.65, lng: float = -82.32, step: float = 0.001) -> Dict[str, Dict]:
+    """`n` places on a square grid starting at (lat, lng), `step` degrees apart."""
+    side = math.ceil(math.sqrt(n))
+    return {f'p{i:04d}': {'name': f'Business {i}', 'formatted_address': f'{i} Main St', 'website': f'http://biz{i}.example',
+                          'lat': lat + (i // side) * step, 'lng': lng + (i % side) * step}
+            for i in range(n)}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops concurrent connects (1 s SYN retry)
+
+
+class FakePlaces:
+    def __init__(self, places: Dict[str, Dict], broken: Iterable[str] = (), nearby_broken: bool = False):
+        self.places = places
+        self.broken = set(broken)
+        self.nearby_broken = nearby_broken
+        self.calls: Counter = Counter()
+        self._tokens: Dict[str, List[str]] = {}
+        self._token_ids = itertools.count()
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path.endswith('/nearbysearch/json'):
+                    fake._count('nearby')
+                    body = None if fake.nearby_broken else fake._nearby(query)
+                elif url.path.endswith('/details/json'):
+                    fake._count('details', query.get('place_id'))
+                    body = None if query.get('place_id') in fake.broken else fake._details(query.get('place_id'))
+                else:
+                    self.send_error(404)
+                    return
+                data = b'<html><body>502 Bad Gateway</body></html>' if body is None else json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html' if body is None else 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = _Server(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def _count(self, endpoint: str, place_id: Optional[str] = None) -> None:
+        with self._lock:
+            self.calls[endpoint] += 1
+            if place_id:
+                self.calls[place_id] += 1
+
+    def _page(self, ids: List[str]) -> Dict:
+        out = {'status': 'OK' if ids else 'ZERO_RESULTS', 'results': [
+            {'place_id': i, 'name': self.places[i]['name'], 'vicinity': self.places[i]['formatted_address']} for i in ids[:PAGE_SIZE]]}
+        if len(ids) > PAGE_SIZE:
+            with self._lock:
+                token = f't{next(self._token_ids)}'
+                self._tokens[token] = ids[PAGE_SIZE:]
+            out['next_page_token'] = token
+        return out
+
+    def _nearby(self, query: Dict[str, str]) -> Dict:
+        if 'pagetoken' in query:
+            with self._lock:
+                ids = self._tokens.pop(query['pagetoken'], None)
+            return {'status': 'INVALID_REQUEST', 'results': []} if ids is None else self._page(ids)
+        lat, lng = (float(x) for x in query['location'].split(','))
+        radius = float(query['radius'])
+        inside = sorted(pid for pid, p in self.places.items()
+                        if math.hypot((p['lat'] - lat) * 111_000, (p['lng'] - lng) * 111_000 * math.cos(math.radians(lat))) <= radius)
+        return self._page(inside[:MAX_RESULTS])
+
+    def _details(self, place_id: Optional[str]) -> Dict:
+        place = self.places.get(place_id or '')
+        if place is None:
+            return {'status': 'NOT_FOUND'}
+        return {'status': 'OK', 'result': {k: v for k, v in place.items() if k not in ('lat', 'lng')}}
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,68 @@
+"""businesearch discovery against the local fake Places server."""
+import time
+import unittest
+from unittest import mock
+
+import businesearch
+from businesearch import TokenBucket, fetch_nearby_page, get_place_details, iter_local_businesses
+
+from tests.fake_places import FakePlaces, grid_places
+
+CENTER = '29.65,-82.32'
+
+
+class DiscoveryTest(unittest.TestCase):
+    def setUp(self):
+        businesearch.details_cache.clear()
+        patcher = mock.patch.object(businesearch, 'PAGE_TOKEN_DELAY_S', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serve(self, places, **kwargs) -> FakePlaces:
+        fake = FakePlaces(places, **kwargs)
+        self.addCleanup(fake.close)
+        return fake
+
+    def search(self, fake: FakePlaces, **kwargs):
+        return list(iter_local_businesses('key', CENTER, radius=5000, randomize_location=False,
+                                          base_url=fake.base_url, rate_per_s=1000, **kwargs))
+
+    def test_all_pages_and_details(self):
+        fake = self.serve(grid_places(45))
+        found = self.search(fake)
+        self.assertEqual(sorted(b['name'] for b in found), sorted(p['name'] for p in fake.places.values()))
+        self.assertEqual(fake.calls['nearby'], 3)
+        self.assertEqual(fake.calls['details'], 45)
+
+    def test_details_cached_across_searches(self):
+        fake = self.serve(grid_places(30))
+        self.search(fake)
+        self.search(fake)
+        self.assertEqual(fake.calls['details'], 30)
+        self.assertEqual(fake.calls['nearby'], 4)
+
+    def test_malformed_details_do_not_end_the_run(self):
+        fake = self.serve(grid_places(25), broken={'p0003', 'p0021'})
+        found = self.search(fake)
+        self.assertEqual(len(found), 25)
+        self.assertEqual(sum(1 for b in found if b['name'] is None), 2)
+        self.assertEqual(get_place_details('key', 'p0003', base_url=fake.base_url), {})
+        self.assertNotIn('p0003', businesearch.details_cache)
+
+    def test_malformed_nearby_page(self):
+        fake = self.serve(grid_places(5), nearby_broken=True)
+        self.assertEqual(fetch_nearby_page('key', {'location': CENTER, 'radius': 100}, base_url=fake.base_url), ([], None))
+        self.assertEqual(self.search(fake), [])
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_rate(self):
+        bucket = TokenBucket(100, burst=1)
+        t0 = time.monotonic()
+        for _ in range(21):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - t0, 0.19)
+
+
+if __name__ == '__main__':
+    unittest.main()
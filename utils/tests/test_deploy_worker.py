@@ -0,0 +1,67 @@
+"""deploy_client.DeployWorker driving `deployWorker.js --provider stub` over JSON lines."""
+import json
+import os
+import shutil
+import subprocess
+import unittest
+
+import deploy_client
+from deploy_client import DeployWorker
+
+NODE = shutil.which('node')
+
+
+@unittest.skipUnless(NODE, 'node is not installed')
+class DeployWorkerTest(unittest.TestCase):
+    def worker(self, **kwargs) -> DeployWorker:
+        w = DeployWorker(provider='stub', node=NODE, **kwargs)
+        self.addCleanup(w.close)
+        return w
+
+    def test_ready_line(self):
+        proc = subprocess.Popen([NODE, deploy_client.WORKER_JS, '--provider', 'stub', '--concurrency', '2'],
+                                cwd=os.path.dirname(deploy_client.WORKER_JS), stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            self.assertEqual(json.loads(proc.stdout.readline()), {'ready': True, 'provider': 'stub', 'concurrency': 2})
+        finally:
+            proc.stdin.close()
+            proc.wait(10)
+
+    def test_successful_job(self):
+        res = self.worker().submit('A site for Joe', 'joes-diner').result(10)
+        self.assertTrue(res['ok'], res)
+        self.assertEqual(res['url'], 'https://joes-diner.stub.local')
+        self.assertIn('elapsedMs', res)
+
+    def test_empty_prompt_is_an_error(self):
+        w = self.worker()
+        res = w.submit('', 'empty-site').result(10)
+        self.assertFalse(res['ok'])
+        self.assertIn('empty prompt', res['error'])
+        # the worker keeps serving after a failed job
+        self.assertTrue(w.submit('next', 'next-site').result(10)['ok'])
+
+    def test_restart_after_worker_dies(self):
+        w = self.worker(stub_delay_ms=2000)
+        w.submit('warm up', 'warm').result(10)
+        old = w._process
+        lost = w.submit('in flight', 'lost-site')
+        old.proc.kill()
+        old.proc.wait(10)
+        # the next job starts a new process; the old reader only fails the old process's job
+        fresh = w.submit('after restart', 'fresh-site')
+        self.assertIsNot(w._process, old)
+        self.assertEqual(w.starts, 2)
+        res = lost.result(10)
+        self.assertFalse(res['ok'])
+        self.assertIn('exited', res['error'])
+        old.reader.join(10)
+        self.assertFalse(fresh.done())
+        res = fresh.result(10)
+        self.assertTrue(res['ok'], res)
+        self.assertEqual(res['url'], 'https://fresh-site.stub.local')
+
+
+if __name__ == '__main__':
+    unittest.main()
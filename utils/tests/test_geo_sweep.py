@@ -0,0 +1,99 @@
+"""geo_sweep.sweep against the local fake Places server: coverage, splitting and the persistent seen-set."""
+import math
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import businesearch
+import geo_sweep
+from geo_sweep import METERS_PER_DEG, SeenPlaces, _to_xy, hex_tile, sweep
+
+from tests.fake_places import FakePlaces, grid_places
+
+# 144 places, 111 m apart, inside this box
+BBOX = (29.65, -82.32, 29.661, -82.309)
+
+
+class SweepTest(unittest.TestCase):
+    def setUp(self):
+        businesearch.details_cache.clear()
+        patcher = mock.patch.object(geo_sweep, 'PAGE_TOKEN_DELAY_S', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.seen_path = os.path.join(tmp.name, 'seen.sqlite')
+        self.fake = FakePlaces(grid_places(144))
+        self.addCleanup(self.fake.close)
+
+    def run_sweep(self, stats=None, limit=None):
+        seen = SeenPlaces(self.seen_path)
+        try:
+            out = []
+            gen = sweep('key', 1000, bbox=BBOX, seen=seen, workers=4, rate_per_s=1000, base_url=self.fake.base_url, stats=stats)
+            for biz in gen:
+                out.append(biz)
+                if limit is not None and len(out) >= limit:
+                    gen.close()
+                    break
+            return out, len(seen)
+        finally:
+            seen.close()
+
+    def test_covers_every_place_once_and_never_repeats(self):
+        stats = {}
+        found, n_seen = self.run_sweep(stats)
+        ids = [b['place_id'] for b in found]
+        self.assertEqual(sorted(ids), sorted(self.fake.places))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertGreater(stats['cells_split'], 0)
+        self.assertEqual(n_seen, 144)
+        self.assertEqual(self.run_sweep()[0], [])
+
+    def test_failed_details_are_not_marked_seen(self):
+        self.fake.broken = {'p0005', 'p0077'}
+        stats = {}
+        found, n_seen = self.run_sweep(stats)
+        self.assertEqual(len(found), 142)
+        self.assertEqual(n_seen, 142)
+        self.assertGreaterEqual(stats['details_failed'], 2)
+        self.fake.broken = set()
+        again, _ = self.run_sweep()
+        self.assertEqual(sorted(b['place_id'] for b in again), ['p0005', 'p0077'])
+
+    def test_consumer_stopping_early_keeps_unconsumed_places(self):
+        first, n_seen = self.run_sweep(limit=3)
+        # the third place was yielded but the consumer never came back for more
+        self.assertEqual(n_seen, 2)
+        rest, _ = self.run_sweep()
+        self.assertEqual(len(rest), 142)
+        self.assertIn(first[2]['place_id'], {b['place_id'] for b in rest})
+
+
+def _box_points(bbox, n=25):
+    """`n` points along every edge of `bbox` plus an n x n interior grid."""
+    south, west, north, east = bbox
+    ts = [i / (n - 1) for i in range(n)]
+    lats = [south + t * (north - south) for t in ts]
+    lngs = [west + t * (east - west) for t in ts]
+    return [(lat, lng) for lat in lats for lng in lngs]
+
+
+class HexTileTest(unittest.TestCase):
+    def test_every_point_of_the_box_is_covered(self):
+        rng = random.Random(7)
+        radius = 1500
+        for _ in range(200):
+            south, west = rng.uniform(-60, 60), rng.uniform(-170, 170)
+            height = rng.uniform(0.2, 8) * radius / METERS_PER_DEG
+            width = rng.uniform(0.2, 8) * radius / (METERS_PER_DEG * math.cos(math.radians(south)))
+            bbox = (south, west, south + height, west + width)
+            cells = hex_tile(bbox, radius)
+            worst = max(min(math.hypot(*_to_xy((c.lat, c.lng), p)) for c in cells) for p in _box_points(bbox))
+            self.assertLessEqual(worst, radius * 1.0001, bbox)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""LighthouseRunner: its own threads for async callers, and per-call timeouts."""
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import lighthouse_runner
+from lighthouse_runner import LighthouseRunner
+
+
+class LighthouseRunnerTest(unittest.TestCase):
+    def runner(self, **kwargs) -> LighthouseRunner:
+        runner = LighthouseRunner(**kwargs)
+        self.addCleanup(runner.close)
+        return runner
+
+    def test_async_runs_use_the_runner_threads(self):
+        runner = self.runner(concurrency=2)
+        lock = threading.Lock()
+        seen = {'threads': set(), 'active': 0, 'peak': 0}
+
+        def fake_run(url, keep_raw=False, timeout=None):
+            with lock:
+                seen['threads'].add(threading.current_thread().name)
+                seen['active'] += 1
+                seen['peak'] = max(seen['peak'], seen['active'])
+            time.sleep(0.1)
+            with lock:
+                seen['active'] -= 1
+            return {'url': url}
+
+        runner.run = fake_run
+
+        async def main():
+            return await asyncio.gather(*(runner.run_async(f'http://site{i}.example') for i in range(6)))
+
+        results = asyncio.run(main())
+        self.assertEqual([r['url'] for r in results], [f'http://site{i}.example' for i in range(6)])
+        self.assertEqual(seen['peak'], 2)
+        self.assertTrue(all(name.startswith('lighthouse') for name in seen['threads']), seen['threads'])
+
+    def test_per_call_timeout(self):
+        runner = self.runner(timeout=30)
+        slow = [sys.executable, '-c', 'import time; time.sleep(10)']
+        with mock.patch.object(lighthouse_runner, 'resolve_lighthouse', return_value=slow), \
+                mock.patch.object(lighthouse_runner, 'resolve_chrome', return_value=None):
+            t0 = time.monotonic()
+            self.assertIsNone(runner.run('http://slow.example', timeout=0.3))
+        self.assertLess(time.monotonic() - t0, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
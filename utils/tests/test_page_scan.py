@@ -0,0 +1,18 @@
+"""page_scan.scan: contact details found in one pass."""
+import unittest
+
+from page_scan import scan
+
+
+class ContactScanTest(unittest.TestCase):
+    def test_phone_runs_are_trimmed(self):
+        found = scan('Call 352-555-1234 - or +1 352 555 9876 (mobile). Mail joe@diner.com.', '')
+        self.assertEqual(sorted(found['phones']), ['+1 352 555 9876', '352-555-1234'])
+        self.assertEqual(found['emails'], ['joe@diner.com'])
+
+    def test_short_digit_runs_are_not_phones(self):
+        self.assertEqual(scan('Open 9-5, est. 1999 (12 tables)', '')['phones'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
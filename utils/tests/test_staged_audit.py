@@ -0,0 +1,107 @@
+"""Inputs a staged audit skipped stay unmeasured: not suggested on, not stored, not re-scored as defaults."""
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import lead_qualifier
+import measures_store
+import rescore
+from ai_quick_suggester import _heuristic_suggestions, _prompt_inputs
+from batch_scorer import compute_scores_batch
+from scorer import compute_scores
+
+PAGE = b'<html><head><title>Joe</title></head><body><p>Hi</p><a href="/menu">menu</a></body></html>'
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+
+def _skipped_measures():
+    measures = {'meta': {'title': 'Joe'}, 'mobile_friendly': True, 'contact_info_found': True, 'has_schema': True,
+                'meta_description': 'x', 'copyright_fresh': True, 'booking_keywords': ['book']}
+    lead_qualifier.mark_unmeasured(measures, ['ssl', 'robots_sitemap', 'broken_links'])
+    return measures
+
+
+class UnmeasuredInputsTest(unittest.TestCase):
+    def test_mark_unmeasured(self):
+        m = _skipped_measures()
+        self.assertEqual(m['unmeasured'], ['has_ssl', 'robots_sitemap', 'broken_links'])
+        self.assertIsNone(m['has_ssl'])
+        self.assertEqual(lead_qualifier.unmeasured_stages(m['unmeasured']), ['ssl', 'robots_sitemap', 'broken_links'])
+
+    def test_suggestions_ignore_unmeasured_inputs(self):
+        m = _skipped_measures()
+        suggestions = _heuristic_suggestions(m)
+        self.assertNotIn('enable HTTPS', suggestions)
+        self.assertNotIn('add sitemap.xml', suggestions)
+        self.assertNotIn('has_ssl', _prompt_inputs(m)[0])
+        measured = dict(m, has_ssl=False, robots_sitemap={'robots': False, 'sitemap': False}, unmeasured=[])
+        self.assertIn('enable HTTPS', _heuristic_suggestions(measured))
+        self.assertIn('add sitemap.xml', _heuristic_suggestions(measured))
+
+    def test_scorers_accept_unmeasured_inputs(self):
+        m = _skipped_measures()
+        self.assertEqual(compute_scores_batch([m])[0]['total'], compute_scores(m)['total'])
+
+    def test_store_leaves_unmeasured_inputs_out(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = measures_store.MeasuresStore(os.path.join(tmp, 'm.sqlite'))
+            try:
+                store.record('http://joe.example', _skipped_measures())
+                entry = store.get('http://joe.example')
+            finally:
+                store.close()
+        self.assertEqual(entry['unmeasured'], ['has_ssl', 'robots_sitemap', 'broken_links'])
+        for key in entry['unmeasured']:
+            self.assertNotIn(key, entry['measures'])
+
+    def test_rescore_bounds_unmeasured_sites(self):
+        entry = {'url': 'u', 'measures': measures_store.scorer_inputs(_skipped_measures()),
+                 'unmeasured': ['has_ssl', 'robots_sitemap', 'broken_links'], 'ai_decision': None}
+        profile = rescore.default_profile()
+        lo, hi = lead_qualifier.total_bounds(entry['measures'], ['ssl', 'robots_sitemap', 'broken_links'])
+        totals = rescore.score_entries([entry], profile)
+        self.assertEqual(rescore.lead_status([entry], totals, dict(profile, threshold=hi + 1)), [True])
+        self.assertEqual(rescore.lead_status([entry], totals, dict(profile, threshold=lo)), [False])
+        self.assertEqual(rescore.lead_status([entry], totals, dict(profile, threshold=hi)), [None])
+        diff = rescore.diff_leads([entry], totals, totals, [True], [None])
+        self.assertEqual(diff, {'became_leads': [], 'no_longer_leads': []})
+
+
+class StagedAuditTest(unittest.TestCase):
+    def test_early_decision_marks_network_inputs_unmeasured(self):
+        from website_quality_checker import analyze
+        server = _Server(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        m = analyze(f'http://127.0.0.1:{server.server_address[1]}/', use_ai=False, use_lighthouse=False,
+                    qualify_threshold=100, use_vision=False)
+        self.assertEqual(m['qualification']['decided'], 'lead')
+        self.assertEqual(m['unmeasured'], ['robots_sitemap', 'broken_links'])
+        self.assertIsNone(m['broken_links'])
+        self.assertIsNone(m['robots_sitemap'])
+        # plain http: HTTPS is known to be missing, so it is measured
+        self.assertIs(m['has_ssl'], False)
+        self.assertEqual(m['ssl_info']['error'], 'not checked: no HTTPS')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""SuggestionBatcher against a local mock chat-completions server."""
+import json
+import os
+import re
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import ai_quick_suggester
+from ai_quick_suggester import SuggestionBatcher
+
+ANSWER = ['add meta description', 'fix broken links']
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        pass  # the timeout test hangs up before the answer is written
+
+
+class FakeCompletions:
+    """Answers every `Site <id>:` block in the prompt. `status` answers with that HTTP error instead,
+    `malformed_over` returns non-JSON for prompts with more sites than that, and `delay_s` stalls."""
+
+    def __init__(self):
+        self.status = 200
+        self.malformed_over = None
+        self.delay_s = 0.0
+        self.prompt_sizes = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                sites = re.findall(r'^Site (\w+):', body['messages'][-1]['content'], re.M)
+                fake.prompt_sizes.append(len(sites))
+                if fake.delay_s:
+                    time.sleep(fake.delay_s)
+                if fake.status != 200:
+                    self.send_error(fake.status)
+                    return
+                if fake.malformed_over is not None and len(sites) > fake.malformed_over:
+                    content = '{"sites": {"' + sites[0] + '": ["add meta'  # cut off mid-answer
+                else:
+                    content = json.dumps({'sites': {sid: ANSWER for sid in sites}})
+                data = json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = _Server(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _measures(i):
+    return {'meta': {'title': f'Site {i}'}, 'parsed': {'body_text': f'Welcome to business number {i}.'}}
+
+
+class SuggestionBatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCompletions()
+        self.addCleanup(self.fake.close)
+        for patcher in (mock.patch.object(ai_quick_suggester, 'OPENAI_API_URL', self.fake.url),
+                        mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_batch(self, n=4, **kwargs):
+        batcher = SuggestionBatcher(max_sites=n, max_wait_s=5, **kwargs)
+        futs = [batcher.submit(_measures(i)) for i in range(n)]
+        return [f.result(10) for f in futs], batcher.stats()
+
+    def test_well_formed_batch_is_one_request(self):
+        results, stats = self.run_batch()
+        self.assertEqual(results, [ANSWER] * 4)
+        self.assertEqual(self.fake.prompt_sizes, [4])
+        self.assertEqual((stats['requests'], stats['splits'], stats['fallbacks']), (1, 0, 0))
+
+    def test_malformed_batch_is_split(self):
+        self.fake.malformed_over = 1
+        results, stats = self.run_batch()
+        self.assertEqual(results, [ANSWER] * 4)
+        self.assertEqual(sorted(self.fake.prompt_sizes), [1, 1, 1, 1, 2, 2, 4])
+        self.assertEqual((stats['splits'], stats['fallbacks']), (3, 0))
+
+    def test_http_errors_fall_back_without_retrying(self):
+        for status in (401, 429, 500):
+            with self.subTest(status=status):
+                self.fake.status = status
+                self.fake.prompt_sizes.clear()
+                results, stats = self.run_batch()
+                self.assertEqual(results, [None] * 4)
+                self.assertEqual(self.fake.prompt_sizes, [4])
+                self.assertEqual((stats['splits'], stats['fallbacks'], stats['request_errors']), (0, 4, 1))
+
+    def test_timeout_falls_back_without_retrying(self):
+        self.fake.delay_s = 0.5
+        t0 = time.monotonic()
+        results, stats = self.run_batch(timeout=0.1)
+        self.assertEqual(results, [None] * 4)
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['splits'], 0)
+        self.assertLess(time.monotonic() - t0, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""VerdictCache: only the redesign decision is shared between look-alike screenshots."""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import simplevison
+import vision_prefilter
+from simplevison import VerdictCache, ai_verdict, site_fields
+
+VERDICT = {'redesign_candidate': 'YES', 'business_name': 'Acme Plumbing',
+           'site_description': 'The purpose of this site is plumbing.', 'reasons': ['Outdated design elements']}
+
+
+class VerdictCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vision.sqlite')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reuse_keeps_only_the_decision(self):
+        cache = VerdictCache(self.path, max_distance=6)
+        cache.add(0x0F0F0F0F0F0F0F0F, dict(VERDICT))
+        self.assertEqual(cache.lookup(0x0F0F0F0F0F0F0F0F ^ 0b101), {'redesign_candidate': 'YES'})
+        self.assertIsNone(cache.lookup(0x0F0F0F0F0F0F0F0F ^ 0xFF))
+        reloaded = VerdictCache(self.path, max_distance=6)
+        self.assertEqual(reloaded.lookup(0x0F0F0F0F0F0F0F0F), {'redesign_candidate': 'YES'})
+
+    def test_banded_lookup_finds_every_hash_within_distance(self):
+        import random
+        rng = random.Random(7)
+        cache = VerdictCache(None, max_distance=6)
+        stored = [rng.getrandbits(64) for _ in range(300)]
+        for h in stored:
+            cache.add(h, {'redesign_candidate': 'NO'})
+        for h in stored[:50]:
+            bits = rng.sample(range(64), 6)
+            probe = h
+            for b in bits:
+                probe ^= 1 << b
+            self.assertIsNotNone(cache.lookup(probe))
+
+    def test_lru_eviction(self):
+        cache = VerdictCache(self.path, max_distance=0, max_entries=2)
+        cache.add(1, {'redesign_candidate': 'YES'})
+        cache.add(2, {'redesign_candidate': 'NO'})
+        cache.lookup(1)
+        cache.add(3, {'redesign_candidate': 'NO'})
+        self.assertIsNotNone(cache.lookup(1))
+        self.assertIsNone(cache.lookup(2))
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(VerdictCache(self.path, max_distance=0).stats()['entries'], 2)
+
+    def test_disabled_cache_neither_reads_nor_writes(self):
+        cache = VerdictCache(self.path, max_distance=-1)
+        cache.add(1, dict(VERDICT))
+        self.assertIsNone(cache.lookup(1))
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class SiteFieldsTest(unittest.TestCase):
+    def test_prefers_og_site_name(self):
+        meta = {'title': 'Home | Other', 'meta': {'og:site_name': 'Bob\'s Bakery', 'description': 'Fresh bread daily.'}}
+        self.assertEqual(site_fields(meta), {'business_name': "Bob's Bakery", 'site_description': 'Fresh bread daily.'})
+
+    def test_title_skips_generic_segment(self):
+        self.assertEqual(site_fields({'title': 'Home | Acme Plumbing'}), {'business_name': 'Acme Plumbing'})
+        self.assertEqual(site_fields({'title': ''}), {})
+
+
+class PrefilterVerdictTest(unittest.TestCase):
+    def test_off_by_default(self):
+        self.assertFalse(simplevison.PREFILTER)
+
+    def test_prefilter_verdict_names_the_business(self):
+        local = {'redesign_candidate': 'YES', 'reasons': ['default serif body text'], 'source': 'prefilter'}
+        info = {}
+        with mock.patch.object(simplevison, 'PREFILTER', True), \
+                mock.patch.object(vision_prefilter, 'classify', return_value=local):
+            verdict = asyncio.run(ai_verdict('http://bob.example', rendered={'screenshot_png': b''}, info=info,
+                                             meta={'title': "Bob's Bakery - Home"}))
+        self.assertEqual(info['cache'], 'prefilter')
+        self.assertEqual(verdict['business_name'], "Bob's Bakery")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""vision_prefilter.py
+
+Cheap local pre-classifier run before the GPT vision verdict. It scores a screenshot (colour palette
+entropy, background share, edge density, saturation) and the computed-style summary from
+playwright_capture (font count, default serif body text, tiny text, fixed narrow layout) with a few
+vectorized NumPy/Pillow ops, and settles only the clear cases:
+
+- 'YES' when enough outdated-design signals agree,
+- 'NO' when the page shows the modern ones and no outdated ones,
+- None otherwise, so the site still goes to the model.
+
+Thresholds are deliberately conservative but uncalibrated: no labelled sample set has been collected,
+so agreement with model verdicts and the share of calls saved have not been measured. Check them
+with bench_prefilter.py before enabling simplevison.PREFILTER.
+Needs numpy and Pillow; without them every site is treated as ambiguous.
+"""
+from __future__ import annotations
+import re
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # optional: without them classify() always defers to the model
+    np = None
+    Image = None
+
+# Screenshots are analysed at this size; plenty for palette and density statistics.
+SAMPLE_SIZE = (320, 180)
+# Rendered viewport width (playwright_capture.RENDER_VIEWPORT).
+VIEWPORT_WIDTH = 1280
+
+# Hand-picked, not fitted to labelled samples (see the module docstring).
+YES_AT = 3
+NO_AT = -2
+
+DEFAULT_SERIFS = ('times new roman', 'times', 'serif')
+LEGACY_FONTS = ('comic sans', 'papyrus', 'arial black', 'impact', 'courier')
+
+
+def image_features(png_bytes: bytes) -> Dict[str, float]:
+    """Palette entropy (bits over a 512-colour quantization), background share, edge density and mean saturation."""
+    with Image.open(BytesIO(png_bytes)) as im:
+        rgb = np.asarray(im.convert('RGB').resize(SAMPLE_SIZE, Image.BILINEAR), dtype=np.int16)
+    q = (rgb >> 5).reshape(-1, 3)
+    codes = (q[:, 0] << 6) | (q[:, 1] << 3) | q[:, 2]
+    counts = np.bincount(codes, minlength=512).astype(np.float64)
+    p = counts[counts > 0] / codes.size
+    gray = rgb @ np.array([299, 587, 114], dtype=np.int32) // 1000
+    edges = (np.abs(np.diff(gray, axis=1)) > 24).mean() + (np.abs(np.diff(gray, axis=0)) > 24).mean()
+    mx, mn = rgb.max(axis=2), rgb.min(axis=2)
+    sat = np.where(mx > 0, (mx - mn) / np.maximum(mx, 1), 0.0)
+    return {
+        'palette_entropy': round(float(-(p * np.log2(p)).sum()), 3),
+        'background_share': round(float(counts.max() / codes.size), 3),
+        'edge_density': round(float(edges / 2), 4),
+        'saturation': round(float(sat.mean()), 3),
+    }
+
+
+def _px(value: Any) -> Optional[float]:
+    m = re.match(r'\s*([\d.]+)px', str(value or ''))
+    return float(m.group(1)) if m else None
+
+
+def dom_features(dom: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Font count, legacy/default fonts, smallest body text size and widest content block from capture_dom_styles output."""
+    dom = dom or {}
+    fonts = [str(f).lower() for f in dom.get('fonts') or []]
+    families = {f.split(',')[0].strip().strip('"\'') for f in fonts if f}
+    elements = dom.get('elements') or []
+    body = next((e['computed'] for e in elements if e.get('selector') == 'body'), {}) or {}
+    body_font = str(body.get('fontFamily') or '').lower().split(',')[0].strip().strip('"\'')
+    text_sizes = [_px(e['computed'].get('fontSize')) for e in elements if e.get('selector') in ('p', 'a')]
+    text_sizes = [s for s in text_sizes if s]
+    widths = [float(e['computed'].get('width') or 0) for e in elements
+              if e.get('selector') in ('main', 'section', 'header', 'nav', 'footer', 'p', 'h1', 'h2')]
+    return {
+        'font_count': len(families),
+        'default_serif_body': body_font in DEFAULT_SERIFS,
+        'legacy_fonts': sorted(f for f in families if any(l in f for l in LEGACY_FONTS)),
+        'min_text_px': min(text_sizes) if text_sizes else None,
+        'max_content_width': max(widths) if widths else None,
+        'has_dom': bool(elements),
+    }
+
+
+def score(img: Dict[str, float], dom: Dict[str, Any]) -> Tuple[int, List[str]]:
+    """Positive points are outdated-design signals, negative points modern ones."""
+    points = 0
+    reasons: List[str] = []
+
+    def hit(delta: int, reason: str) -> None:
+        nonlocal points
+        points += delta
+        if delta > 0:
+            reasons.append(reason)
+
+    if img:
+        if img['palette_entropy'] > 6.0 and img['background_share'] < 0.25:
+            hit(2, 'Busy, noisy background colours')
+        if img['saturation'] > 0.55:
+            hit(1, 'Garish saturated colour scheme')
+        if img['edge_density'] > 0.18:
+            hit(1, 'Cluttered, dense layout')
+        if img['background_share'] > 0.45 and img['palette_entropy'] < 4.0 and img['saturation'] < 0.35:
+            hit(-1, 'clean background')
+    if dom.get('has_dom'):
+        if dom['default_serif_body']:
+            hit(2, 'Default browser serif typography')
+        if dom['legacy_fonts']:
+            hit(1, 'Dated novelty fonts')
+        if dom['font_count'] > 6:
+            hit(1, 'Too many mixed fonts')
+        if dom['min_text_px'] is not None and dom['min_text_px'] < 12:
+            hit(1, 'Tiny hard-to-read text')
+        width = dom['max_content_width']
+        if width is not None and width < 0.65 * VIEWPORT_WIDTH:
+            hit(1, 'Fixed narrow page layout')
+        if not dom['default_serif_body'] and not dom['legacy_fonts'] and 1 <= dom['font_count'] <= 3:
+            hit(-1, 'consistent typography')
+        if dom['min_text_px'] is not None and dom['min_text_px'] >= 15:
+            hit(-1, 'readable text size')
+    return points, reasons
+
+
+def classify(png_bytes: Optional[bytes], dom_styles: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Return a verdict dict shaped like the model's for clear cases, or None when the model should decide."""
+    if np is None or not png_bytes:
+        return None
+    try:
+        img = image_features(png_bytes)
+    except Exception:
+        return None
+    dom = dom_features(dom_styles)
+    points, reasons = score(img, dom)
+    features = {'image': img, 'dom': dom, 'score': points}
+    if points >= YES_AT:
+        return {'redesign_candidate': 'YES', 'reasons': reasons[:3], 'source': 'prefilter', 'features': features}
+    if points <= NO_AT and not reasons:
+        return {'redesign_candidate': 'NO', 'source': 'prefilter', 'features': features}
+    return None
@@ -2,128 +2,230 @@
 
 CLI entrypoint. Usage:
 python website_quality_checker.py <url> [--output out.json]
+python website_quality_checker.py --batch urls.txt [--workers 8] [--output results.jsonl]
 
 """
 from __future__ import annotations
+import simplevison
 from simplevison import ai_verdict
+from playwright_capture import render_page
 import asyncio
 import argparse
 import json
 from urllib.parse import urlparse
 import sys
 import os
-
-from scraper import fetch_url, parse_html, extract_css_from_urls, fetch_css_fonts, check_robots_and_sitemap, sample_internal_links
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Tuple
+
+from fetcher import AsyncFetcher, run_sync
+import http_cache
+import browser_pool
+from disk_cache import DEFAULT_CACHE_DIR
+from scraper import DEFAULT_CONTENT_TYPES, DEFAULT_MAX_BODY_BYTES, configure_fetch, fetch_and_parse_async, extract_css_from_urls_async, fetch_css_fonts, check_robots_and_sitemap_async, sample_internal_links
 from analyzer import (
     text_to_html_ratio,
     heading_stats,
-    check_broken_links,
-    ssl_certificate_valid,
-    find_contact_info,
-    has_structured_data,
-    parse_lighthouse_json,
+    check_links_async,
+    ssl_certificate_valid_async,
     count_security_headers,
     paragraph_stats,
     external_resource_ratio,
     h1_stats
 )
-from scorer import compute_scores
+from scorer import AI_REDO_DELTA, compute_scores
 from utils import simple_keyword_relevance
 # Load .env so OPENAI_API_KEY can be picked up from a local file
 from dotenv import load_dotenv
 load_dotenv()
 
 # AI quick suggester (optional). Returns short 2-5 word suggestions.
+import ai_quick_suggester
 from ai_quick_suggester import generate_suggestions
 # ai_vision removed; using simplevison.ai_verdict
 
-import subprocess
+import instrument
+import lead_qualifier
+import lighthouse_runner
+import measures_store
+import page_scan
+import report_io
 
 
-def try_run_lighthouse(url: str, timeout: int = 30) -> dict | None:
-    """Try to run lighthouse CLI using npx or lighthouse if available. Returns parsed JSON dict or None."""
-    out_path = 'lighthouse_out.json'
-    cmds = [
-        ['lighthouse', url, '--quiet', '--output=json', f'--output-path={out_path}'],
-        ['npx','lighthouse', url, '--quiet', '--output=json', f'--output-path={out_path}']
-    ]
-    for cmd in cmds:
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-            if proc.returncode == 0 and os.path.exists(out_path):
-                with open(out_path,'r',encoding='utf-8') as f:
-                    data = json.load(f)
-                try:
-                    os.remove(out_path)
-                except Exception:
-                    pass
-                return data
-        except FileNotFoundError:
-            continue
-        except subprocess.SubprocessError:
-            continue
-    return None
-
-
-def analyze(url: str, use_ai: bool = True) -> dict:
-    status, html, headers, elapsed_s, content_len = fetch_url(url)
+def try_run_lighthouse(url: str, timeout: int = lighthouse_runner.DEFAULT_TIMEOUT_S) -> dict | None:
+    """Run Lighthouse and return the full parsed JSON report, or None. Prefer lighthouse_runner.run_lighthouse,
+    which keeps only the scores and key metrics."""
+    res = lighthouse_runner.get_runner().run(url, keep_raw=True, timeout=timeout)
+    return res.get('raw') if res else None
+
+
+def analyze(url: str, use_ai: bool = True, **opts) -> dict:
+    """analyze_async() from sync code; measures['timings'] holds the per-stage timings (instrument.py)."""
+    with instrument.audit() as timer:
+        measures = run_sync(analyze_async(url, use_ai=use_ai, **opts))
+    measures['timings'] = timer.as_dict()
+    return measures
+
+
+async def analyze_async(url: str, use_ai: bool = True, link_concurrency: int = 10, link_per_host: int = 4,
+                        use_lighthouse: bool = True, keep_lighthouse_raw: bool = False,
+                        qualify_threshold: float | None = None, use_vision: bool = False) -> dict:
+    """Audit one URL. Network checks that only need the URL (TLS, robots/sitemap, Lighthouse) start
+    alongside the page fetch; CSS and link checks start as soon as the page is parsed.
+
+    `link_concurrency` / `link_per_host` bound the internal broken-link checks.
+
+    With `qualify_threshold` the audit is staged instead (see _analyze_staged): cheap stages first,
+    and stages that can no longer move the site across the threshold are skipped."""
+    if qualify_threshold is not None:
+        return await _analyze_staged(url, qualify_threshold, use_ai=use_ai, use_vision=use_vision,
+                                     link_concurrency=link_concurrency, link_per_host=link_per_host,
+                                     use_lighthouse=use_lighthouse, keep_lighthouse_raw=keep_lighthouse_raw)
+    fetcher = AsyncFetcher()
+    ssl_task = asyncio.ensure_future(instrument.timed('ssl', ssl_certificate_valid_async(url, fetcher)))
+    robots_task = asyncio.ensure_future(instrument.timed('robots_sitemap', check_robots_and_sitemap_async(url, fetcher)))
+    lighthouse_task = asyncio.ensure_future(instrument.timed(
+        'lighthouse', lighthouse_runner.run_lighthouse_async(url, keep_lighthouse_raw))) if use_lighthouse else None
+
+    page = await _fetch_and_parse(url, fetcher)
+    parsed = page['parsed']
+    links_task = asyncio.ensure_future(instrument.timed(
+        'links', check_links_async(_link_sample(url, parsed), concurrency=link_concurrency, per_host=link_per_host)))
+
+    # CSS fonts
+    css_text = ''
+    if parsed.get('css_links'):
+        css_text = await instrument.timed('css', extract_css_from_urls_async(parsed['css_links'], fetcher=fetcher))
+
+    with instrument.stage('measures'):
+        measures = _page_measures(url, page)
+    measures['css_font_families'] = fetch_css_fonts(css_text)
+    _record_links(measures, await links_task)
+    _record_ssl(measures, url, page, await ssl_task)
+    measures['robots_sitemap'] = await robots_task
+    _record_lighthouse(measures, await lighthouse_task if lighthouse_task else None, keep_lighthouse_raw)
+
+    # attach raw parsed
+    measures['parsed'] = parsed
+    if use_ai:
+        await _add_suggestions(measures, fetcher)
+    else:
+        measures['ai_suggestions'] = []
+    return measures
+
+
+async def _analyze_staged(url: str, threshold: float, use_ai: bool, use_vision: bool, link_concurrency: int,
+                          link_per_host: int, use_lighthouse: bool, keep_lighthouse_raw: bool) -> dict:
+    """Early-exit audit, cheapest stage first:
+
+    1. page fetch and everything derived from the HTML and headers (one request, no browser);
+    2. TLS, robots/sitemap, broken-link and CSS requests, concurrently;
+    3. Lighthouse;
+    4. the vision verdict, run later by audit() / the pipeline (`use_vision` says whether it will).
+
+    After stages 1-3 lead_qualifier bounds the final total with the remaining stages unknown; once
+    the site is certainly under (or certainly not under) `threshold`, the remaining stages are
+    skipped. measures['qualification'] records the bounds, the decision and every skipped stage
+    with its reason; the inputs of skipped network stages are None and listed in
+    measures['unmeasured']. AI suggestions only feed the redesign prompt, so they are skipped for sites
+    that cannot be leads."""
+    fetcher = AsyncFetcher()
+    page = await _fetch_and_parse(url, fetcher)
+    parsed = page['parsed']
+    with instrument.stage('measures'):
+        measures = _page_measures(url, page)
+    measures['parsed'] = parsed
+    measures['lighthouse'] = None
+    ssl_known = urlparse(url).scheme != 'https' or 'SSL' in (page['fetch_error'] or '')
+    if ssl_known:
+        error = page['fetch_error'] if urlparse(url).scheme == 'https' else 'not checked: no HTTPS'
+        _record_ssl(measures, url, page, {'valid': False, 'error': error})
+
+    later = (['lighthouse'] if use_lighthouse else []) + (['vision'] if use_vision else [])
+    network = ([] if ssl_known else ['ssl']) + ['robots_sitemap', 'broken_links']
+    decision = lead_qualifier.checkpoint(measures, threshold, network + later, network + ['css'] + later)
+    if decision is not None:
+        lead_qualifier.mark_unmeasured(measures, network)
+    else:
+        tasks = [instrument.timed('links', check_links_async(_link_sample(url, parsed), concurrency=link_concurrency,
+                                                             per_host=link_per_host)),
+                 instrument.timed('robots_sitemap', check_robots_and_sitemap_async(url, fetcher))]
+        if parsed.get('css_links'):
+            tasks.append(instrument.timed('css', extract_css_from_urls_async(parsed['css_links'], fetcher=fetcher)))
+        if not ssl_known:
+            tasks.append(instrument.timed('ssl', ssl_certificate_valid_async(url, fetcher)))
+        results = await asyncio.gather(*tasks)
+        _record_links(measures, results[0])
+        measures['robots_sitemap'] = results[1]
+        measures['css_font_families'] = fetch_css_fonts(results[2] if parsed.get('css_links') else '')
+        if not ssl_known:
+            _record_ssl(measures, url, page, results[-1])
+        decision = lead_qualifier.checkpoint(measures, threshold, later, later)
+    if decision is None and use_lighthouse:
+        lh = await instrument.timed('lighthouse', lighthouse_runner.run_lighthouse_async(url, keep_lighthouse_raw))
+        _record_lighthouse(measures, lh, keep_lighthouse_raw)
+        if use_vision:
+            decision = lead_qualifier.checkpoint(measures, threshold, ['vision'], ['vision'])
+
+    if use_ai and decision != 'not_lead':
+        await _add_suggestions(measures, fetcher)
+    else:
+        if use_ai:
+            lead_qualifier.skip(measures, 'suggestions', 'not a lead; suggestions only feed the redesign prompt')
+        measures['ai_suggestions'] = []
+    return measures
+
+
+async def _fetch_and_parse(url: str, fetcher: AsyncFetcher) -> dict:
+    # the body is parsed as it streams in (fetch_and_parse records the parse time itself)
+    status, parsed, headers, elapsed_s, content_len = await instrument.timed('fetch', fetch_and_parse_async(url, fetcher=fetcher))
     # record fetch-level errors (SSL verification, DNS, connection, etc.) so the analyzer
     # can continue and present a useful result rather than crashing.
     fetch_error = None
-    insecure_fallback = False
+    insecure_fallback = truncated = False
     if headers and isinstance(headers, dict):
         fetch_error = headers.get('fetch_error')
         insecure_fallback = headers.get('insecure_fallback') == 'true'
+        truncated = headers.get('truncated') == 'true'
     if fetch_error:
         print(f"Warning: fetch error for {url}: {fetch_error}")
-    parsed = parse_html(url, html or '')
+    return {'status': status, 'headers': headers, 'elapsed_s': elapsed_s, 'content_len': content_len,
+            'fetch_error': fetch_error, 'insecure_fallback': insecure_fallback, 'truncated': truncated,
+            'parsed': parsed}
 
-    # CSS fonts
-    css_text = ''
-    if parsed.get('css_links'):
-        css_text = extract_css_from_urls(parsed['css_links'])
-    font_families = fetch_css_fonts(css_text)
 
-    # measures
+def _link_sample(url: str, parsed: dict) -> list:
+    # sample internal links
+    return sample_internal_links(parsed.get('links', []), urlparse(url).netloc, limit=10)
+
+
+def _page_measures(url: str, page: dict) -> dict:
+    """Every measure that needs nothing but the fetched page and its headers."""
+    parsed = page['parsed']
     measures = {}
     measures['meta'] = parsed.get('meta',{})
     measures['canonical'] = parsed.get('canonical')
     measures['viewport'] = parsed.get('viewport')
-    measures['css_font_families'] = font_families
     measures['raw_html_len'] = len(parsed.get('raw_html',''))
     measures['body_text_len'] = len(parsed.get('body_text',''))
     measures['text_html_ratio'] = text_to_html_ratio(parsed.get('raw_html',''), parsed.get('body_text',''))
-    measures['response_time_s'] = elapsed_s
-    measures['content_length_bytes'] = content_len
+    measures['response_time_s'] = page['elapsed_s']
+    measures['content_length_bytes'] = page['content_len']
+    measures['body_truncated'] = page['truncated']
 
     hs = heading_stats(parsed.get('headings',[]))
     measures['heading_stats'] = hs
-    measures['h1_stats'] = h1_stats(parsed.get('headings', []))
-
-    # sample internal links
-    netloc = urlparse(url).netloc
-    internal_sample = sample_internal_links(parsed.get('links',[]), netloc, limit=10)
-    broken = check_broken_links(internal_sample)
-    measures['broken_links'] = broken
-
-    # ssl
-    ssl_info = ssl_certificate_valid(url)
-    measures['ssl_info'] = ssl_info
-    # If fetch had an SSL verification error, mark `has_ssl` False but record the raw error.
-    if fetch_error and 'SSL' in (fetch_error or ''):
-        measures['has_ssl'] = False
-        measures['fetch_error'] = fetch_error
-        measures['insecure_fallback'] = insecure_fallback
-    else:
-        measures['has_ssl'] = True if urlparse(url).scheme == 'https' and ssl_info.get('valid') else False
 
-    # contact info
-    contact = find_contact_info(parsed.get('raw_html','') + ' ' + parsed.get('body_text',''))
+    # contact info, structured data, copyright years and booking keywords in one scan
+    found = page_scan.scan(parsed.get('raw_html',''), parsed.get('body_text',''))
+    contact = page_scan.contact_info(found)
     measures['contact_info'] = contact
     measures['contact_info_found'] = bool(contact.get('emails') or contact.get('phones') or contact.get('addresses'))
-
-    # structured data
-    measures['has_schema'] = has_structured_data(parsed.get('raw_html',''))
+    measures['has_schema'] = bool(found['schema_markers'])
+    measures['booking_keywords'] = found['booking_keywords']
 
     # images alt
     imgs = parsed.get('images',[])
@@ -133,11 +235,8 @@ def analyze(url: str, use_ai: bool = True) -> dict:
     else:
         measures['images_with_alt_ratio'] = 1.0
 
-    # robots/sitemap
-    measures['robots_sitemap'] = check_robots_and_sitemap(url)
-
     # security headers
-    measures['security_headers'] = count_security_headers(headers)
+    measures['security_headers'] = count_security_headers(page['headers'])
 
     # paragraph stats
     measures['paragraph_stats'] = paragraph_stats(parsed.get('paragraph_lengths', []))
@@ -151,42 +250,56 @@ def analyze(url: str, use_ai: bool = True) -> dict:
     # keyword relevance
     measures['keyword_relevance'] = simple_keyword_relevance(measures.get('meta',{}).get('title',''), parsed.get('body_text',''))
 
-    # copyright fresh: look for year in footer or copyright
+    # copyright fresh: the latest year of a copyright notice is this year or last year
+    years = found['copyright_years']
+    measures['copyright_years'] = years
     fresh = False
-    import re
-    m = re.search(r'©?\s*(?:copyright)?\s*(\d{4})', parsed.get('raw_html',''), flags=re.I)
-    if m:
-        year = int(m.group(1))
+    if years:
         from datetime import datetime
-        fresh = year >= datetime.utcnow().year - 1
+        fresh = max(years) >= datetime.utcnow().year - 1
     measures['copyright_fresh'] = fresh
 
-    # lighthouse
-    lh = try_run_lighthouse(url)
-    if lh:
-        lh_scores = parse_lighthouse_json(lh)
-        measures['lighthouse'] = lh_scores
-        measures['lighthouse_raw'] = lh
-    else:
-        measures['lighthouse'] = None
-
     # add some flags
     measures['mobile_friendly'] = bool(measures.get('viewport'))
     measures['meta_description'] = bool(measures.get('meta',{}).get('meta',{}).get('description'))
+    return measures
 
-    # attach raw parsed
-    measures['parsed'] = parsed
 
-    # === quick AI suggestions (2-5 words each) ===
-    if use_ai:
-        try:
-            measures['ai_suggestions'] = generate_suggestions(measures)
-        except Exception:
-            measures['ai_suggestions'] = []
+def _record_links(measures: dict, link_checks: list) -> None:
+    measures['broken_links'] = sum(1 for r in link_checks if not r['ok'])
+    measures['link_checks'] = link_checks
+
+
+def _record_ssl(measures: dict, url: str, page: dict, ssl_info: dict) -> None:
+    measures['ssl_info'] = ssl_info
+    # If fetch had an SSL verification error, mark `has_ssl` False but record the raw error.
+    fetch_error = page['fetch_error']
+    if fetch_error and 'SSL' in (fetch_error or ''):
+        measures['has_ssl'] = False
+        measures['fetch_error'] = fetch_error
+        measures['insecure_fallback'] = page['insecure_fallback']
+    else:
+        measures['has_ssl'] = True if urlparse(url).scheme == 'https' and ssl_info.get('valid') else False
+
+
+def _record_lighthouse(measures: dict, lh: dict | None, keep_raw: bool) -> None:
+    if lh:
+        measures['lighthouse'] = lh['categories']
+        measures['lighthouse_metrics'] = lh['metrics']
+        if keep_raw:
+            measures['lighthouse_raw'] = lh.get('raw')
     else:
+        measures['lighthouse'] = None
+
+
+async def _add_suggestions(measures: dict, fetcher: AsyncFetcher) -> None:
+    # === quick AI suggestions (2-5 words each) ===
+    info = {}
+    try:
+        measures['ai_suggestions'] = await instrument.timed('suggestions', fetcher.run(generate_suggestions, measures, info=info))
+    except Exception:
         measures['ai_suggestions'] = []
-    # === end AI suggestions ===
-    return measures
+    measures['ai_suggestions_cache'] = info.get('cache')
 
 
 def build_report(url: str, measures: dict) -> dict:
@@ -209,51 +322,266 @@ def build_report(url: str, measures: dict) -> dict:
     return report
 
 
+def record_render(measures: dict, rendered: dict) -> None:
+    """Copy the computed-style summary and render timings of a render_page() result onto `measures`."""
+    if not rendered.get('error'):
+        measures['dom_styles'] = rendered.get('dom_styles')
+        measures['render_timings_ms'] = rendered.get('timings_ms')
+
+
+def record_ai_verdict(measures: dict, verdict: dict, info: dict | None = None) -> None:
+    """Record a vision verdict and the score delta it implies on `measures`."""
+    measures['ai_verdict'] = verdict
+    if info:
+        measures['ai_verdict_cache'] = info.get('cache')
+        measures['screenshot_phash'] = info.get('phash')
+    decision = (verdict.get('redesign_candidate') or '').upper()
+    if decision == 'YES':
+        measures['ai_redo_recommendation'] = {'decision': 'YES', 'delta': -AI_REDO_DELTA, 'raw': verdict}
+    elif decision == 'NO':
+        measures['ai_redo_recommendation'] = {'decision': 'NO', 'delta': +AI_REDO_DELTA, 'raw': verdict}
+    else:
+        measures['ai_redo_recommendation'] = {'decision': decision or 'UNKNOWN', 'delta': 0, 'raw': verdict}
+
+
+async def _render_and_judge(url: str, measures: dict, info: dict) -> dict:
+    # One navigation feeds both the vision verdict and the computed-style summary.
+    rendered = await instrument.timed('render', render_page(url))
+    record_render(measures, rendered)
+    return await instrument.timed('vision', ai_verdict(url, rendered=rendered, info=info, meta=measures.get('meta')))
+
+
+def apply_ai_verdict(measures: dict, url: str) -> None:
+    """Render `url`, run the vision verdict and record it (plus the redo recommendation) on `measures`."""
+    info = {}
+    try:
+        record_ai_verdict(measures, run_sync(_render_and_judge(url, measures, info)), info)
+    except Exception as e:
+        measures['ai_verdict_error'] = str(e)
+
+
+def finalize_report(url: str, measures: dict) -> dict:
+    """build_report() plus the AI redo delta, if a vision verdict was recorded.
+
+    The scorer inputs are also kept in the measures store so rescore.py can re-score later, and
+    measures['timings'] becomes the report's top-level 'timings' block."""
+    timings = measures.pop('timings', None)
+    out = build_report(url, measures)
+    if timings:
+        out['timings'] = timings
+    measures_store.record(url, measures)
+
+    # Apply AI redo delta
+    if 'ai_redo_recommendation' in measures:
+        adj = measures['ai_redo_recommendation'].get('delta',0)
+        total = out['scores'].get('total',0)
+        out['scores']['total'] = max(0, min(100, total + adj))
+        out['scores']['ai_redo_delta'] = adj
+        out['scores']['ai_redo_decision'] = measures['ai_redo_recommendation'].get('decision')
+    return out
+
+
+def audit(url: str, use_ai: bool = True, use_vision: bool = True, **analyze_opts) -> dict:
+    """Run analyze(), the optional vision verdict and build_report() for one URL; returns the final report.
+
+    Extra keyword arguments are passed through to analyze(); with `qualify_threshold` the vision
+    verdict is skipped too when it cannot change the outcome. The report's 'timings' block covers
+    the whole audit; with instrument.configure_profiling() the audit is also profiled."""
+    with instrument.profiled(os.path.basename(report_io.report_path('', url, ext=''))), instrument.audit() as timer:
+        measures = analyze(url, use_ai=use_ai, use_vision=use_vision, **analyze_opts)
+        if use_vision and not lead_qualifier.skipped(measures, 'vision'):
+            apply_ai_verdict(measures, url)
+    measures['timings'] = timer.as_dict()
+    return finalize_report(url, measures)
+
+
+def read_urls(source: str) -> Iterator[str]:
+    """Yield URLs from a file (one per line) or from stdin when `source` is '-'. Blank lines and # comments are skipped."""
+    f = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_batch(urls: Iterable[str], output: str, workers: int = 8, use_ai: bool = True, use_vision: bool = True,
+              artifacts: report_io.ArtifactStore | None = None, full: bool = False,
+              metrics: instrument.MetricsExporter | None = None, **analyze_opts) -> dict:
+    """Audit many URLs with a bounded thread pool, appending each report to `output` (JSON lines) as soon as it finishes.
+
+    At most `workers * 2` audits are queued at once so very long URL lists are streamed rather than
+    loaded up front. Reports are slimmed (raw artifacts go to `artifacts`) unless `full` is set.
+    Per-stage timings are aggregated (and exported periodically through `metrics`, if given).
+    Extra keyword arguments are passed through to analyze(). Returns a throughput/latency summary dict.
+    """
+    histograms = metrics.histograms if metrics else instrument.StageHistograms()
+    write_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max(1, workers) * 2)
+    latencies: List[float] = []
+    counts = {'ok': 0, 'failed': 0}
+
+    def _one(u: str) -> Tuple[str, dict, float]:
+        t0 = time.perf_counter()
+        try:
+            report = audit(u, use_ai=use_ai, use_vision=use_vision, **analyze_opts)
+        except Exception as e:
+            report = {'url': u, 'error': f'{type(e).__name__}: {e}'}
+        return u, report, time.perf_counter() - t0
+
+    def _done(fut) -> None:
+        try:
+            u, report, took = fut.result()
+            (metrics or histograms).observe(report.get('timings'))
+            if not full:
+                report = report_io.slim_report(report, artifacts)
+            line = report_io.dumps(report) + b'\n'
+            with write_lock:
+                out_f.write(line)
+                out_f.flush()
+                latencies.append(took)
+                counts['failed' if 'error' in report else 'ok'] += 1
+                n = counts['ok'] + counts['failed']
+            print(f"[{n}] {u} -> {report.get('scores', {}).get('total', 'error')} ({took:.1f}s)")
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    try:
+        with open(output, 'ab') as out_f:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                for u in urls:
+                    slots.acquire()
+                    pool.submit(_one, u).add_done_callback(_done)
+    finally:
+        if metrics:
+            metrics.close()
+    wall = time.perf_counter() - started
+    stages = histograms.snapshot()['stages']
+
+    total = counts['ok'] + counts['failed']
+    return {
+        'urls': total,
+        'ok': counts['ok'],
+        'failed': counts['failed'],
+        'wall_s': round(wall, 3),
+        'throughput_per_min': round(total / wall * 60, 2) if wall > 0 else 0.0,
+        'latency_s': {
+            'mean': round(statistics.mean(latencies), 3) if latencies else 0.0,
+            'p50': round(_percentile(latencies, 50), 3),
+            'p95': round(_percentile(latencies, 95), 3),
+            'max': round(max(latencies), 3) if latencies else 0.0,
+        },
+        'suggestion_cache': ai_quick_suggester.cache_stats() if use_ai else None,
+        'suggestion_batches': ai_quick_suggester.batch_stats() if use_ai else None,
+        'vision_cache': simplevison.get_cache().stats() if use_vision else None,
+        'stages': {name: {'mean_s': round(h['sum_s'] / h['count'], 3) if h['count'] else 0.0,
+                          'requests': h['requests'], 'bytes': h['bytes']} for name, h in sorted(stages.items())},
+    }
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument('url')
+    ap.add_argument('url', nargs='?')
+    ap.add_argument('--batch', metavar='FILE', help="Audit every URL in FILE (one per line, '-' for stdin) instead of a single URL")
+    ap.add_argument('--workers', type=int, default=8, help='Concurrent audits in --batch mode (default 8)')
+    ap.add_argument('--output', help='Output path (default analysis.json, or batch_results.jsonl with --batch)')
+    ap.add_argument('--full', action='store_true', help='Embed raw HTML, the full parsed page and the raw Lighthouse report in the output (old format)')
+    ap.add_argument('--artifacts-dir', default='artifacts', help='Where compact reports store raw artifacts by content hash (default ./artifacts)')
     ap.add_argument('--no-ai', action='store_true', help='Disable AI suggestions even if OPENAI_API_KEY is present')
+    ap.add_argument('--no-vision', action='store_true', help='Skip the screenshot-based AI vision verdict')
+    ap.add_argument('--link-concurrency', type=int, default=10, help='Concurrent broken-link checks per audit (default 10)')
+    ap.add_argument('--link-per-host', type=int, default=4, help='Concurrent broken-link checks per host (default 4)')
+    ap.add_argument('--browser-pages', type=int, default=browser_pool.DEFAULT_MAX_PAGES, help='Max pages rendered at once in the shared browser (default 4)')
+    ap.add_argument('--browser-recycle-after', type=int, default=browser_pool.DEFAULT_RECYCLE_AFTER, help='Restart the shared browser after this many pages')
+    ap.add_argument('--no-lighthouse', action='store_true', help='Skip the Lighthouse run')
+    ap.add_argument('--lighthouse-concurrency', type=int, default=lighthouse_runner.DEFAULT_CONCURRENCY, help='Lighthouse audits run in parallel, each on its own pooled Chrome (default 2)')
+    ap.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory for persistent caches (default utils/.cache)')
+    ap.add_argument('--no-cache', action='store_true', help='Disable the persistent HTTP cache')
+    ap.add_argument('--http-cache-max-age', type=float, default=http_cache.DEFAULT_MAX_AGE_S, help='Drop cached pages older than this many seconds instead of revalidating')
+    ap.add_argument('--http-cache-max-mb', type=float, default=http_cache.DEFAULT_MAX_BYTES / (1024 * 1024), help='Size limit of the HTTP cache; least recently used pages are evicted')
+    ap.add_argument('--max-page-mb', type=float, default=DEFAULT_MAX_BODY_BYTES / (1024 * 1024), help='Read at most this much of a page body; larger pages are audited truncated (default 5, 0 = no limit)')
+    ap.add_argument('--page-types', nargs='*', default=list(DEFAULT_CONTENT_TYPES), help='Content types whose body is read (default text/html application/xhtml+xml text/plain)')
+    ap.add_argument('--no-llm-cache', action='store_true', help='Do not persist AI suggestions (identical in-flight requests are still coalesced)')
+    ap.add_argument('--llm-cache-ttl', type=float, default=ai_quick_suggester.DEFAULT_CACHE_TTL_S, help='Seconds a cached AI suggestion stays valid (default 7 days)')
+    ap.add_argument('--no-vision-cache', action='store_true', help='Always ask the vision model, even for screenshots near-identical to one already judged')
+    ap.add_argument('--vision-cache-entries', type=int, default=simplevison.DEFAULT_CACHE_MAX_ENTRIES, help='Screenshot hashes kept in the vision cache; least recently used are evicted (default 20000)')
+    ap.add_argument('--vision-max-distance', type=int, default=simplevison.DEFAULT_MAX_DISTANCE, help='Max dHash bit difference for two screenshots to share a verdict (default 6)')
+    ap.add_argument('--prefilter', action='store_true',
+                    help='Settle clear-cut pages with the local vision prefilter instead of the model (uncalibrated; see bench_prefilter.py)')
+    ap.add_argument('--ai-batch', type=int, default=0, metavar='N', help='Pack up to N sites into one AI suggestion request (batch mode; default off)')
+    ap.add_argument('--ai-token-budget', type=int, default=ai_quick_suggester.DEFAULT_BATCH_TOKEN_BUDGET, help='Prompt + answer tokens allowed per batched AI request')
+    ap.add_argument('--qualify', type=float, metavar='THRESHOLD', help='Staged audit: skip the stages that cannot move a site across this lead threshold')
+    ap.add_argument('--no-measures-store', action='store_true', help='Do not keep scorer inputs for rescore.py')
+    ap.add_argument('--metrics-out', help='In --batch mode, write per-stage timing histograms here while running')
+    ap.add_argument('--metrics-format', choices=('prom', 'jsonl'), default='prom', help='Prometheus text (rewritten) or JSON lines (appended); default prom')
+    ap.add_argument('--metrics-every', type=float, default=30.0, help='Seconds between --metrics-out writes (default 30)')
+    ap.add_argument('--profile-dir', help='Profile every audit into this directory')
+    ap.add_argument('--profiler', choices=('cprofile', 'pyinstrument'), default='cprofile', help='Profiler for --profile-dir (default cprofile)')
     ap.add_argument('--log-ai', help='Write AI prompt and response to a log file')
     args = ap.parse_args()
+    if not args.url and not args.batch:
+        ap.error('a URL or --batch FILE is required')
+
+    http_cache.configure(
+        None if args.no_cache else os.path.join(args.cache_dir, 'http.sqlite'),
+        max_age_s=args.http_cache_max_age,
+        max_bytes=int(args.http_cache_max_mb * 1024 * 1024),
+    )
+    configure_fetch(int(args.max_page_mb * 1024 * 1024) or None, args.page_types)
+
+    ai_quick_suggester.configure_cache(None if args.no_llm_cache else os.path.join(args.cache_dir, 'llm.sqlite'),
+                                       ttl_s=args.llm_cache_ttl)
+    simplevison.configure_cache(None if args.no_vision_cache else os.path.join(args.cache_dir, 'vision.sqlite'),
+                                max_distance=-1 if args.no_vision_cache else args.vision_max_distance,
+                                max_entries=args.vision_cache_entries)
+    simplevison.PREFILTER = args.prefilter
+    measures_store.configure(None if args.no_measures_store else os.path.join(args.cache_dir, 'measures.sqlite'))
+    ai_quick_suggester.configure_batching(args.ai_batch, token_budget=args.ai_token_budget)
+
+    browser_pool.configure(max_pages=args.browser_pages, recycle_after=args.browser_recycle_after)
+    instrument.configure_profiling(args.profile_dir, tool=args.profiler)
 
-    url = args.url
     use_ai = not args.no_ai
+    use_vision = not args.no_vision
+    lighthouse_runner.configure(concurrency=args.lighthouse_concurrency)
+    analyze_opts = {'link_concurrency': args.link_concurrency, 'link_per_host': args.link_per_host,
+                    'use_lighthouse': not args.no_lighthouse, 'keep_lighthouse_raw': args.full,
+                    'qualify_threshold': args.qualify}
+    artifacts = report_io.ArtifactStore(args.artifacts_dir) if args.artifacts_dir and not args.full else None
     if os.environ.get('OPENAI_API_KEY'):
         print('OPENAI_API_KEY found; AI suggestions will be attempted.')
     else:
         print('No OPENAI_API_KEY; using heuristic suggestions fallback.')
 
-    report = analyze(url, use_ai=use_ai)
+    if args.batch:
+        output = args.output or 'batch_results.jsonl'
+        metrics = instrument.MetricsExporter(args.metrics_out, args.metrics_format, args.metrics_every) if args.metrics_out else None
+        summary = run_batch(read_urls(args.batch), output, workers=args.workers, use_ai=use_ai, use_vision=use_vision,
+                            artifacts=artifacts, full=args.full, metrics=metrics, **analyze_opts)
+        print(f'Wrote {summary["urls"]} reports to {output}')
+        print(json.dumps(summary, indent=2))
+        return
 
-    try:
-        verdict = asyncio.run(ai_verdict(url))
-        report['ai_verdict'] = verdict
-        decision = (verdict.get('redesign_candidate') or '').upper()
-        if decision == 'YES':
-            report['ai_redo_recommendation'] = {'decision': 'YES', 'delta': -30, 'raw': verdict}
-            report['scores']['total'] = max(0, report['scores'].get('total',0) - 30)
-        elif decision == 'NO':
-            report['ai_redo_recommendation'] = {'decision': 'NO', 'delta': +30, 'raw': verdict}
-            report['scores']['total'] = min(100, report['scores'].get('total',0) + 30)
-        else:
-            report['ai_redo_recommendation'] = {'decision': decision or 'UNKNOWN', 'delta': 0, 'raw': verdict}
-    except Exception as e:
-        report['ai_verdict_error'] = str(e)
+    out = audit(args.url, use_ai=use_ai, use_vision=use_vision, **analyze_opts)
 
-    out = build_report(url, report)
-
-    # Apply AI redo delta
-    if 'ai_redo_recommendation' in report:
-        adj = report['ai_redo_recommendation'].get('delta',0)
-        total = out['scores'].get('total',0)
-        out['scores']['total'] = max(0, min(100, total + adj))
-        out['scores']['ai_redo_delta'] = adj
-        out['scores']['ai_redo_decision'] = report['ai_redo_recommendation'].get('decision')
+    if not args.full:
+        out = report_io.slim_report(out, artifacts)
 
-    # Always write to analysis.json
-    with open('analysis.json','w',encoding='utf-8') as f:
-        json.dump(out, f, indent=2, default=str)
-    print('Wrote analysis.json')
+    output = args.output or 'analysis.json'
+    report_io.write_json(output, out)
+    print(f'Wrote {output}')
 
 if __name__ == '__main__':
     main()